@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+# Busca de aeronaves semelhantes no histórico da frota: um KD-tree por
+# (modelo_aeronave, tipo_motor) sobre as features numéricas padronizadas
+# (z-score com média/desvio de toda a frota). Cada consulta só percorre a
+# partição do mesmo modelo e motor; combinações sem histórico suficiente
+# usam um índice global como reserva.
+
+ARQUIVO_DADOS = 'aviacao_falhas.csv'
+
+COLUNAS_NUMERICAS = [
+    'idade_aeronave_anos',
+    'horas_voo_total',
+    'ultima_manutencao_meses',
+    'ciclos_pouso_decolagem',
+    'temperatura_media_operacao'
+]
+COLUNAS_PARTICAO = ['modelo_aeronave', 'tipo_motor']
+COLUNAS_RESULTADO = COLUNAS_PARTICAO + COLUNAS_NUMERICAS + ['falha_critica', 'tipo_falha']
+
+
+class IndiceSimilares:
+    """KD-trees particionados por modelo/motor com consulta k-vizinhos"""
+
+    def __init__(self, dados, tamanho_folha=40):
+        inicio = time.perf_counter()
+        self.dados = dados[COLUNAS_RESULTADO].reset_index(drop=True)
+        numericos = self.dados[COLUNAS_NUMERICAS].to_numpy(dtype=np.float64)
+        self.media = numericos.mean(axis=0)
+        self.desvio = numericos.std(axis=0)
+        self.desvio[self.desvio == 0] = 1.0
+        pontos = (numericos - self.media) / self.desvio
+
+        # Uma árvore por partição; as linhas guardam a posição original em self.dados
+        self.particoes = {}
+        for chave, linhas in self.dados.groupby(COLUNAS_PARTICAO).indices.items():
+            self.particoes[chave] = (KDTree(pontos[linhas], leaf_size=tamanho_folha), linhas)
+        self.global_ = (KDTree(pontos, leaf_size=tamanho_folha), np.arange(len(pontos)))
+        self.tempo_construcao = time.perf_counter() - inicio
+
+    @classmethod
+    def de_csv(cls, caminho=ARQUIVO_DADOS):
+        """Monta o índice a partir do CSV histórico"""
+        return cls(pd.read_csv(caminho))
+
+    def buscar(self, entrada, k=5):
+        """k aeronaves mais próximas da entrada (dict com modelo, motor e numéricas)
+
+        Devolve as linhas do histórico com a distância padronizada e a indicação de
+        que a busca caiu no índice global (sem histórico suficiente da combinação)."""
+        ponto = (np.array([[float(entrada[c]) for c in COLUNAS_NUMERICAS]]) - self.media) / self.desvio
+        chave = tuple(entrada[c] for c in COLUNAS_PARTICAO)
+        arvore, linhas = self.particoes.get(chave, (None, ()))
+        reserva = len(linhas) < k
+        if reserva:
+            arvore, linhas = self.global_
+
+        distancias, posicoes = arvore.query(ponto, k=min(k, len(linhas)))
+        vizinhos = self.dados.iloc[linhas[posicoes[0]]].copy()
+        vizinhos['distancia'] = distancias[0]
+        vizinhos['indice_global'] = reserva
+        return vizinhos
+
+
+if __name__ == '__main__':
+    # Latência de consulta em uma frota sintética grande (linhas do CSV reamostradas com ruído)
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark do índice de aeronaves semelhantes")
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    base = pd.read_csv(ARQUIVO_DADOS)
+    rng = np.random.default_rng(42)
+    frota = base.iloc[rng.integers(0, len(base), args.linhas)].reset_index(drop=True)
+    frota[COLUNAS_NUMERICAS] = frota[COLUNAS_NUMERICAS] * rng.normal(1.0, 0.05, (args.linhas, len(COLUNAS_NUMERICAS)))
+
+    indice = IndiceSimilares(frota)
+    print(f"🔎 Índice com {args.linhas:,} aeronaves e {len(indice.particoes)} partições "
+        f"construído em {indice.tempo_construcao:.1f}s")
+
+    consultas = base.sample(args.consultas, replace=True, random_state=1).to_dict('records')
+    tempos = []
+    for entrada in consultas:
+        inicio = time.perf_counter()
+        indice.buscar(entrada, k=args.k)
+        tempos.append(time.perf_counter() - inicio)
+    tempos = np.array(tempos) * 1000
+    print(f"Consulta k={args.k}: mediana {np.median(tempos):.3f} ms | p99 {np.percentile(tempos, 99):.3f} ms")
@@ -0,0 +1,134 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Agenda de manutenção da frota a partir dos scores do modelo.
+#
+# Premissas: o risco previsto é a probabilidade de falha crítica no horizonte
+# (52 semanas) sem manutenção, distribuída como um risco semanal constante; a
+# manutenção na semana w zera ultima_manutencao_meses, e dali em diante vale o
+# risco re-pontuado pelo modelo. Custos seguem a fórmula da aba de manutenção.
+#
+# Algoritmo guloso vetorizado: cada semana de atraso custa
+# CUSTO_FALHA * (h - h_pos) para a aeronave (h = risco semanal), então as
+# aeronaves são ordenadas por esse custo de atraso e preenchem as vagas
+# semana a semana; ficam de fora as que não compensam o custo da manutenção
+# na semana em que caberiam (o "corte" da mochila).
+
+CUSTO_FALHA = 50000
+SEMANAS_HORIZONTE = 52
+
+
+def custo_manutencao_preventiva(dados):
+    """Custo de uma manutenção (mesma fórmula da aba Manutenção, sem a parcela de falha)"""
+    return dados['idade_aeronave_anos'] * 1000 + dados['horas_voo_total'] * 0.1
+
+
+def _risco_semanal(risco, semanas):
+    return 1.0 - np.power(1.0 - np.clip(risco, 0.0, 1.0 - 1e-12), 1.0 / semanas)
+
+
+def custo_esperado_falha(risco, risco_pos, semana, semanas=SEMANAS_HORIZONTE):
+    """Custo esperado de falha no horizonte com manutenção na semana indicada (0 = nunca)"""
+    h, h_pos = _risco_semanal(risco, semanas), _risco_semanal(risco_pos, semanas)
+    antes = np.where(semana > 0, semana - 1, semanas)
+    sobrevivencia = np.power(1.0 - h, antes) * np.power(1.0 - h_pos, semanas - antes)
+    return CUSTO_FALHA * (1.0 - sobrevivencia)
+
+
+def planejar_manutencao(dados, risco, risco_pos, capacidade_semanal, semanas=SEMANAS_HORIZONTE):
+    """Plano priorizado: semana de cada aeronave (0 = sem vaga/não compensa) e economia esperada"""
+    risco = np.asarray(risco, dtype=np.float64)
+    risco_pos = np.minimum(np.asarray(risco_pos, dtype=np.float64), risco)
+    custo_manutencao = custo_manutencao_preventiva(dados).to_numpy(dtype=np.float64)
+    sem_manutencao = custo_esperado_falha(risco, risco_pos, np.zeros(len(risco)), semanas)
+
+    # Ordem de prioridade: maior custo por semana de atraso primeiro
+    custo_atraso = CUSTO_FALHA * (_risco_semanal(risco, semanas) - _risco_semanal(risco_pos, semanas))
+    candidatas = np.flatnonzero(
+        sem_manutencao - custo_esperado_falha(risco, risco_pos, np.ones(len(risco)), semanas) > custo_manutencao
+    )
+    ordem = candidatas[np.argsort(-custo_atraso[candidatas], kind='stable')]
+
+    # Enche as vagas semana a semana; quem passa da última semana fica sem vaga
+    semana = np.zeros(len(risco), dtype=np.int64)
+    posicao = np.arange(len(ordem))
+    semana[ordem] = np.where(posicao < capacidade_semanal * semanas, posicao // capacidade_semanal + 1, 0)
+
+    # Corte: na semana que coube, a manutenção ainda precisa se pagar
+    com_manutencao = custo_esperado_falha(risco, risco_pos, semana, semanas)
+    economia = sem_manutencao - com_manutencao - custo_manutencao
+    semana[(semana > 0) & (economia <= 0)] = 0
+    economia = np.where(semana > 0, economia, 0.0)
+
+    prioridade = np.zeros(len(risco), dtype=np.int64)
+    agendadas = ordem[semana[ordem] > 0]
+    prioridade[agendadas] = np.arange(1, len(agendadas) + 1)
+
+    plano = dados.copy()
+    plano['risco'] = risco
+    plano['risco_pos_manutencao'] = risco_pos
+    plano['semana'] = semana
+    plano['prioridade'] = prioridade
+    plano['custo_manutencao'] = custo_manutencao
+    plano['custo_esperado_sem'] = sem_manutencao
+    plano['custo_esperado_com'] = np.where(semana > 0, com_manutencao, sem_manutencao)
+    plano['economia_esperada'] = economia
+    # Agendadas por semana/prioridade; as demais no fim, da maior para a menor probabilidade
+    return plano.iloc[np.lexsort((-risco, prioridade, semana, semana == 0))]
+
+
+def resumo_plano(plano):
+    """Totais do plano e agregados por semana"""
+    agendadas = plano[plano['semana'] > 0]
+    por_semana = agendadas.groupby('semana').agg(
+        aeronaves=('semana', 'size'),
+        economia=('economia_esperada', 'sum'),
+        custo_manutencao=('custo_manutencao', 'sum'),
+    ).reset_index()
+    return {
+        'agendadas': int(len(agendadas)),
+        'sem_vaga': int((plano['semana'] == 0).sum()),
+        'economia_total': float(agendadas['economia_esperada'].sum()),
+        'custo_manutencao_total': float(agendadas['custo_manutencao'].sum()),
+        'custo_esperado_sem_plano': float(plano['custo_esperado_sem'].sum()),
+        'custo_esperado_com_plano': float(plano['custo_esperado_com'].sum()),
+    }, por_semana
+
+
+def pontuar_frota(pacote, dados):
+    """Risco atual e risco após manutenção (ultima_manutencao_meses = 0) em duas passadas em lote"""
+    risco = pacote.predict_proba(dados)[:, 1]
+    risco_pos = pacote.predict_proba(dados.assign(ultima_manutencao_meses=0))[:, 1]
+    return risco, risco_pos
+
+
+if __name__ == '__main__':
+    # Benchmark com frota sintética (linhas do CSV reamostradas) e o modelo ATUAL
+    import argparse
+    from registro_modelos import carregar_pacote
+    parser = argparse.ArgumentParser(description="Agenda de manutenção da frota")
+    parser.add_argument('--aeronaves', type=int, default=100_000)
+    parser.add_argument('--capacidade', type=int, default=500, help="vagas de manutenção por semana")
+    parser.add_argument('--semanas', type=int, default=SEMANAS_HORIZONTE)
+    args = parser.parse_args()
+
+    base = pd.read_csv('aviacao_falhas.csv')
+    rng = np.random.default_rng(42)
+    frota = base.iloc[rng.integers(0, len(base), args.aeronaves)].reset_index(drop=True)
+
+    inicio = time.perf_counter()
+    risco, risco_pos = pontuar_frota(carregar_pacote(), frota)
+    tempo_scores = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    plano = planejar_manutencao(frota, risco, risco_pos, args.capacidade, args.semanas)
+    tempo_plano = time.perf_counter() - inicio
+
+    totais, _ = resumo_plano(plano)
+    print(f"🛠️ {args.aeronaves:,} aeronaves, {args.capacidade} vagas/semana, {args.semanas} semanas")
+    print(f"Scores em {tempo_scores:.2f}s | plano em {tempo_plano:.2f}s")
+    print(f"Agendadas: {totais['agendadas']:,} | sem vaga ou sem retorno: {totais['sem_vaga']:,}")
+    print(f"Custo esperado de falhas: R$ {totais['custo_esperado_sem_plano']:,.0f} -> "
+        f"R$ {totais['custo_esperado_com_plano']:,.0f} "
+        f"(manutenção: R$ {totais['custo_manutencao_total']:,.0f}, economia: R$ {totais['economia_total']:,.0f})")
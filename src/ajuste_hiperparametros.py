@@ -0,0 +1,150 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+# Busca de hiperparâmetros por successive halving:
+# muitas configurações aleatórias começam com poucas linhas de treino e só a
+# melhor fração (1/eta) avança para a rodada seguinte com eta vezes mais dados.
+# Cada trial usa tree_method="hist" + early stopping no conjunto de validação.
+
+ARQUIVO_RESULTADOS = "resultados_ajuste.csv"
+ARQUIVO_MELHORES = "melhores_hiperparametros.json"
+
+ESPACO_BUSCA = {
+    'max_depth': [3, 4, 5, 6, 7, 8, 10],
+    'learning_rate': (0.01, 0.3),      # log-uniforme
+    'subsample': (0.5, 1.0),
+    'colsample_bytree': (0.5, 1.0),
+    'n_estimators': [200, 500, 1000],  # teto; o early stopping define o número real
+}
+
+# Dados compartilhados com os processos do pool (enviados uma vez por processo)
+_dados_trial = {}
+
+
+def _inicializar_processo(X_treino, y_treino, X_val, y_val):
+    _dados_trial.update(X_treino=X_treino, y_treino=y_treino, X_val=X_val, y_val=y_val)
+
+
+def sortear_configuracoes(n_configs, seed=42):
+    """Sorteia configurações aleatórias do espaço de busca"""
+    rng = np.random.default_rng(seed)
+    lr_min, lr_max = ESPACO_BUSCA['learning_rate']
+    configs = []
+    for _ in range(n_configs):
+        configs.append({
+            'max_depth': int(rng.choice(ESPACO_BUSCA['max_depth'])),
+            'learning_rate': float(np.exp(rng.uniform(np.log(lr_min), np.log(lr_max)))),
+            'subsample': float(rng.uniform(*ESPACO_BUSCA['subsample'])),
+            'colsample_bytree': float(rng.uniform(*ESPACO_BUSCA['colsample_bytree'])),
+            'n_estimators': int(rng.choice(ESPACO_BUSCA['n_estimators'])),
+        })
+    return configs
+
+
+def executar_trial(config, n_linhas, threads, rodada_early_stopping=30):
+    """Treina uma configuração nas primeiras n_linhas do treino (executado no pool)"""
+    X_treino = _dados_trial['X_treino'][:n_linhas]
+    y_treino = _dados_trial['y_treino'][:n_linhas]
+    X_val = _dados_trial['X_val']
+    y_val = _dados_trial['y_val']
+
+    inicio = time.perf_counter()
+    modelo = xgb.XGBClassifier(
+        objective="binary:logistic",
+        eval_metric="logloss",
+        tree_method="hist",
+        early_stopping_rounds=rodada_early_stopping,
+        n_jobs=threads,
+        random_state=42,
+        **config
+    )
+    modelo.fit(X_treino, y_treino, eval_set=[(X_val, y_val)], verbose=False)
+    tempo = time.perf_counter() - inicio
+
+    proba = modelo.predict_proba(X_val)[:, 1]
+    return {
+        **config,
+        'linhas_treino': n_linhas,
+        'melhor_iteracao': int(modelo.best_iteration),
+        'logloss_val': float(log_loss(y_val, proba)),
+        'auc_val': float(roc_auc_score(y_val, proba)),
+        'acuracia_val': float(accuracy_score(y_val, proba >= 0.5)),
+        'tempo_s': round(tempo, 3),
+    }
+
+
+def executar_ajuste(X, y, n_configs=27, eta=3, n_processos=None, threads_por_trial=2,
+                    min_linhas=2000, caminho_resultados=ARQUIVO_RESULTADOS):
+    """Successive halving em paralelo; grava todos os trials em um CSV local"""
+    X_treino, X_val, y_treino, y_val = train_test_split(
+        np.asarray(X, dtype=np.float32), np.asarray(y),
+        test_size=0.2, random_state=42, stratify=y
+    )
+
+    # Orçamento de threads: processos * threads_por_trial <= núcleos
+    if n_processos is None:
+        n_processos = max(1, (os.cpu_count() or 1) // threads_por_trial)
+
+    # Número de rodadas e linhas de treino da primeira rodada
+    n_rodadas = max(1, int(np.floor(np.log(n_configs) / np.log(eta))) + 1)
+    n_linhas = max(min(min_linhas, len(X_treino)), len(X_treino) // eta ** (n_rodadas - 1))
+
+    configs = sortear_configuracoes(n_configs)
+    id_execucao = datetime.now().strftime("%Y%m%d-%H%M%S")
+    resultados = []
+
+    print(f"\n🔎 Ajuste de hiperparâmetros: {n_configs} configs, {n_rodadas} rodadas, "
+        f"{n_processos} processos x {threads_por_trial} threads")
+
+    with ProcessPoolExecutor(
+        max_workers=n_processos,
+        initializer=_inicializar_processo,
+        initargs=(X_treino, y_treino, X_val, y_val)
+    ) as pool:
+        for rodada in range(n_rodadas):
+            inicio = time.perf_counter()
+            futuros = [pool.submit(executar_trial, cfg, n_linhas, threads_por_trial) for cfg in configs]
+            rodada_resultados = [f.result() for f in futuros]
+
+            for r in rodada_resultados:
+                r.update(execucao=id_execucao, rodada=rodada)
+            resultados.extend(rodada_resultados)
+
+            melhor = min(rodada_resultados, key=lambda r: r['logloss_val'])
+            print(f"Rodada {rodada}: {len(configs)} configs x {n_linhas} linhas "
+                f"em {time.perf_counter() - inicio:.1f}s | melhor logloss {melhor['logloss_val']:.4f}")
+
+            if rodada == n_rodadas - 1 or len(configs) <= 1:
+                break
+
+            # Mantém a melhor fração e aumenta os dados
+            ordem = np.argsort([r['logloss_val'] for r in rodada_resultados])
+            configs = [configs[i] for i in ordem[:max(1, len(configs) // eta)]]
+            n_linhas = min(len(X_treino), n_linhas * eta)
+
+    # Tabela local de resultados (acumula entre execuções)
+    tabela = pd.DataFrame(resultados)
+    tabela.to_csv(caminho_resultados, mode='a', index=False,
+                header=not os.path.exists(caminho_resultados))
+
+    melhor = min((r for r in resultados if r['rodada'] == rodada), key=lambda r: r['logloss_val'])
+    melhores_parametros = {k: melhor[k] for k in ESPACO_BUSCA}
+    melhores_parametros['n_estimators'] = melhor['melhor_iteracao'] + 1
+    melhores_parametros['tree_method'] = "hist"  # o mesmo dos trials
+    with open(ARQUIVO_MELHORES, 'w', encoding='utf-8') as arq:
+        json.dump(melhores_parametros, arq, indent=2)
+
+    print(f"\n✅ Melhor configuração: {melhores_parametros}")
+    print(f"AUC validação: {melhor['auc_val']:.4f} | Acurácia validação: {melhor['acuracia_val']:.2%}")
+    print(f"Resultados salvos em {caminho_resultados} e {ARQUIVO_MELHORES}")
+    print(f"Para treinar com eles: python src/modelo_aviacao.py --parametros {ARQUIVO_MELHORES}")
+
+    return tabela, melhores_parametros
@@ -2,24 +2,66 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from dash import dcc, html, Input, Output
+from functools import lru_cache
+from dash import dcc, html, dash_table, Input, Output, State
 import dash_bootstrap_components as dbc
 import numpy as np
 from datetime import datetime, timedelta
 from app import app
+from anomalias_frota import DetectorAnomalias
+from agenda_manutencao import (CUSTO_FALHA, custo_manutencao_preventiva, planejar_manutencao,
+                            pontuar_frota, resumo_plano)
+from cache_disco import cache_disco, impressao_arquivo
+from carregamento_paginas import ARQUIVO_DADOS, ao_aquecer, dados_frota, recurso, versao_arquivo
+from metricas_app import medir_inferencia
+from particoes_companhia import cache_companhias, caminho_particao, companhia_da_url, dados_companhia
+from sobrevivencia_frota import MIN_AERONAVES, SEGMENTOS, TEMPOS, curvas_sobrevivencia
 
-# Carregar dados
-try:
-    dados = pd.read_csv('aviacao_falhas.csv')
-    print("Dados carregados para análises avançadas")
-except:
-    print("Erro ao carregar dados")
-    dados = pd.DataFrame()
+
+@recurso('modelo', versao=lambda: versao_arquivo(ARQUIVO_DADOS))
+def scores_frota():
+    """Risco atual e pós-manutenção da frota para a agenda (modelo ATUAL do registro)"""
+    try:
+        from registro_modelos import carregar_pacote
+        pacote, dados = carregar_pacote(), dados_frota()
+        with medir_inferencia('frota'):
+            return pontuar_frota(pacote, dados)
+    except Exception as e:
+        print(f"Agenda de manutenção indisponível: {e}")
+        return None, None
+
+
+@recurso('modelo', versao=lambda: versao_arquivo(ARQUIVO_DADOS))
+def detector_anomalias():
+    """Perfis robustos por modelo ajustados na frota inteira (overlay da matriz de risco)"""
+    try:
+        return DetectorAnomalias().ajustar(dados_frota())
+    except Exception as e:
+        print(f"Detector de anomalias indisponível: {e}")
+        return None
+
+
+def scores_companhia(companhia=None):
+    """Scores da frota inteira (companhia=None) ou só da partição da companhia, no cache dela"""
+    if companhia is None:
+        return scores_frota()
+
+    def pontuar():
+        try:
+            from registro_modelos import carregar_pacote
+            pacote = carregar_pacote()
+            with medir_inferencia('frota'):
+                return pontuar_frota(pacote, dados_companhia(companhia))
+        except Exception as e:
+            print(f"Agenda de manutenção indisponível para {companhia}: {e}")
+            return None, None
+    return cache_companhias.obter(companhia, 'scores', pontuar)
 
 # FUNÇÕES DE ANÁLISE 
 
-def criar_analise_temporal():
+def criar_analise_temporal(dados=None):
     """Análise de tendências temporais"""
+    dados = dados_frota() if dados is None else dados
     if dados.empty:
         return px.line(title="Dados não disponíveis")
     
@@ -70,8 +112,9 @@ def criar_analise_temporal():
     
     return fig
 
-def criar_analise_risco():
+def criar_analise_risco(dados=None):
     """Análise de matriz de risco"""
+    dados = dados_frota() if dados is None else dados
     if dados.empty:
         return px.scatter(title="Dados não disponíveis")
     
@@ -100,20 +143,37 @@ def criar_analise_risco():
         yaxis_title="Horas Totais de Voo",
         legend_title="Falha Crítica"
     )
-    
+
+    # Overlay: aeronaves com perfil atípico para o próprio modelo (detector da frota inteira)
+    detector = detector_anomalias()
+    if detector is not None:
+        with medir_inferencia('anomalias'):
+            anomalias = detector.pontuar(dados)
+        atipicas = dados_risco[anomalias['anomalia']].assign(
+            distancia=anomalias['distancia_anomalia'], variavel=anomalias['variavel_atipica'].astype(str))
+        fig.add_trace(go.Scatter(
+            x=atipicas['idade_aeronave_anos'], y=atipicas['horas_voo_total'], mode='markers',
+            name=f"Perfil atípico para o modelo ({len(atipicas)})",
+            marker=dict(symbol='circle-open', size=16, color='black', line=dict(width=2)),
+            customdata=atipicas[['modelo_aeronave', 'distancia', 'variavel']],
+            hovertemplate="%{customdata[0]}<br>Distância ao perfil do modelo: %{customdata[1]:.2f}"
+                        "<br>Mais atípico em: %{customdata[2]}<extra></extra>",
+        ))
+        fig.update_layout(legend=dict(orientation='h', y=-0.2))
+
     return fig
 
-def criar_analise_manutencao():
+def criar_analise_manutencao(dados=None):
     """Análise de otimização de manutenção"""
+    dados = dados_frota() if dados is None else dados
     if dados.empty:
         return px.bar(title="Dados não disponíveis")
     
     # Simular custos de manutenção
     dados_manutencao = dados.copy()
     dados_manutencao['custo_manutencao'] = (
-        dados_manutencao['idade_aeronave_anos'] * 1000 +
-        dados_manutencao['horas_voo_total'] * 0.1 +
-        np.where(dados_manutencao['falha_critica'] == 1, 50000, 0)
+        custo_manutencao_preventiva(dados_manutencao) +
+        np.where(dados_manutencao['falha_critica'] == 1, CUSTO_FALHA, 0)
     )
     
     analise_modelo = dados_manutencao.groupby('modelo_aeronave').agg({
@@ -152,8 +212,9 @@ def criar_analise_manutencao():
     
     return fig
 
-def criar_relatorio_kpis():
+def criar_relatorio_kpis(dados=None):
     """Relatório com KPIs principais"""
+    dados = dados_frota() if dados is None else dados
     if dados.empty:
         return []
     
@@ -243,8 +304,9 @@ def criar_relatorio_kpis():
         ])
     ]
 
-def criar_analise_detalhada_modelo():
+def criar_analise_detalhada_modelo(dados=None):
     """Análise detalhada por modelo de aeronave"""
+    dados = dados_frota() if dados is None else dados
     if dados.empty:
         return px.bar(title="Dados não disponíveis")
     
@@ -276,6 +338,91 @@ def criar_analise_detalhada_modelo():
     
     return fig
 
+def calcular_plano(capacidade_semanal):
+    """Plano da frota para uma capacidade semanal (sem cache)"""
+    risco_frota, risco_pos_frota = scores_frota()
+    return planejar_manutencao(dados_frota(), risco_frota, risco_pos_frota, capacidade_semanal)
+
+
+@lru_cache(maxsize=8)
+def _plano_em_cache(capacidade_semanal, versao_dados):
+    return calcular_plano(capacidade_semanal)
+
+
+def plano_manutencao(capacidade_semanal):
+    """Plano em cache por capacidade e versão do CSV (a paginação reusa o mesmo plano)"""
+    return _plano_em_cache(capacidade_semanal, versao_arquivo(ARQUIVO_DADOS))
+
+
+def plano_companhia(capacidade_semanal, companhia=None):
+    """Plano da frota inteira ou da companhia (os planos da companhia ficam no cache dela)"""
+    if companhia is None:
+        return plano_manutencao(capacidade_semanal)
+    return cache_companhias.obter(companhia, ('plano', capacidade_semanal), lambda: planejar_manutencao(
+        dados_companhia(companhia), *scores_companhia(companhia), capacidade_semanal))
+
+
+COLUNAS_PLANO = [
+    ('prioridade', 'Prioridade'), ('semana', 'Semana'), ('modelo_aeronave', 'Modelo'),
+    ('companhia_aerea', 'Companhia'), ('idade_aeronave_anos', 'Idade'),
+    ('ultima_manutencao_meses', 'Últ. manutenção (meses)'), ('risco', 'Risco atual'),
+    ('risco_pos_manutencao', 'Risco pós-manutenção'), ('custo_manutencao', 'Custo manutenção (R$)'),
+    ('economia_esperada', 'Economia esperada (R$)'),
+]
+
+
+def criar_grafico_plano(por_semana):
+    """Aeronaves e economia esperada por semana do plano"""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(x=por_semana['semana'], y=por_semana['aeronaves'], name='Aeronaves',
+                        marker_color='steelblue'), secondary_y=False)
+    fig.add_trace(go.Scatter(x=por_semana['semana'], y=por_semana['economia'], name='Economia esperada',
+                            mode='lines+markers', line=dict(color='green')), secondary_y=True)
+    fig.update_layout(title='Plano de Manutenção por Semana', height=400, legend=dict(orientation='h', y=-0.2))
+    fig.update_xaxes(title_text="Semana")
+    fig.update_yaxes(title_text="Aeronaves", secondary_y=False)
+    fig.update_yaxes(title_text="Economia (R$)", secondary_y=True)
+    return fig
+
+def criar_grafico_sobrevivencia(curvas):
+    """Curvas de Kaplan–Meier (com IC 95% quando há poucos segmentos) e risco por 1.000 unidades de tempo"""
+    rotulo_tempo = TEMPOS[curvas['tempo']]
+    fig = make_subplots(rows=1, cols=2, subplot_titles=(
+        "Sobrevivência sem falha crítica (Kaplan–Meier)", f"Risco de falha por 1.000 {rotulo_tempo.lower()}"))
+    grade = curvas['grade']
+    meio = [(a + b) / 2 for a, b in zip(grade[:-1], grade[1:])]
+    cores = px.colors.qualitative.Dark24
+    com_intervalo = len(curvas['segmentos']) <= 8
+    for i, s in enumerate(curvas['segmentos']):
+        cor = cores[i % len(cores)]
+        if com_intervalo:
+            fig.add_trace(go.Scatter(x=grade + grade[::-1], y=s['ic_sup'] + s['ic_inf'][::-1], fill='toself',
+                                    fillcolor=cor, opacity=0.15, line=dict(width=0), hoverinfo='skip',
+                                    legendgroup=s['segmento'], showlegend=False), row=1, col=1)
+        fig.add_trace(go.Scatter(x=grade, y=s['sobrevivencia'], name=s['segmento'], legendgroup=s['segmento'],
+                                line=dict(color=cor, shape='hv')), row=1, col=1)
+        fig.add_trace(go.Scatter(x=meio, y=s['risco_por_mil'], name=s['segmento'], legendgroup=s['segmento'],
+                                line=dict(color=cor), showlegend=False), row=1, col=2)
+    fig.update_xaxes(title_text=rotulo_tempo)
+    fig.update_yaxes(title_text="S(t)", range=[0, 1.02], row=1, col=1)
+    fig.update_yaxes(title_text="Falhas por 1.000", row=1, col=2)
+    fig.update_layout(height=550, hovermode='x unified')
+    return fig
+
+
+def criar_tabela_sobrevivencia(curvas):
+    """Segmentos do que falha mais cedo (mediana) para o que falha mais tarde"""
+    segmentos = sorted(curvas['segmentos'], key=lambda s: s['mediana'] if s['mediana'] is not None else float('inf'))
+    return dbc.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ("Segmento", "Aeronaves", "Falhas críticas",
+                                                f"Mediana ({TEMPOS[curvas['tempo']].lower()})")])),
+        html.Tbody([
+            html.Tr([html.Td(s['segmento']), html.Td(f"{s['aeronaves']:,}"), html.Td(f"{s['falhas']:,}"),
+                    html.Td(f"{s['mediana']:,.0f}" if s['mediana'] is not None else "não atingida")])
+            for s in segmentos
+        ])
+    ], striped=True, hover=True, size="sm")
+
 # ========== LAYOUT DA PÁGINA ==========
 
 layout = html.Div([
@@ -306,6 +453,8 @@ layout = html.Div([
                 html.P("""
                     A matriz de risco classifica as aeronaves baseado em múltiplos fatores. 
                     Tamanho do ponto indica o score de risco calculado. Foque nas aeronaves no quadrante superior direito.
+                    Os círculos pretos marcam aeronaves com perfil atípico para o próprio modelo (distância robusta
+                    de Mahalanobis acima do limiar do modelo), mesmo fora desse quadrante.
                 """, className="text-muted")
             ], className="p-4")
         ], label="Risco"),
@@ -320,6 +469,63 @@ layout = html.Div([
                 """, className="text-muted")
             ], className="p-4")
         ], label="Manutenção"),
+
+        dbc.Tab([
+            html.Div([
+                html.H3("Plano de Manutenção da Frota", className="mb-4"),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Vagas de manutenção por semana", className="fw-bold"),
+                        dbc.Input(id="capacidade-semanal", type="number", min=1, step=1, value=10),
+                    ], md=4),
+                    dbc.Col([
+                        dbc.Button("Gerar plano", id="botao-plano", color="primary", className="mt-4"),
+                    ], md=2),
+                ], className="mb-4"),
+                html.Div(id="resumo-plano", className="mb-3"),
+                dcc.Graph(id="grafico-plano", className="mb-4"),
+                dash_table.DataTable(
+                    id="tabela-plano",
+                    columns=[{'name': nome, 'id': col} for col, nome in COLUNAS_PLANO],
+                    page_current=0, page_size=20, page_action='custom',
+                    sort_action='custom', sort_mode='single', sort_by=[],
+                    style_table={'overflowX': 'auto'},
+                    style_cell={'fontSize': 13, 'padding': '4px'},
+                ),
+                html.P(f"""
+                    O plano usa o risco previsto pelo modelo para cada aeronave e o risco re-calculado com a 
+                    manutenção em dia. Aeronaves com maior custo esperado por semana de atraso entram primeiro; 
+                    ficam de fora as que não pagam o custo da manutenção (falha crítica: R$ {CUSTO_FALHA:,}).
+                """, className="text-muted mt-3")
+            ], className="p-4")
+        ], label="Plano de Manutenção"),
+
+        dbc.Tab([
+            html.Div([
+                html.H3("Sobrevivência da Frota", className="mb-4"),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Tempo de uso", className="fw-bold"),
+                        dbc.RadioItems(id="sobrevivencia-tempo", value='horas_voo_total', inline=True,
+                                    options=[{'label': rotulo, 'value': coluna} for coluna, rotulo in TEMPOS.items()]),
+                    ], md=6),
+                    dbc.Col([
+                        dbc.Label("Segmentar por", className="fw-bold"),
+                        dcc.Dropdown(id="sobrevivencia-segmento", value='modelo_aeronave', clearable=False,
+                                    options=[{'label': rotulo, 'value': valor} for valor, rotulo in (
+                                        ('modelo_aeronave', "Modelo"), ('tipo_motor', "Motor"),
+                                        ('modelo_motor', "Modelo e motor"))]),
+                    ], md=4),
+                ], className="mb-4"),
+                dcc.Graph(id="grafico-sobrevivencia", className="mb-4"),
+                html.Div(id="tabela-sobrevivencia"),
+                html.P("""
+                    Cada aeronave entra com o seu uso atual: as que tiveram falha crítica são eventos e as demais
+                    são censuradas. S(t) é a fração estimada que chega a t sem falha crítica; o risco é a taxa de
+                    falha por 1.000 horas (ou ciclos) em cada faixa de uso.
+                """, className="text-muted mt-3")
+            ], className="p-4")
+        ], label="Sobrevivência"),
         
         dbc.Tab([
             html.Div([
@@ -353,16 +559,107 @@ layout = html.Div([
     Output("analise-manutencao", "figure"),
     Output("analise-modelo", "figure"),
     Output("kpis-relatorio", "children")],
-    [Input("analise-temporal", "id")]  # Trigger inicial
+    [Input("analise-temporal", "id")],  # Trigger inicial
+    State("url", "search")
 )
-def atualizar_analises(_):
-    """Atualiza todas as análises quando a página carrega"""
+def atualizar_analises(_, search=None):
+    """Atualiza todas as análises quando a página carrega (só a partição da companhia, se houver)"""
+    return resultado_em_cache('analises', companhia_da_url(search), (), montar_analises)
+
+
+def resultado_em_cache(nome, companhia, argumentos, calcular):
+    """calcular(dados) da frota inteira ou da partição da companhia, pelo cache em disco (e o da companhia)"""
+    if companhia is None:
+        return cache_disco.obter(nome, impressao_arquivo(ARQUIVO_DADOS), argumentos,
+                                lambda: calcular(dados_frota()))
+    return cache_companhias.obter(companhia, (nome,) + tuple(argumentos), lambda: cache_disco.obter(
+        nome, impressao_arquivo(caminho_particao(companhia)), (companhia,) + tuple(argumentos),
+        lambda: calcular(dados_companhia(companhia))))
+
+
+@ao_aquecer
+def aquecer_analises():
+    """Análises da frota (e a aba de sobrevivência padrão) no cache em disco antes do primeiro acesso"""
+    atualizar_analises(None)
+    atualizar_sobrevivencia('horas_voo_total', 'modelo_aeronave')
+
+
+def montar_analises(dados):
     return (
-        criar_analise_temporal(),
-        criar_analise_risco(),
-        criar_analise_manutencao(),
-        criar_analise_detalhada_modelo(),
-        criar_relatorio_kpis()
+        criar_analise_temporal(dados),
+        criar_analise_risco(dados),
+        criar_analise_manutencao(dados),
+        criar_analise_detalhada_modelo(dados),
+        criar_relatorio_kpis(dados)
     )
 
-print("Módulo de análises avançadas carregado!")
\ No newline at end of file
+@app.callback(
+    [Output("grafico-sobrevivencia", "figure"),
+    Output("tabela-sobrevivencia", "children")],
+    [Input("sobrevivencia-tempo", "value"),
+    Input("sobrevivencia-segmento", "value")],
+    State("url", "search")
+)
+def atualizar_sobrevivencia(tempo, segmento, search=None):
+    """Curvas de sobrevivência do segmento escolhido (calculadas uma vez por dataset, via cache)"""
+    tempo = tempo if tempo in TEMPOS else 'horas_voo_total'
+    segmento = segmento if segmento in SEGMENTOS else 'modelo_aeronave'
+    return resultado_em_cache('sobrevivencia', companhia_da_url(search), (tempo, segmento),
+                            lambda dados: montar_sobrevivencia(curvas_sobrevivencia(dados, tempo, segmento)))
+
+
+def montar_sobrevivencia(curvas):
+    if not curvas['segmentos']:
+        return px.line(title="Dados não disponíveis"), dbc.Alert(
+            f"Nenhum segmento com pelo menos {MIN_AERONAVES} aeronaves: escolha uma segmentação menos fina.",
+            color="warning")
+    return criar_grafico_sobrevivencia(curvas), criar_tabela_sobrevivencia(curvas)
+
+
+@app.callback(
+    [Output("resumo-plano", "children"),
+    Output("grafico-plano", "figure")],
+    Input("botao-plano", "n_clicks"),
+    [State("capacidade-semanal", "value"),
+    State("url", "search")]
+)
+def atualizar_plano(_, capacidade, search=None):
+    """Resumo e gráfico do plano para a capacidade informada"""
+    companhia = companhia_da_url(search)
+    if scores_companhia(companhia)[0] is None:
+        return dbc.Alert("Modelo não carregado. Execute o script de treinamento primeiro.", color="danger"), {}
+    totais, por_semana = resumo_plano(plano_companhia(max(1, int(capacidade or 1)), companhia))
+    resumo = dbc.Row([
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H4(f"{valor}", className=f"text-{cor}"), html.P(rotulo, className="text-muted mb-0")
+        ]), className="text-center border-0 shadow-sm"), md=3)
+        for valor, rotulo, cor in (
+            (totais['agendadas'], "Aeronaves agendadas", "primary"),
+            (totais['sem_vaga'], "Sem vaga ou sem retorno", "secondary"),
+            (f"R$ {totais['custo_manutencao_total']:,.0f}", "Custo das manutenções", "warning"),
+            (f"R$ {totais['economia_total']:,.0f}", "Economia esperada", "success"),
+        )
+    ])
+    return resumo, criar_grafico_plano(por_semana)
+
+
+@app.callback(
+    Output("tabela-plano", "data"),
+    [Input("botao-plano", "n_clicks"),
+    Input("tabela-plano", "page_current"),
+    Input("tabela-plano", "page_size"),
+    Input("tabela-plano", "sort_by")],
+    [State("capacidade-semanal", "value"),
+    State("url", "search")]
+)
+def paginar_plano(_, pagina, tamanho, ordenacao, capacidade, search=None):
+    """Só a página visível vai para o navegador (o plano fica em cache no servidor)"""
+    companhia = companhia_da_url(search)
+    if scores_companhia(companhia)[0] is None:
+        return []
+    plano = plano_companhia(max(1, int(capacidade or 1)), companhia)
+    if ordenacao:
+        plano = plano.sort_values(ordenacao[0]['column_id'], ascending=ordenacao[0]['direction'] == 'asc')
+    pagina_plano = plano.iloc[pagina * tamanho:(pagina + 1) * tamanho][[col for col, _ in COLUNAS_PLANO]]
+    return pagina_plano.round({'risco': 3, 'risco_pos_manutencao': 3, 'custo_manutencao': 0,
+                            'economia_esperada': 0}).to_dict('records')
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime
+import numpy as np
+from dash import dcc, html, Input, Output, State, Patch, no_update
+import dash_bootstrap_components as dbc
+from app import app
+from fluxo_telemetria import fluxo_servico
+
+# Página ao vivo: a cada segundo o navegador recebe só o que mudou desde o
+# último tique -- um ponto novo na linha da taxa de falha e os eventos novos no
+# dispersão (extendData, com o histórico limitado por maxPoints no navegador)
+# e os valores y das barras por modelo (Patch). As figuras inteiras são
+# enviadas uma única vez, ao abrir a página.
+
+INTERVALO_MS = 1000
+PONTOS_LINHA = 300
+PONTOS_DISPERSAO = 2000
+
+
+def criar_layout():
+    buffer = fluxo_servico()
+    agregados = buffer.agregados()
+    return dbc.Container([
+        html.H1("Telemetria ao Vivo", className="text-center my-4"),
+        html.P(f"Inspeções chegando da fonte local; janela dos últimos {buffer.capacidade:,} eventos",
+            className="text-center text-muted mb-4"),
+        dcc.Interval(id="intervalo-ao-vivo", interval=INTERVALO_MS),
+        dcc.Store(id="cursor-ao-vivo", data={'cursor': buffer.total, 'instante': time.time()}),
+        html.Div(id="kpis-ao-vivo", className="mb-3"),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="linha-ao-vivo", config={'displayModeBar': False}, figure={
+                'data': [{'type': 'scatter', 'mode': 'lines', 'name': 'taxa de falha', 'x': [], 'y': []}],
+                'layout': {'title': "Taxa de falha na janela", 'height': 350, 'yaxis': {'tickformat': '.1%'},
+                        'margin': dict(l=50, r=20, t=60, b=40)},
+            }), md=6),
+            dbc.Col(dcc.Graph(id="barras-ao-vivo", config={'displayModeBar': False}, figure={
+                'data': [{'type': 'bar', 'name': 'taxa de falha', 'x': agregados['modelo_aeronave'].tolist(),
+                        'y': agregados['taxa_falha'].tolist(), 'marker': {'color': '#e74c3c'}}],
+                'layout': {'title': "Taxa de falha por modelo (janela)", 'height': 350,
+                        'yaxis': {'tickformat': '.0%'}, 'margin': dict(l=50, r=20, t=60, b=80)},
+            }), md=6),
+        ]),
+        dcc.Graph(id="dispersao-ao-vivo", config={'displayModeBar': False}, figure={
+            'data': [
+                {'type': 'scattergl', 'mode': 'markers', 'name': nome, 'x': [], 'y': [],
+                'marker': {'color': cor, 'size': 4, 'opacity': 0.6}}
+                for nome, cor in (('sem falha', '#2ecc71'), ('falha crítica', '#e74c3c'))
+            ],
+            'layout': {'title': f"Últimos {PONTOS_DISPERSAO:,} eventos", 'height': 400,
+                    'xaxis': {'title': "Horas de voo"}, 'yaxis': {'title': "Idade (anos)"},
+                    'margin': dict(l=50, r=20, t=60, b=50)},
+        }),
+    ], className="container")
+
+
+@app.callback(
+    [Output("linha-ao-vivo", "extendData"),
+    Output("dispersao-ao-vivo", "extendData"),
+    Output("barras-ao-vivo", "figure"),
+    Output("kpis-ao-vivo", "children"),
+    Output("cursor-ao-vivo", "data")],
+    Input("intervalo-ao-vivo", "n_intervals"),
+    State("cursor-ao-vivo", "data"),
+    prevent_initial_call=True
+)
+def atualizar_ao_vivo(_, estado):
+    buffer = fluxo_servico()
+    eventos, cursor = buffer.desde(estado['cursor'], limite=PONTOS_DISPERSAO)
+    if cursor == estado['cursor']:
+        return no_update, no_update, no_update, no_update, no_update
+
+    agora = time.time()
+    agregados = buffer.agregados()
+    taxa = agregados['falhas'].sum() / max(agregados['inspecoes'].sum(), 1)
+    linha = ({'x': [[datetime.now().strftime('%H:%M:%S')]], 'y': [[float(taxa)]]}, [0], PONTOS_LINHA)
+
+    falha = eventos['falha_critica'] > 0
+    dispersao = ({
+        'x': [eventos['horas_voo_total'][~falha].tolist(), eventos['horas_voo_total'][falha].tolist()],
+        'y': [np.round(eventos['idade_aeronave_anos'][~falha], 2).tolist(),
+            np.round(eventos['idade_aeronave_anos'][falha], 2).tolist()],
+    }, [0, 1], PONTOS_DISPERSAO)
+
+    barras = Patch()
+    barras['data'][0]['y'] = agregados['taxa_falha'].round(4).tolist()
+
+    por_segundo = (cursor - estado['cursor']) / max(agora - estado['instante'], 1e-3)
+    kpis = dbc.Row([
+        dbc.Col(dbc.Card(dbc.CardBody([html.H4(f"{valor}"), html.Small(rotulo, className="text-muted")]),
+                        className="text-center"), md=3)
+        for valor, rotulo in ((f"{por_segundo:,.0f}", "eventos/s"), (f"{cursor:,}", "eventos recebidos"),
+                            (f"{buffer.na_janela:,}", "eventos na janela"), (f"{taxa:.1%}", "taxa de falha"))
+    ])
+    return linha, dispersao, barras, kpis, {'cursor': cursor, 'instante': agora}
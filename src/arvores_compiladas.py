@@ -0,0 +1,484 @@
+import json
+import numpy as np
+
+# Ensemble de árvores "compilado" em arrays NumPy contíguos.
+# Permite servir o modelo sem importar xgboost/sklearn nem deserializar o
+# XGBClassifier: o carregamento é um np.load e a predição percorre todas as
+# árvores de um lote de uma vez só.
+
+ARQUIVO_ARVORES = "arvores_modelo.npz"
+ARQUIVO_MODELO_CLIENTE = "modelo_cliente.json"
+
+
+def _margem_base(objetivo, base_score):
+    """Converte o base_score do XGBoost para o espaço de margem"""
+    if objetivo == "binary:logistic":
+        return float(np.log(base_score / (1.0 - base_score)))
+    return float(base_score)
+
+
+def probabilidades_de_margem(margem, objetivo):
+    """Margem (n, n_grupos) -> probabilidades no formato do XGBClassifier.predict_proba"""
+    if objetivo == "binary:logistic":
+        p = 1.0 / (1.0 + np.exp(-margem[:, 0]))
+        return np.column_stack([1.0 - p, p])
+    margem = margem - margem.max(axis=1, keepdims=True)
+    exp = np.exp(margem)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class EnsembleCompilado:
+    """Ensemble de árvores representado por arrays planos (um nó por posição)"""
+
+    def __init__(self, feature, limiar, esquerda, direita, padrao_esquerda, valor,
+                raizes, grupos, margem_base, profundidade, n_grupos, objetivo, features,
+                linha_categoria=None, mapa_categorias=None, media=None):
+        self.feature = feature
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.padrao_esquerda = padrao_esquerda
+        self.valor = valor
+        self.raizes = raizes
+        self.grupos = grupos
+        # Escalar, ou um valor por grupo em ensembles combinados
+        self.margem_base = float(margem_base) if np.ndim(margem_base) == 0 else np.asarray(margem_base, dtype=np.float64)
+        self.profundidade = int(profundidade)
+        self.n_grupos = int(n_grupos)
+        self.objetivo = str(objetivo)
+        self.features = [str(f) for f in features]
+
+        # Splits categóricos: linha_categoria[nó] indexa mapa_categorias (-1 = split numérico);
+        # mapa_categorias[linha, código] é True quando a categoria vai para a direita
+        if linha_categoria is None:
+            linha_categoria = np.full(len(feature), -1, dtype=np.int32)
+            mapa_categorias = np.zeros((0, 0), dtype=bool)
+        self.linha_categoria = linha_categoria
+        self.mapa_categorias = mapa_categorias
+        self._tem_categoricos = mapa_categorias.shape[0] > 0
+
+        # Valor esperado de cada nó (média das folhas ponderada pela cobertura), usado
+        # nas contribuições por caminho; None em ensembles exportados antes dele existir
+        self.media = media
+
+        # Matriz árvore -> grupo (classe) para somar as folhas com um único produto
+        self._matriz_grupos = np.zeros((len(raizes), self.n_grupos), dtype=np.float32)
+        self._matriz_grupos[np.arange(len(raizes)), grupos] = 1.0
+
+        # Filhos intercalados: posição 2*nó é a direita e 2*nó+1 a esquerda
+        self._filhos = np.stack([direita, esquerda], axis=1).ravel().astype(np.int32)
+
+    # ========== PERSISTÊNCIA ==========
+
+    def para_arrays(self):
+        """Arrays que representam o ensemble (usados também pelo pacote do modelo)"""
+        return {
+            'feature': self.feature,
+            'limiar': self.limiar,
+            'esquerda': self.esquerda,
+            'direita': self.direita,
+            'padrao_esquerda': self.padrao_esquerda,
+            'valor': self.valor,
+            'raizes': self.raizes,
+            'grupos': self.grupos,
+            'margem_base': np.asarray(self.margem_base, dtype=np.float64),
+            'profundidade': np.int32(self.profundidade),
+            'n_grupos': np.int32(self.n_grupos),
+            'objetivo': np.array(self.objetivo),
+            'features': np.array(self.features),
+            'linha_categoria': self.linha_categoria,
+            'mapa_categorias': self.mapa_categorias,
+            **({'media': self.media} if self.media is not None else {})
+        }
+
+    @classmethod
+    def de_arrays(cls, arrays):
+        """Reconstrói o ensemble a partir de para_arrays()"""
+        return cls(
+            arrays['feature'], arrays['limiar'], arrays['esquerda'], arrays['direita'],
+            arrays['padrao_esquerda'], arrays['valor'], arrays['raizes'], arrays['grupos'],
+            arrays['margem_base'][()], arrays['profundidade'][()], arrays['n_grupos'][()],
+            arrays['objetivo'][()], arrays['features'].tolist(),
+            arrays['linha_categoria'] if 'linha_categoria' in arrays else None,
+            arrays['mapa_categorias'] if 'mapa_categorias' in arrays else None,
+            arrays['media'] if 'media' in arrays else None
+        )
+
+    def salvar(self, caminho=ARQUIVO_ARVORES):
+        """Salva os arrays em um .npz (sem pickle)"""
+        np.savez(caminho, **self.para_arrays())
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_ARVORES):
+        """Carrega um ensemble salvo com salvar()"""
+        with np.load(caminho, allow_pickle=False) as arq:
+            return cls.de_arrays(arq)
+
+    # ========== AVALIAÇÃO ==========
+
+    def _matriz(self, X):
+        """Aceita DataFrame (reordenado pelas features do modelo) ou array"""
+        if hasattr(X, 'columns'):
+            X = X[self.features].to_numpy()
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_margin(self, X, tamanho_lote=4096):
+        """Margem bruta (n, n_grupos) somando as folhas de todas as árvores"""
+        X = self._matriz(X)
+        n, n_features = X.shape
+        margem = np.empty((n, self.n_grupos), dtype=np.float64)
+
+        for inicio in range(0, n, tamanho_lote):
+            bloco = X[inicio:inicio + tamanho_lote]
+            plano = bloco.ravel()
+            base_linhas = (np.arange(bloco.shape[0], dtype=np.int32) * n_features)[:, None]
+            nos = np.broadcast_to(self.raizes, (bloco.shape[0], len(self.raizes))).copy()
+            tem_nan = np.isnan(bloco).any()
+
+            # Folhas apontam para si mesmas, então basta iterar até a profundidade máxima
+            for _ in range(self.profundidade):
+                nos = self._descer(nos, plano, base_linhas, tem_nan)
+
+            margem[inicio:inicio + tamanho_lote] = self.valor.take(nos) @ self._matriz_grupos
+
+        return margem + self.margem_base
+
+    def _descer(self, nos, plano, base_linhas, tem_nan):
+        """Um nível abaixo em todas as árvores de todas as linhas do bloco"""
+        valores = plano.take(base_linhas + self.feature.take(nos))
+        ir_esquerda = valores < self.limiar.take(nos)
+        if self._tem_categoricos:
+            ir_esquerda = self._decisao_categorica(nos, valores, ir_esquerda)
+        if tem_nan:
+            ir_esquerda = np.where(np.isnan(valores), self.padrao_esquerda.take(nos), ir_esquerda)
+        return self._filhos.take(nos * 2 + ir_esquerda.view(np.int8))
+
+    def contribuicoes_caminho(self, X, tamanho_lote=4096):
+        """Atribuição por caminho (Saabas): matriz (n, n_features + 1) em log-odds
+
+        Cada split do caminho credita à sua feature a variação do valor esperado
+        do nó; a última coluna é a base (margem_base + valor esperado das raízes),
+        e base + soma das contribuições = margem. Mesmo resultado do
+        pred_contribs(approx_contribs=True) do XGBoost, sem importar xgboost."""
+        if self.media is None:
+            raise ValueError("Ensemble exportado sem o valor esperado dos nós: exporte novamente")
+        if self.n_grupos != 1:
+            raise ValueError("Contribuições por caminho só para ensembles de um grupo (binário)")
+        X = self._matriz(X)
+        n, n_features = X.shape
+        contribuicoes = np.zeros((n, n_features + 1), dtype=np.float64)
+        contribuicoes[:, -1] = self.margem_base + self.media.take(self.raizes).astype(np.float64).sum()
+
+        for inicio in range(0, n, tamanho_lote):
+            bloco = X[inicio:inicio + tamanho_lote]
+            plano = bloco.ravel()
+            base_linhas = (np.arange(bloco.shape[0], dtype=np.int32) * n_features)[:, None]
+            # Índice (linha, feature) achatado na matriz de contribuições do bloco
+            base_saida = (np.arange(bloco.shape[0], dtype=np.int64) * (n_features + 1))[:, None]
+            nos = np.broadcast_to(self.raizes, (bloco.shape[0], len(self.raizes))).copy()
+            tem_nan = np.isnan(bloco).any()
+            soma = np.zeros(bloco.shape[0] * (n_features + 1), dtype=np.float64)
+
+            # Nas folhas o filho é o próprio nó e a variação é zero
+            for _ in range(self.profundidade):
+                filhos = self._descer(nos, plano, base_linhas, tem_nan)
+                variacao = self.media.take(filhos).astype(np.float64) - self.media.take(nos)
+                soma += np.bincount((base_saida + self.feature.take(nos)).ravel(),
+                                    weights=variacao.ravel(), minlength=len(soma))
+                nos = filhos
+
+            contribuicoes[inicio:inicio + tamanho_lote] += soma.reshape(bloco.shape[0], n_features + 1)
+
+        return contribuicoes
+
+    def _decisao_categorica(self, nos, valores, ir_esquerda):
+        """Categoria no conjunto do nó vai para a direita; código inválido vai para a esquerda"""
+        linhas = self.linha_categoria.take(nos)
+        categorico = linhas >= 0
+        if not categorico.any():
+            return ir_esquerda
+        n_codigos = self.mapa_categorias.shape[1]
+        valido = categorico & (valores >= 0) & (valores < n_codigos)
+        direita = np.zeros_like(categorico)
+        direita[valido] = self.mapa_categorias[linhas[valido], valores[valido].astype(np.int64)]
+        return np.where(categorico, ~direita, ir_esquerda)
+
+    def predict_proba(self, X):
+        """Probabilidades no mesmo formato do XGBClassifier.predict_proba"""
+        return probabilidades_de_margem(self.predict_margin(X), self.objetivo)
+
+    def predict(self, X):
+        """Classe prevista (limiar 0.5 no caso binário)"""
+        return self.predict_proba(X).argmax(axis=1)
+
+
+class RoteadorSegmentos:
+    """Um ensemble especialista por segmento (ex.: modelo_aeronave) + ensemble global
+
+    Cada linha é despachada pelo código da feature de segmento; segmentos sem
+    especialista (raros no treino ou desconhecidos) usam o global. O lote é
+    agrupado por segmento, então cada ensemble é chamado uma vez por lote."""
+
+    def __init__(self, feature_segmento, codigos, especialistas, global_):
+        self.feature_segmento = str(feature_segmento)
+        self.codigos = np.asarray(codigos, dtype=np.float32)
+        self.especialistas = list(especialistas)
+        self.global_ = global_
+        self.features = global_.features
+        self.objetivo = global_.objetivo
+        self.n_grupos = global_.n_grupos
+        self.indice_segmento = self.features.index(self.feature_segmento)
+
+    # ========== PERSISTÊNCIA ==========
+
+    def para_arrays(self):
+        """Arrays do global e de cada especialista (prefixos global_ e segN_)"""
+        arrays = {
+            'segmento_feature': np.array(self.feature_segmento),
+            'segmento_codigos': self.codigos,
+        }
+        arrays.update({f"global_{k}": v for k, v in self.global_.para_arrays().items()})
+        for i, especialista in enumerate(self.especialistas):
+            arrays.update({f"seg{i}_{k}": v for k, v in especialista.para_arrays().items()})
+        return arrays
+
+    @classmethod
+    def de_arrays(cls, arrays):
+        """Reconstrói o roteador a partir de para_arrays()"""
+        def sub(prefixo):
+            return EnsembleCompilado.de_arrays(
+                {k[len(prefixo):]: arrays[k] for k in arrays if k.startswith(prefixo)}
+            )
+        codigos = arrays['segmento_codigos']
+        return cls(arrays['segmento_feature'][()], codigos,
+                [sub(f"seg{i}_") for i in range(len(codigos))], sub("global_"))
+
+    # ========== AVALIAÇÃO ==========
+
+    def segmentos(self, X):
+        """Índice do especialista de cada linha (len(especialistas) = global)"""
+        if not len(self.codigos):
+            return np.zeros(len(X), dtype=np.int64)
+        valores = X[:, self.indice_segmento]
+        posicao = np.searchsorted(self.codigos, valores).clip(0, len(self.codigos) - 1)
+        return np.where(self.codigos.take(posicao) == valores, posicao, len(self.especialistas))
+
+    def predict_margin(self, X):
+        """Margem (n, n_grupos); cada ensemble recebe só as linhas do seu segmento"""
+        X = self.global_._matriz(X)
+        margem = np.empty((len(X), self.n_grupos), dtype=np.float64)
+        ensembles = self.especialistas + [self.global_]
+
+        segmentos = self.segmentos(X)
+        ordem = np.argsort(segmentos, kind='stable')
+        limites = np.searchsorted(segmentos[ordem], np.arange(len(ensembles) + 1))
+        for i, ensemble in enumerate(ensembles):
+            linhas = ordem[limites[i]:limites[i + 1]]
+            if len(linhas):
+                margem[linhas] = ensemble.predict_margin(X[linhas])
+        return margem
+
+    def contribuicoes_caminho(self, X):
+        """Atribuição por caminho; cada linha é explicada pelo ensemble que a pontua"""
+        X = self.global_._matriz(X)
+        contribuicoes = np.empty((len(X), X.shape[1] + 1), dtype=np.float64)
+        segmentos = self.segmentos(X)
+        for i, ensemble in enumerate(self.especialistas + [self.global_]):
+            linhas = np.flatnonzero(segmentos == i)
+            if len(linhas):
+                contribuicoes[linhas] = ensemble.contribuicoes_caminho(X[linhas])
+        return contribuicoes
+
+    def predict_proba(self, X):
+        """Probabilidades no mesmo formato do XGBClassifier.predict_proba"""
+        return probabilidades_de_margem(self.predict_margin(X), self.objetivo)
+
+    def predict(self, X):
+        """Classe prevista (limiar 0.5 no caso binário)"""
+        return self.predict_proba(X).argmax(axis=1)
+
+
+def combinar_ensembles(ensembles):
+    """Junta ensembles sobre as mesmas features em um só, com os grupos lado a lado
+
+    Uma única passada pelas árvores devolve a margem de todos os modelos
+    (ex.: coluna 0 = falha_critica, colunas 1.. = tipo_falha). A função de
+    ligação de cada bloco de colunas fica a cargo de quem chama."""
+    features = ensembles[0].features
+    if any(e.features != features for e in ensembles):
+        raise ValueError("Ensembles com features diferentes não podem ser combinados")
+
+    deslocamentos = np.cumsum([0] + [len(e.feature) for e in ensembles])
+    grupos_antes = np.cumsum([0] + [e.n_grupos for e in ensembles])
+    linhas_antes = np.cumsum([0] + [e.mapa_categorias.shape[0] for e in ensembles])
+
+    n_codigos = max(e.mapa_categorias.shape[1] for e in ensembles)
+    mapa_categorias = np.zeros((linhas_antes[-1], n_codigos), dtype=bool)
+    for e, linha in zip(ensembles, linhas_antes):
+        mapa_categorias[linha:linha + e.mapa_categorias.shape[0], :e.mapa_categorias.shape[1]] = e.mapa_categorias
+
+    return EnsembleCompilado(
+        np.concatenate([e.feature for e in ensembles]),
+        np.concatenate([e.limiar for e in ensembles]),
+        np.concatenate([e.esquerda + d for e, d in zip(ensembles, deslocamentos)]).astype(np.int32),
+        np.concatenate([e.direita + d for e, d in zip(ensembles, deslocamentos)]).astype(np.int32),
+        np.concatenate([e.padrao_esquerda for e in ensembles]),
+        np.concatenate([e.valor for e in ensembles]),
+        np.concatenate([e.raizes + d for e, d in zip(ensembles, deslocamentos)]).astype(np.int32),
+        np.concatenate([e.grupos + g for e, g in zip(ensembles, grupos_antes)]).astype(np.int32),
+        np.concatenate([np.broadcast_to(e.margem_base, e.n_grupos) for e in ensembles]),
+        max(e.profundidade for e in ensembles), grupos_antes[-1], "conjunto", features,
+        np.concatenate([np.where(e.linha_categoria >= 0, e.linha_categoria + l, -1)
+                        for e, l in zip(ensembles, linhas_antes)]).astype(np.int32),
+        mapa_categorias,
+        np.concatenate([e.media for e in ensembles]) if all(e.media is not None for e in ensembles) else None
+    )
+
+
+def ensemble_de_arrays(arrays):
+    """EnsembleCompilado ou RoteadorSegmentos, conforme os arrays salvos"""
+    if 'segmento_codigos' in arrays:
+        return RoteadorSegmentos.de_arrays(arrays)
+    return EnsembleCompilado.de_arrays(arrays)
+
+
+# ========== EXPORTAÇÃO ==========
+
+def exportar_arvores(modelo):
+    """Achata o booster treinado (XGBClassifier ou Booster) em um EnsembleCompilado"""
+    booster = modelo.get_booster() if hasattr(modelo, 'get_booster') else modelo
+    learner = json.loads(booster.save_raw('json'))['learner']
+
+    objetivo = learner['objective']['name']
+    if objetivo not in ("binary:logistic", "multi:softprob", "multi:softmax"):
+        raise ValueError(f"Objetivo não suportado: {objetivo}")
+
+    parametros = learner['learner_model_param']
+    n_grupos = max(1, int(parametros['num_class']))
+    modelo_json = learner['gradient_booster']['model']
+    arvores = modelo_json['trees']
+
+    feature, limiar, esquerda, direita, padrao_esquerda, valor, media = [], [], [], [], [], [], []
+    linha_categoria, conjuntos_categorias = [], []
+    raizes = []
+    profundidade = 0
+    deslocamento = 0
+
+    for arvore in arvores:
+        esq = np.asarray(arvore['left_children'], dtype=np.int32)
+        dir_ = np.asarray(arvore['right_children'], dtype=np.int32)
+        n_nos = len(esq)
+        ids = np.arange(n_nos, dtype=np.int32)
+        folha = esq == -1
+
+        # Folhas apontam para si mesmas; o valor da folha fica em split_conditions
+        esq = np.where(folha, ids, esq) + deslocamento
+        dir_ = np.where(folha, ids, dir_) + deslocamento
+        condicoes = np.asarray(arvore['split_conditions'], dtype=np.float32)
+
+        feature.append(np.where(folha, 0, arvore['split_indices']).astype(np.int32))
+        limiar.append(np.where(folha, np.inf, condicoes).astype(np.float32))
+        valor.append(np.where(folha, condicoes, 0.0).astype(np.float32))
+        esquerda.append(esq)
+        direita.append(dir_)
+        padrao_esquerda.append(np.asarray(arvore['default_left'], dtype=bool))
+        raizes.append(deslocamento)
+
+        # Conjuntos de categorias (que vão para a direita) dos splits categóricos
+        linhas = np.full(n_nos, -1, dtype=np.int32)
+        for no, inicio, tamanho in zip(arvore['categories_nodes'], arvore['categories_segments'],
+                                    arvore['categories_sizes']):
+            linhas[no] = len(conjuntos_categorias)
+            conjuntos_categorias.append(arvore['categories'][inicio:inicio + tamanho])
+        linha_categoria.append(linhas)
+
+        # Profundidade da árvore a partir do vetor de pais
+        pais = np.asarray(arvore['parents'], dtype=np.int64)
+        prof = np.zeros(n_nos, dtype=np.int32)
+        for no in range(1, n_nos):
+            prof[no] = prof[pais[no]] + 1
+        profundidade = max(profundidade, int(prof.max()))
+
+        # Valor esperado dos nós, das folhas para a raiz (média dos filhos pela cobertura)
+        cobertura = np.asarray(arvore['sum_hessian'], dtype=np.float64)
+        medias = np.where(folha, condicoes, 0.0).astype(np.float64)
+        filhos_esq, filhos_dir = np.asarray(arvore['left_children']), np.asarray(arvore['right_children'])
+        for no in np.argsort(-prof, kind='stable'):
+            if not folha[no]:
+                e, d = filhos_esq[no], filhos_dir[no]
+                medias[no] = (cobertura[e] * medias[e] + cobertura[d] * medias[d]) / cobertura[no]
+        media.append(medias.astype(np.float32))
+        deslocamento += n_nos
+
+    n_codigos = max((max(c) + 1 for c in conjuntos_categorias if c), default=0)
+    mapa_categorias = np.zeros((len(conjuntos_categorias), n_codigos), dtype=bool)
+    for linha, categorias in enumerate(conjuntos_categorias):
+        mapa_categorias[linha, categorias] = True
+
+    grupos = np.asarray(modelo_json['tree_info'], dtype=np.int32)
+    features = learner.get('feature_names') or [f"f{i}" for i in range(int(parametros['num_feature']))]
+
+    return EnsembleCompilado(
+        np.concatenate(feature), np.concatenate(limiar),
+        np.concatenate(esquerda), np.concatenate(direita),
+        np.concatenate(padrao_esquerda), np.concatenate(valor),
+        np.asarray(raizes, dtype=np.int32), grupos,
+        _margem_base(objetivo, float(parametros['base_score'])),
+        profundidade, n_grupos, objetivo, features,
+        np.concatenate(linha_categoria), mapa_categorias, np.concatenate(media)
+    )
+
+
+def _floats_compactos(valores):
+    """float32 -> lista com 9 dígitos significativos (ida e volta exata em float32)"""
+    return [float(f"{v:.9g}") for v in valores.tolist()]
+
+
+def _arvores_cliente(ensemble):
+    """Arrays das árvores de um EnsembleCompilado no formato lido por previsao_cliente.js"""
+    folha = ensemble.esquerda == np.arange(len(ensemble.esquerda))
+    return {
+        # Splits categóricos nativos: nó -> códigos que vão para a direita
+        'categorias_direita': {
+            str(no): np.flatnonzero(ensemble.mapa_categorias[linha]).tolist()
+            for no, linha in enumerate(ensemble.linha_categoria) if linha >= 0
+        },
+        'margem_base': ensemble.margem_base,
+        'raizes': ensemble.raizes.tolist(),
+        'feature': ensemble.feature.tolist(),
+        # Folhas e splits categóricos não usam limiar (o XGBoost grava NaN nos categóricos)
+        'limiar': _floats_compactos(np.where(folha | ~np.isfinite(ensemble.limiar), 0.0, ensemble.limiar)),
+        'esquerda': ensemble.esquerda.tolist(),
+        'direita': ensemble.direita.tolist(),
+        'padrao_esquerda': ensemble.padrao_esquerda.astype(int).tolist(),
+        'valor': _floats_compactos(ensemble.valor)
+    }
+
+
+def exportar_json_cliente(ensemble, vocabularios, caminho=ARQUIVO_MODELO_CLIENTE):
+    """Exporta ensemble (ou roteador) + codificação das categorias em JSON compacto para o navegador"""
+    if ensemble.objetivo != "binary:logistic":
+        raise ValueError("A prévia no navegador só suporta o modelo binário")
+
+    roteador = isinstance(ensemble, RoteadorSegmentos)
+    modelo_cliente = {
+        'features': ensemble.features,
+        'categorias': {
+            col: {classe: codigo for codigo, classe in enumerate(classes)}
+            for col, classes in vocabularios.items()
+            if col in ensemble.features or f"{col}_encoded" in ensemble.features
+        },
+        **_arvores_cliente(ensemble.global_ if roteador else ensemble),
+    }
+    if roteador:
+        # Especialistas por código do segmento; o nível de cima é o global
+        modelo_cliente['segmento_feature'] = ensemble.indice_segmento
+        modelo_cliente['segmentos'] = {
+            str(int(codigo)): _arvores_cliente(especialista)
+            for codigo, especialista in zip(ensemble.codigos, ensemble.especialistas)
+        }
+
+    with open(caminho, 'w', encoding='utf-8') as arq:
+        json.dump(modelo_cliente, arq, ensure_ascii=False, separators=(',', ':'))
+    return modelo_cliente
+
@@ -0,0 +1,96 @@
+// Callbacks do formulário executados no navegador.
+// A prévia de risco percorre o mesmo ensemble exportado por
+// arvores_compiladas.exportar_json_cliente; o resultado oficial continua
+// sendo o do callback prever_falha_aviacao no servidor.
+// Modelos segmentados trazem um ensemble especialista por código do segmento
+// em "segmentos"; segmentos sem especialista usam o global (nível de cima).
+// O layout só traz a URL do modelo (com a versão); o JSON é baixado uma vez
+// por página e reaproveitado em todas as prévias.
+
+const modelosCarregados = {};
+
+function carregarModelo(url) {
+    if (!(url in modelosCarregados)) {
+        modelosCarregados[url] = fetch(url)
+            .then(resposta => resposta.ok ? resposta.json() : null)
+            .catch(() => null);
+    }
+    return modelosCarregados[url];
+}
+
+function margemEnsemble(modelo, x) {
+    let soma = 0;
+    for (let t = 0; t < modelo.raizes.length; t++) {
+        let no = modelo.raizes[t];
+        // Folhas apontam para si mesmas
+        while (modelo.esquerda[no] !== no) {
+            const valor = x[modelo.feature[no]];
+            const direita = (modelo.categorias_direita || {})[no];
+            let irEsquerda;
+            if (Number.isNaN(valor)) {
+                irEsquerda = modelo.padrao_esquerda[no] === 1;
+            } else if (direita !== undefined) {
+                // Split categórico: categorias do conjunto vão para a direita
+                irEsquerda = !direita.includes(valor);
+            } else {
+                irEsquerda = Math.fround(valor) < Math.fround(modelo.limiar[no]);
+            }
+            no = irEsquerda ? modelo.esquerda[no] : modelo.direita[no];
+        }
+        soma += Math.fround(modelo.valor[no]);
+    }
+    return soma + modelo.margem_base;
+}
+
+function codificar(modelo, coluna, valor) {
+    const codigos = modelo.categorias[coluna] || {};
+    // Categoria desconhecida vira valor ausente (segue o ramo padrão)
+    return valor in codigos ? codigos[valor] : NaN;
+}
+
+function previa(modelo, entradas) {
+    // Features "col_encoded" (LabelEncoder) ou "col" (categórica nativa) usam o mesmo código
+    const x = modelo.features.map(f => {
+        const coluna = f.replace(/_encoded$/, "");
+        if (coluna in modelo.categorias) {
+            return codificar(modelo, coluna, entradas[coluna]);
+        }
+        return f in entradas ? entradas[f] : NaN;
+    });
+
+    const especialista = (modelo.segmentos || {})[String(x[modelo.segmento_feature])];
+    const risco = 100 / (1 + Math.exp(-margemEnsemble(especialista || modelo, x)));
+    const cor = risco > 80 ? "text-danger" : risco > 60 ? "text-warning" : risco > 50 ? "text-info" : "text-success";
+    return [
+        `Prévia do risco: ${risco.toFixed(1)}% (estimativa local — clique em Prever para o resultado oficial)`,
+        `text-center fw-bold mt-3 ${cor}`
+    ];
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    aviacao: {
+        validar_formulario: function (...campos) {
+            return campos.some(campo => campo === null || campo === undefined || campo === "");
+        },
+
+        prever_risco: function (modelo_aeronave, tipo_motor, idade_aeronave, horas_voo,
+                                ultima_manutencao, ciclos_pouso, temperatura_media, url_modelo) {
+            const campos = [modelo_aeronave, tipo_motor, idade_aeronave, horas_voo,
+                            ultima_manutencao, ciclos_pouso, temperatura_media];
+            const vazio = ["", "text-center text-muted mt-3"];
+            if (!url_modelo || campos.some(campo => campo === null || campo === undefined || campo === "")) {
+                return vazio;
+            }
+            // Dash aceita Promise como retorno de callback no navegador
+            return carregarModelo(url_modelo).then(modelo => modelo ? previa(modelo, {
+                idade_aeronave_anos: Number(idade_aeronave),
+                horas_voo_total: Number(horas_voo),
+                ultima_manutencao_meses: Number(ultima_manutencao),
+                ciclos_pouso_decolagem: Number(ciclos_pouso),
+                temperatura_media_operacao: Number(temperatura_media),
+                modelo_aeronave: modelo_aeronave,
+                tipo_motor: tipo_motor
+            }) : vazio);
+        }
+    }
+});
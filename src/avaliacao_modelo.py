@@ -0,0 +1,174 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+# Avaliação do modelo: k-fold estratificado (um fold por processo) gera
+# probabilidades out-of-fold para todo o dataset; em cima delas, reamostragens
+# bootstrap (divididas entre os processos) dão intervalos de confiança.
+# O resultado vai para um JSON lido pelo dashboard na inicialização.
+
+ARQUIVO_METRICAS = "metricas_modelo.json"
+NOMES_METRICAS = ('acuracia', 'roc_auc', 'recall')
+
+# Modos cujo treino o k-fold reproduz: um XGBClassifier nas features com LabelEncoder
+# (categorico, segmentado e incremental não são só parâmetros sobre as mesmas features)
+MODOS_REPRODUZIVEIS = ('padrao', 'externo')
+
+# Dados compartilhados com os processos do pool (enviados uma vez por processo)
+_dados_avaliacao = {}
+
+
+def _inicializar_processo(X, y):
+    _dados_avaliacao.update(X=X, y=y)
+
+
+def _calcular_metricas(y, proba):
+    """Acurácia, ROC-AUC e recall da classe falha_critica=1"""
+    pred = proba >= 0.5
+    return {
+        'acuracia': accuracy_score(y, pred),
+        'roc_auc': roc_auc_score(y, proba),
+        'recall': recall_score(y, pred, zero_division=0),
+    }
+
+
+def _executar_fold(fold, idx_treino, idx_teste, parametros, threads):
+    """Treina um fold e devolve as probabilidades out-of-fold (executado no pool)"""
+    X, y = _dados_avaliacao['X'], _dados_avaliacao['y']
+    inicio = time.perf_counter()
+    modelo = xgb.XGBClassifier(**parametros, n_jobs=threads)
+    modelo.fit(X[idx_treino], y[idx_treino])
+    proba = modelo.predict_proba(X[idx_teste])[:, 1]
+    return {
+        'fold': fold,
+        'idx_teste': idx_teste,
+        'proba': proba,
+        'metricas': _calcular_metricas(y[idx_teste], proba),
+        'tempo_s': round(time.perf_counter() - inicio, 3),
+    }
+
+
+def _executar_bootstrap(y, proba, n_reamostras, seed):
+    """Métricas de n_reamostras bootstrap sobre as previsões out-of-fold"""
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    resultados = {nome: [] for nome in NOMES_METRICAS}
+    for _ in range(n_reamostras):
+        idx = rng.integers(0, n, n)
+        y_b, p_b = y[idx], proba[idx]
+        if y_b.min() == y_b.max():
+            continue  # reamostra com uma só classe não tem AUC
+        for nome, valor in _calcular_metricas(y_b, p_b).items():
+            resultados[nome].append(valor)
+    return resultados
+
+
+def resumo_dataset(dados):
+    """Números do dataset exibidos no dashboard"""
+    return {
+        'n_registros': int(len(dados)),
+        'taxa_falha': float(dados['falha_critica'].mean()),
+        'n_modelos_aeronave': int(dados['modelo_aeronave'].nunique()),
+        'n_tipos_motor': int(dados['tipo_motor'].nunique()),
+    }
+
+
+def configuracao_da_versao(features, versao=None):
+    """(versão, parâmetros) da versão do registro (padrão: ATUAL), ou None se o k-fold não a reproduz"""
+    from registro_modelos import carregar_metadados
+    try:
+        metadados = carregar_metadados(versao)
+    except FileNotFoundError:
+        return None
+    if metadados['modo'] not in MODOS_REPRODUZIVEIS or metadados['features'] != list(features):
+        return None
+    return metadados['versao'], dict(metadados['parametros'])
+
+
+def avaliar_modelo(dados, features, parametros, k=5, n_bootstrap=1000, n_processos=None,
+                threads_por_processo=1, caminho=ARQUIVO_METRICAS, versao_modelo=None, configuracao=None):
+    """k-fold + bootstrap em paralelo; grava o relatório em JSON
+
+    versao_modelo só deve ser informada quando `parametros` são os da própria
+    versão; configuracao descreve o que foi avaliado (vai para a página inicial).
+    """
+    X = dados[features].to_numpy(dtype=np.float32)
+    y = dados['falha_critica'].to_numpy().astype(int)
+    n_processos = n_processos or max(1, (os.cpu_count() or 1) // threads_por_processo)
+
+    print(f"\n📏 Avaliação: {k}-fold estratificado + {n_bootstrap} bootstrap "
+        f"({n_processos} processos x {threads_por_processo} threads)")
+
+    folds = StratifiedKFold(n_splits=k, shuffle=True, random_state=42).split(X, y)
+    proba_oof = np.empty(len(y), dtype=np.float64)
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_processo,
+                            initargs=(X, y)) as pool:
+        futuros = [
+            pool.submit(_executar_fold, i, idx_treino, idx_teste, parametros, threads_por_processo)
+            for i, (idx_treino, idx_teste) in enumerate(folds)
+        ]
+        resultados_folds = sorted((f.result() for f in futuros), key=lambda r: r['fold'])
+        for r in resultados_folds:
+            proba_oof[r['idx_teste']] = r['proba']
+        tempo_cv = time.perf_counter() - inicio
+
+        # Bootstrap dividido em blocos, um por processo, com seeds distintas
+        inicio = time.perf_counter()
+        blocos = np.array_split(np.arange(n_bootstrap), n_processos)
+        futuros = [
+            pool.submit(_executar_bootstrap, y, proba_oof, len(bloco), 1000 + i)
+            for i, bloco in enumerate(blocos) if len(bloco)
+        ]
+        amostras = {nome: [] for nome in NOMES_METRICAS}
+        for f in futuros:
+            for nome, valores in f.result().items():
+                amostras[nome].extend(valores)
+        tempo_bootstrap = time.perf_counter() - inicio
+
+    metricas_oof = _calcular_metricas(y, proba_oof)
+    metricas = {}
+    for nome in NOMES_METRICAS:
+        por_fold = [r['metricas'][nome] for r in resultados_folds]
+        metricas[nome] = {
+            'oof': float(metricas_oof[nome]),
+            'media_cv': float(np.mean(por_fold)),
+            'desvio_cv': float(np.std(por_fold)),
+            'ic95': [float(v) for v in np.percentile(amostras[nome], [2.5, 97.5])],
+        }
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'versao_modelo': versao_modelo,
+        'configuracao': configuracao or (f"versão {versao_modelo}" if versao_modelo else "parâmetros informados"),
+        'k_folds': k,
+        'n_bootstrap': n_bootstrap,
+        'features': features,
+        'parametros': parametros,
+        'metricas': metricas,
+        'folds': [
+            {'fold': r['fold'], 'tempo_s': r['tempo_s'],
+            **{nome: float(v) for nome, v in r['metricas'].items()}}
+            for r in resultados_folds
+        ],
+        'dataset': resumo_dataset(dados),
+        'tempo_cv_s': round(tempo_cv, 3),
+        'tempo_bootstrap_s': round(tempo_bootstrap, 3),
+    }
+
+    with open(caminho, 'w', encoding='utf-8') as arq:
+        json.dump(relatorio, arq, indent=2, ensure_ascii=False)
+
+    for nome, m in metricas.items():
+        print(f"{nome:<10} CV {m['media_cv']:.4f} ± {m['desvio_cv']:.4f} | "
+            f"IC95% [{m['ic95'][0]:.4f}, {m['ic95'][1]:.4f}]")
+    print(f"CV em {tempo_cv:.1f}s, bootstrap em {tempo_bootstrap:.1f}s | relatório salvo em {caminho}")
+    return relatorio
+
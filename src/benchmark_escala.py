@@ -0,0 +1,302 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from gerador_frota import gerar_frota
+
+# Benchmark de escala: gera frotas sintéticas de tamanhos crescentes com o
+# mesmo esquema e as mesmas regras de data/aviacao_falhas.py (gerador_frota,
+# em blocos, para chegar a 10 milhões de linhas) e mede tempo e pico de memória
+# de cada etapa do pipeline: leitura do CSV, codificação, treino do XGBoost,
+# predição em lote e cada função de análise do app. O pico é o RSS do processo
+# amostrado durante a etapa (inclui a memória nativa do XGBoost/numpy).
+# Etapas cuja projeção (pela curva dos tamanhos anteriores) estoura o
+# orçamento de tempo ou a memória disponível são puladas e marcadas no relatório.
+#
+# Cada execução grava benchmarks/escala_<commit>_<data>.json/.csv e um HTML com
+# as curvas log-log; --comparar mostra a razão contra outra execução.
+
+DIRETORIO_RESULTADOS = 'benchmarks'
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000, 10_000_000]
+LINHAS_BLOCO_GERACAO = 1_000_000
+
+
+# ========== GERAÇÃO DOS DADOS ==========
+def garantir_csv(n, diretorio):
+    """CSV com n linhas gerado em blocos (reaproveitado entre execuções)"""
+    caminho = os.path.join(diretorio, f"frota_{n}.csv")
+    if not os.path.exists(caminho):
+        os.makedirs(diretorio, exist_ok=True)
+        temporario = caminho + '.parcial'
+        for i, inicio in enumerate(range(0, n, LINHAS_BLOCO_GERACAO)):
+            bloco = gerar_frota(min(LINHAS_BLOCO_GERACAO, n - inicio), semente=42 + i)
+            bloco.to_csv(temporario, mode='a' if i else 'w', header=not i, index=False, encoding='utf-8')
+        os.replace(temporario, caminho)
+    return caminho
+
+
+# ========== MEDIÇÃO ==========
+def rss_bytes():
+    """RSS atual do processo (Linux); None em sistemas sem /proc"""
+    try:
+        with open('/proc/self/statm') as arq:
+            return int(arq.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def memoria_disponivel():
+    try:
+        with open('/proc/meminfo') as arq:
+            for linha in arq:
+                if linha.startswith('MemAvailable:'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class MedidorPico:
+    """Amostra o RSS numa thread enquanto a etapa roda e guarda o maior acréscimo"""
+
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._parar = threading.Event()
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, (rss_bytes() or 0) - self.inicio)
+
+    def __enter__(self):
+        self.inicio = rss_bytes() or 0
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, (rss_bytes() or 0) - self.inicio)
+
+
+def medir(funcao, *args):
+    """(resultado, segundos, pico de memória em MB) de uma chamada, sem o que ela imprime"""
+    with MedidorPico() as medidor, contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        segundos = time.perf_counter() - inicio
+    return resultado, segundos, medidor.pico / 2**20 if rss_bytes() is not None else None
+
+
+def projetar(historico, n):
+    """Projeção de (segundos, MB) para n linhas pelo expoente entre os dois últimos tamanhos"""
+    if len(historico) < 2:
+        return None, None
+    (n0, t0, m0), (n1, t1, m1) = historico[-2], historico[-1]
+    escala = n / n1
+
+    def extrapolar(v0, v1):
+        if not v0 or not v1 or v0 <= 0 or v1 <= 0:
+            return v1 * escala if v1 else None
+        expoente = max(np.log(v1 / v0) / np.log(n1 / n0), 1.0)
+        return v1 * escala ** expoente
+    return extrapolar(t0, t1), extrapolar(m0, m1)
+
+
+# ========== PIPELINE ==========
+def etapas_pipeline():
+    """Etapas na ordem do pipeline: (nome, função(contexto) -> resultado guardado no contexto)"""
+    import xgboost as xgb
+    from modelo_aviacao import PARAMETROS_PADRAO, codificar_categoricas, features
+    from pacote_modelo import PacoteModelo
+    import analises_avancadas as analises
+
+    def treinar(ctx):
+        modelo = xgb.XGBClassifier(**PARAMETROS_PADRAO)
+        return modelo.fit(ctx['dados'][features], ctx['dados']['falha_critica'])
+
+    etapas = [
+        ('leitura_csv', lambda ctx: pd.read_csv(ctx['caminho']), 'dados'),
+        ('codificacao', lambda ctx: codificar_categoricas(ctx['dados']), 'encoders'),
+        ('treino_xgboost', treinar, 'modelo'),
+        # Compilação do pacote fica fora da medição; só a predição em lote conta
+        ('predicao_lote', lambda ctx: ctx['pacote'].predict_proba(ctx['dados']), None),
+    ]
+    for nome in ('criar_analise_temporal', 'criar_analise_risco', 'criar_analise_manutencao',
+                'criar_analise_detalhada_modelo', 'criar_relatorio_kpis'):
+        etapas.append((nome, lambda ctx, funcao=getattr(analises, nome): funcao(ctx['dados']), None))
+
+    def preparar(ctx, nome):
+        if nome == 'predicao_lote' and 'pacote' not in ctx:
+            ctx['pacote'] = PacoteModelo.de_modelo(ctx['modelo'], features, ctx['encoders'])
+    return etapas, preparar
+
+
+def executar_benchmark(tamanhos, diretorio_dados, orcamento=600.0, etapas_escolhidas=None):
+    """Linhas do relatório: uma por (tamanho, etapa), com tempo, pico de memória e status"""
+    etapas, preparar = etapas_pipeline()
+    # O que cada etapa precisa no contexto (e qual etapa produz)
+    produtoras = {'dados': 'leitura_csv', 'encoders': 'codificacao', 'modelo': 'treino_xgboost'}
+    requisitos = {'leitura_csv': [], 'codificacao': ['dados'], 'treino_xgboost': ['dados', 'encoders'],
+                'predicao_lote': ['dados', 'encoders', 'modelo']}
+    historico = {nome: [] for nome, _, _ in etapas}
+    linhas = []
+
+    for n in sorted(tamanhos):
+        caminho = garantir_csv(n, diretorio_dados)
+        ctx = {'caminho': caminho}
+        for nome, funcao, chave in etapas:
+            # Etapas pedidas + as que produzem o que elas precisam
+            if etapas_escolhidas and nome not in etapas_escolhidas and nome not in produtoras.values():
+                continue
+            tempo_previsto, memoria_prevista = projetar(historico[nome], n)
+            disponivel = memoria_disponivel()
+            if ((tempo_previsto and tempo_previsto > orcamento)
+                    or (memoria_prevista and disponivel and memoria_prevista * 2**20 > disponivel * 0.8)
+                    or any(r not in ctx for r in requisitos.get(nome, ['dados']))):
+                linhas.append({'linhas': n, 'etapa': nome, 'segundos': None, 'pico_memoria_mb': None,
+                            'status': 'pulada', 'segundos_projetados': tempo_previsto,
+                            'memoria_projetada_mb': memoria_prevista})
+                print(f"   {n:>11,} {nome:<32} pulada (projeção {tempo_previsto or 0:.0f}s, "
+                    f"{memoria_prevista or 0:.0f} MB)")
+                continue
+            preparar(ctx, nome)
+            try:
+                resultado, segundos, pico = medir(funcao, ctx)
+            except Exception as e:
+                # Uma etapa que quebra num tamanho também é resultado do benchmark
+                linhas.append({'linhas': n, 'etapa': nome, 'segundos': None, 'pico_memoria_mb': None,
+                            'status': f'erro: {type(e).__name__}: {e}'[:200], 'segundos_projetados': tempo_previsto,
+                            'memoria_projetada_mb': memoria_prevista})
+                print(f"   {n:>11,} {nome:<32} ❌ {type(e).__name__}: {str(e)[:80]}")
+                continue
+            if chave:
+                ctx[chave] = resultado
+            historico[nome].append((n, segundos, pico))
+            linhas.append({'linhas': n, 'etapa': nome, 'segundos': segundos, 'pico_memoria_mb': pico,
+                        'status': 'ok', 'segundos_projetados': tempo_previsto,
+                        'memoria_projetada_mb': memoria_prevista})
+            print(f"   {n:>11,} {nome:<32} {segundos:>9.3f}s {pico or 0:>9.1f} MB")
+        del ctx
+    return linhas
+
+
+# ========== RELATÓRIO ==========
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def expoentes_escala(tabela):
+    """Expoente da curva log-log (tempo ~ linhas^k) por etapa, ajustado nos tamanhos medidos"""
+    expoentes = {}
+    for etapa, grupo in tabela[tabela['status'] == 'ok'].groupby('etapa', sort=False):
+        if len(grupo) >= 2 and (grupo['segundos'] > 0).all():
+            expoentes[etapa] = float(np.polyfit(np.log(grupo['linhas']), np.log(grupo['segundos']), 1)[0])
+    return expoentes
+
+
+def salvar_relatorio(linhas, diretorio=DIRETORIO_RESULTADOS):
+    """Grava JSON (metadados + linhas + expoentes), CSV e HTML com as curvas; devolve o caminho do JSON"""
+    import xgboost as xgb
+    import plotly.express as px
+    from plotly.subplots import make_subplots
+
+    tabela = pd.DataFrame(linhas)
+    commit = commit_atual()
+    base = os.path.join(diretorio, f"escala_{commit}_{datetime.now():%Y%m%d_%H%M%S}")
+    os.makedirs(diretorio, exist_ok=True)
+    relatorio = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'pandas': pd.__version__, 'xgboost': xgb.__version__,
+                    'cpus': os.cpu_count(), 'plataforma': platform.platform()},
+        'expoentes': expoentes_escala(tabela),
+        'resultados': linhas,
+    }
+    with open(base + '.json', 'w', encoding='utf-8') as arq:
+        json.dump(relatorio, arq, indent=2, ensure_ascii=False)
+    tabela.assign(commit=commit).to_csv(base + '.csv', index=False)
+
+    medidas = tabela[tabela['status'] == 'ok']
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Tempo (s)", "Pico de memória (MB)"))
+    for i, coluna in enumerate(('segundos', 'pico_memoria_mb'), start=1):
+        for trace in px.line(medidas, x='linhas', y=coluna, color='etapa', markers=True).data:
+            trace.showlegend = i == 1
+            fig.add_trace(trace, row=1, col=i)
+    fig.update_xaxes(type='log', title_text="Linhas")
+    fig.update_yaxes(type='log')
+    fig.update_layout(title=f"Escala do pipeline ({commit})", height=500)
+    fig.write_html(base + '.html')
+    return base + '.json'
+
+
+def comparar_execucoes(caminho_atual, caminho_anterior):
+    """Tabela com a razão atual/anterior de tempo e memória por etapa e tamanho"""
+    def ler(caminho):
+        with open(caminho, encoding='utf-8') as arq:
+            relatorio = json.load(arq)
+        return relatorio['commit'], pd.DataFrame(relatorio['resultados']).set_index(['etapa', 'linhas'])
+    commit_atual_, atual = ler(caminho_atual)
+    commit_anterior, anterior = ler(caminho_anterior)
+    comparacao = atual[['segundos', 'pico_memoria_mb']].join(
+        anterior[['segundos', 'pico_memoria_mb']], lsuffix='_atual', rsuffix='_anterior', how='inner')
+    comparacao['razao_tempo'] = comparacao['segundos_atual'] / comparacao['segundos_anterior']
+    comparacao['razao_memoria'] = comparacao['pico_memoria_mb_atual'] / comparacao['pico_memoria_mb_anterior']
+    return commit_atual_, commit_anterior, comparacao
+
+
+def ultima_execucao(diretorio=DIRETORIO_RESULTADOS, exceto=None):
+    arquivos = sorted(os.path.join(diretorio, a) for a in os.listdir(diretorio)
+                    if a.startswith('escala_') and a.endswith('.json')) if os.path.isdir(diretorio) else []
+    arquivos = [a for a in arquivos if a != exceto]
+    return max(arquivos, key=os.path.getmtime) if arquivos else None
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark de escala do treino e das análises")
+    parser.add_argument('--tamanhos', default=",".join(str(n) for n in TAMANHOS_PADRAO),
+                        help="linhas separadas por vírgula")
+    parser.add_argument('--etapas', default=None, help="só estas etapas (vírgula), além das que elas exigem")
+    parser.add_argument('--dados', default=os.path.join(DIRETORIO_RESULTADOS, 'dados'),
+                        help="onde ficam os CSVs sintéticos (gerados uma vez)")
+    parser.add_argument('--orcamento', type=float, default=600.0,
+                        help="pula a etapa se a projeção passar destes segundos")
+    parser.add_argument('--comparar', nargs='?', const='ultima', default=None,
+                        help="compara com um JSON anterior (sem valor: a execução anterior mais recente)")
+    parser.add_argument('--somente-comparar', nargs=2, metavar=('ATUAL', 'ANTERIOR'),
+                        help="só compara dois JSONs já gravados")
+    args = parser.parse_args()
+
+    if args.somente_comparar:
+        caminho, anterior = args.somente_comparar
+    else:
+        tamanhos = [int(t) for t in args.tamanhos.split(',')]
+        etapas = set(args.etapas.split(',')) if args.etapas else None
+        print(f"📏 Benchmark de escala: {', '.join(f'{n:,}' for n in tamanhos)} linhas")
+        caminho = salvar_relatorio(executar_benchmark(tamanhos, args.dados, args.orcamento, etapas))
+        print(f"Relatório: {caminho} (+ .csv e .html com as curvas)")
+        with open(caminho, encoding='utf-8') as arq:
+            for etapa, k in json.load(arq)['expoentes'].items():
+                print(f"   {etapa:<32} tempo ~ linhas^{k:.2f}")
+        anterior = None
+        if args.comparar:
+            anterior = ultima_execucao(exceto=caminho) if args.comparar == 'ultima' else args.comparar
+
+    if anterior:
+        commit_novo, commit_velho, comparacao = comparar_execucoes(caminho, anterior)
+        print(f"\n🔁 {commit_novo} x {commit_velho} (razão > 1 = mais lento/maior agora)")
+        print(comparacao[['segundos_atual', 'segundos_anterior', 'razao_tempo', 'razao_memoria']]
+            .round(3).to_string())
@@ -0,0 +1,216 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from plotly.utils import PlotlyJSONEncoder
+
+try:
+    import fcntl  # trava entre processos (Linux/macOS)
+except ImportError:
+    fcntl = None
+
+# Cache compartilhado em disco para figuras e análises: cada worker do
+# servidor (gunicorn -w N, ou vários processos na mesma máquina) lê o mesmo
+# diretório em vez de montar as mesmas figuras e guardar a sua própria cópia.
+# A chave é o nome do resultado + a impressão digital dos dados (caminho,
+# tamanho e mtime do CSV/partição) + os argumentos + a versão do código
+# (mtimes dos .py do app), então dados ou código novos geram entradas novas e
+# as antigas saem pelo LRU. Uma entrada ausente é calculada por um único
+# processo (flock no arquivo de trava da chave); os demais esperam e leem o
+# resultado. Os valores são gravados em JSON (o mesmo que o Dash envia ao
+# navegador), então voltam como dicts -- ler é json.loads, sem revalidar as
+# figuras do plotly.
+
+DIRETORIO_CACHE = os.environ.get('AVIACAO_CACHE_DIR', 'cache_app')
+MAX_BYTES_CACHE = int(float(os.environ.get('AVIACAO_CACHE_MB', 256)) * 1024 * 1024)
+
+
+def impressao_arquivo(caminho):
+    """Impressão digital barata de um arquivo de dados (caminho, tamanho e mtime); None se não existe"""
+    try:
+        estado = os.stat(caminho)
+    except (FileNotFoundError, TypeError):
+        return None
+    return f"{os.path.abspath(caminho)}:{estado.st_size}:{estado.st_mtime_ns}"
+
+
+def _versao_codigo():
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    arquivos = sorted(glob.glob(os.path.join(diretorio, '*.py')))
+    return hashlib.sha256("|".join(f"{a}:{os.stat(a).st_mtime_ns}" for a in arquivos).encode()).hexdigest()[:16]
+
+
+class CacheDisco:
+    """Resultados JSON em arquivos, LRU por mtime de acesso e limite total de bytes"""
+
+    def __init__(self, diretorio=DIRETORIO_CACHE, max_bytes=MAX_BYTES_CACHE):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.versao = _versao_codigo()
+        self.acertos = 0
+        self.faltas = 0
+        self._travas = {}  # chave -> (lock, threads usando)
+        self._lock = threading.Lock()
+
+    def chave(self, nome, impressao, argumentos=()):
+        conteudo = json.dumps([nome, impressao, argumentos, self.versao], default=str)
+        return f"{nome}_{hashlib.sha256(conteudo.encode()).hexdigest()[:24]}"
+
+    def _ler(self, caminho):
+        try:
+            with open(caminho, encoding='utf-8') as arq:
+                valor = json.load(arq)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(caminho)  # acesso recente para o LRU
+        except FileNotFoundError:
+            pass
+        return valor
+
+    def _caminho_trava(self, chave):
+        return os.path.join(self.diretorio, 'travas', chave + '.lock')
+
+    @contextmanager
+    def _trava(self, chave):
+        """Trava exclusiva da chave entre threads e, com fcntl, entre processos"""
+        with self._lock:
+            trava_thread, usos = self._travas.get(chave, (None, 0))
+            trava_thread = trava_thread or threading.Lock()
+            self._travas[chave] = (trava_thread, usos + 1)
+        try:
+            with _TravaChave(trava_thread, self._caminho_trava(chave)):
+                yield
+        finally:
+            # Só as chaves com alguém esperando ficam no dict
+            with self._lock:
+                trava_thread, usos = self._travas[chave]
+                if usos == 1:
+                    del self._travas[chave]
+                else:
+                    self._travas[chave] = (trava_thread, usos - 1)
+
+    def obter(self, nome, impressao, argumentos, calcular):
+        """Resultado em cache ou calcular() -- por um único processo; devolve o valor já como JSON (dicts)"""
+        if impressao is None:  # sem arquivo de dados não há o que versionar: calcula sem cache
+            return calcular()
+        chave = self.chave(nome, impressao, argumentos)
+        caminho = os.path.join(self.diretorio, chave + '.json')
+        valor = self._ler(caminho)
+        if valor is None:
+            with self._trava(chave):
+                valor = self._ler(caminho)  # outro processo pode ter calculado enquanto esperávamos
+                if valor is None:
+                    texto = json.dumps(calcular(), cls=PlotlyJSONEncoder)
+                    temporario = f"{caminho}.{os.getpid()}.tmp"
+                    with open(temporario, 'w', encoding='utf-8') as arq:
+                        arq.write(texto)
+                    os.replace(temporario, caminho)
+                    self.faltas += 1
+                    self.podar()
+                    return json.loads(texto)
+        self.acertos += 1
+        return valor
+
+    def entradas(self):
+        """(caminho, bytes, último acesso) das entradas em disco"""
+        resultado = []
+        for entrada in os.scandir(self.diretorio) if os.path.isdir(self.diretorio) else []:
+            if entrada.name.endswith('.json'):
+                try:
+                    estado = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                resultado.append((entrada.path, estado.st_size, estado.st_mtime))
+        return resultado
+
+    def podar(self):
+        """Apaga as entradas usadas há mais tempo até caber em max_bytes"""
+        entradas = sorted(self.entradas(), key=lambda e: e[2])
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for caminho, tamanho, _ in entradas:
+            if total <= self.max_bytes:
+                break
+            self._remover(caminho)
+            total -= tamanho
+
+    def _remover(self, caminho):
+        """Apaga a entrada e o arquivo de trava da chave dela"""
+        chave = os.path.basename(caminho)[:-len('.json')]
+        for arquivo in (caminho, self._caminho_trava(chave)):
+            try:
+                os.remove(arquivo)
+            except FileNotFoundError:
+                pass
+
+    def limpar(self):
+        for caminho, _, _ in self.entradas():
+            self._remover(caminho)
+        # Travas de chaves que nunca chegaram a ser gravadas (cálculo interrompido)
+        for caminho in glob.glob(os.path.join(self.diretorio, 'travas', '*.lock')):
+            os.remove(caminho)
+
+
+class _TravaChave:
+    def __init__(self, trava_thread, caminho):
+        self.trava_thread = trava_thread
+        self.caminho = caminho
+        self._arquivo = None
+
+    def __enter__(self):
+        self.trava_thread.acquire()
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            self._arquivo = open(self.caminho, 'a')
+            fcntl.flock(self._arquivo, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *_):
+        if self._arquivo is not None:
+            fcntl.flock(self._arquivo, fcntl.LOCK_UN)
+            self._arquivo.close()
+            self._arquivo = None
+        self.trava_thread.release()
+
+
+cache_disco = CacheDisco()
+
+
+def aquecer_cache(por_companhia=False):
+    """Pré-preenche as entradas comuns: dashboard e análises da frota (e de cada companhia)"""
+    import analises_avancadas
+    import graficos_aviacao
+    graficos_aviacao.criar_layout.fabrica()
+    analises_avancadas.aquecer_analises()
+    if por_companhia:
+        from particoes_companhia import companhias
+        for companhia in companhias():
+            graficos_aviacao.layout_companhia(companhia)
+            analises_avancadas.atualizar_analises(None, f"?companhia={companhia}")
+            analises_avancadas.atualizar_sobrevivencia('horas_voo_total', 'modelo_aeronave', f"?companhia={companhia}")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Cache compartilhado de figuras e análises")
+    parser.add_argument('--aquecer', action='store_true', help="pré-preenche dashboard e análises da frota")
+    parser.add_argument('--companhias', action='store_true', help="com --aquecer, também de cada companhia")
+    parser.add_argument('--limpar', action='store_true')
+    args = parser.parse_args()
+
+    # A instância usada pelas páginas é a do módulo importado, não a deste __main__
+    from cache_disco import aquecer_cache, cache_disco
+    if args.limpar:
+        cache_disco.limpar()
+        print(f"🧹 Cache em {cache_disco.diretorio}/ limpo")
+    if args.aquecer:
+        inicio = time.perf_counter()
+        aquecer_cache(args.companhias)
+        print(f"🔥 Cache aquecido em {time.perf_counter() - inicio:.2f}s "
+            f"({cache_disco.faltas} calculadas, {cache_disco.acertos} já estavam em disco)")
+    entradas = cache_disco.entradas()
+    print(f"💾 {len(entradas)} entradas, {sum(e[1] for e in entradas) / 1024 / 1024:.1f} MB "
+        f"de {cache_disco.max_bytes / 1024 / 1024:.0f} MB em {cache_disco.diretorio}/")
@@ -0,0 +1,264 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Teste de carga do app: sobe o Dash no próprio processo (test client do Flask
+# ou um servidor werkzeug local com threads) e repete uma mistura ponderada de
+# cenários reais -- abrir páginas, enviar o formulário de previsão, atualizar as
+# análises e paginar o plano -- com N clientes simultâneos. Reporta vazão e
+# percentis de latência por cenário e compara com um baseline salvo: piora
+# acima da tolerância termina com código de saída 1 (para travar o deploy).
+
+ARQUIVO_BASELINE = 'baseline_carga.json'
+ROTAS = ['/', '/graficos', '/formulario', '/analises', '/monitoramento']
+
+# Callbacks que tratam a exceção devolvem 200 com um alerta (ex.: "Erro na
+# previsão"): a resposta também conta como erro se trouxer um destes trechos
+# (o JSON do Dash escapa acentos, então só a parte ASCII)
+MARCADORES_ERRO = (b'Erro na previs',)
+
+# Cenário -> peso na mistura ('companhia' -- dashboard e análises de uma
+# companhia sorteada, pelas partições -- fica disponível via --mistura)
+MISTURA_PADRAO = {'pagina': 4, 'previsao': 4, 'analises': 1, 'plano': 1}
+
+
+def corpo_callback(saidas, entradas, estados=(), disparo=None):
+    """Corpo de /_dash-update-component como o navegador envia (saídas/entradas em tuplas id, propriedade, valor)"""
+    if len(saidas) == 1:
+        output = f"{saidas[0][0]}.{saidas[0][1]}"
+        outputs = {'id': saidas[0][0], 'property': saidas[0][1]}
+    else:
+        output = ".." + "...".join(f"{i}.{p}" for i, p in saidas) + ".."
+        outputs = [{'id': i, 'property': p} for i, p in saidas]
+    return {
+        'output': output,
+        'outputs': outputs,
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in entradas],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in estados],
+        'changedPropIds': [disparo] if disparo else [],
+    }
+
+
+class GeradorCenarios:
+    """Requisições de cada cenário com entradas amostradas do histórico"""
+
+    def __init__(self, dados, semente=42):
+        self.aeronaves = dados.to_dict('records')
+        self.rng = random.Random(semente)
+        self._lock = threading.Lock()
+
+    def _aeronave(self):
+        with self._lock:
+            return self.rng.choice(self.aeronaves), self.rng.random()
+
+    def pagina(self):
+        _, sorteio = self._aeronave()
+        rota = ROTAS[int(sorteio * len(ROTAS))]
+        return [('GET', '/', None), ('POST', '/_dash-update-component', corpo_callback(
+            [('page-content', 'children')], [('url', 'pathname', rota), ('url', 'search', '')],
+            disparo='url.pathname'))]
+
+    def previsao(self):
+        a, _ = self._aeronave()
+        estados = [('modelo_aeronave', 'value', a['modelo_aeronave']), ('tipo_motor', 'value', a['tipo_motor']),
+                ('idade_aeronave', 'value', a['idade_aeronave_anos']), ('horas_voo', 'value', a['horas_voo_total']),
+                ('ultima_manutencao', 'value', a['ultima_manutencao_meses']),
+                ('ciclos_pouso', 'value', a['ciclos_pouso_decolagem']),
+                ('temperatura_media', 'value', a['temperatura_media_operacao'])]
+        return [('POST', '/_dash-update-component', corpo_callback(
+            [('previsao-aviacao', 'children')], [('botao-prever', 'n_clicks', 1)], estados,
+            disparo='botao-prever.n_clicks'))]
+
+    def analises(self):
+        saidas = [('analise-temporal', 'figure'), ('analise-risco', 'figure'), ('analise-manutencao', 'figure'),
+                ('analise-modelo', 'figure'), ('kpis-relatorio', 'children')]
+        return [('POST', '/_dash-update-component', corpo_callback(
+            saidas, [('analise-temporal', 'id', 'analise-temporal')], [('url', 'search', '')]))]
+
+    def plano(self):
+        _, sorteio = self._aeronave()
+        return [('POST', '/_dash-update-component', corpo_callback(
+            [('tabela-plano', 'data')],
+            [('botao-plano', 'n_clicks', None), ('tabela-plano', 'page_current', int(sorteio * 20)),
+            ('tabela-plano', 'page_size', 20), ('tabela-plano', 'sort_by', [])],
+            [('capacidade-semanal', 'value', 50), ('url', 'search', '')], disparo='tabela-plano.page_current'))]
+
+    def companhia(self):
+        a, _ = self._aeronave()
+        search = f"?companhia={a['companhia_aerea']}"
+        saidas = [('analise-temporal', 'figure'), ('analise-risco', 'figure'), ('analise-manutencao', 'figure'),
+                ('analise-modelo', 'figure'), ('kpis-relatorio', 'children')]
+        return [('POST', '/_dash-update-component', corpo_callback(
+                    [('page-content', 'children')], [('url', 'pathname', '/graficos'), ('url', 'search', search)],
+                    disparo='url.pathname')),
+                ('POST', '/_dash-update-component', corpo_callback(
+                    saidas, [('analise-temporal', 'id', 'analise-temporal')], [('url', 'search', search)]))]
+
+
+class ClienteTeste:
+    """Requisições pelo test client do Flask (um por thread), sem rede"""
+
+    def __init__(self, server):
+        self.server = server
+        self._local = threading.local()
+
+    def enviar(self, metodo, caminho, corpo):
+        if not hasattr(self._local, 'cliente'):
+            self._local.cliente = self.server.test_client()
+        resposta = self._local.cliente.open(caminho, method=metodo, json=corpo)
+        return resposta.status_code, resposta.get_data()
+
+
+class ClienteHttp:
+    """Requisições HTTP de verdade para um servidor werkzeug local com threads"""
+
+    def __init__(self, server):
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)  # sem uma linha de log por requisição
+        self.servidor = make_server('127.0.0.1', 0, server, threaded=True)
+        self.porta = self.servidor.server_port
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self._local = threading.local()
+
+    def enviar(self, metodo, caminho, corpo):
+        import http.client
+        if not hasattr(self._local, 'conexao'):
+            self._local.conexao = http.client.HTTPConnection('127.0.0.1', self.porta)
+        dados = json.dumps(corpo) if corpo is not None else None
+        self._local.conexao.request(metodo, caminho, body=dados, headers={'Content-Type': 'application/json'})
+        resposta = self._local.conexao.getresponse()
+        return resposta.status, resposta.read()
+
+    def fechar(self):
+        self.servidor.shutdown()
+
+
+def falhou(status, corpo):
+    """Erro HTTP ou callback que respondeu 200 com um alerta de erro"""
+    return status >= 400 or any(marcador in corpo for marcador in MARCADORES_ERRO)
+
+
+def executar_carga(cliente, gerador, mistura=MISTURA_PADRAO, concorrencia=4, duracao=20.0, aquecimento=3.0):
+    """Roda a mistura por `duracao` segundos com `concorrencia` clientes; devolve o relatório"""
+    from metricas_app import metricas
+    cenarios, pesos = list(mistura), list(mistura.values())
+    registros = []
+    lock = threading.Lock()
+
+    def trabalhador(semente, fim_aquecimento, fim):
+        rng = random.Random(semente)
+        while (agora := time.perf_counter()) < fim:
+            cenario = rng.choices(cenarios, pesos)[0]
+            inicio = time.perf_counter()
+            erro = any(falhou(*cliente.enviar(*passo)) for passo in getattr(gerador, cenario)())
+            if agora >= fim_aquecimento:
+                with lock:
+                    registros.append((cenario, time.perf_counter() - inicio, erro))
+
+    # Erros que os callbacks registram nas métricas (app no mesmo processo), inclusive os tratados
+    erros_antes = sum(metricas.erros_callback.values())
+    inicio = time.perf_counter()
+    fim_aquecimento, fim = inicio + aquecimento, inicio + aquecimento + duracao
+    with ThreadPoolExecutor(concorrencia) as executor:
+        list(executor.map(lambda s: trabalhador(s, fim_aquecimento, fim), range(concorrencia)))
+    resultado = relatorio_carga(registros, duracao, concorrencia)
+    resultado['erros_callback'] = sum(metricas.erros_callback.values()) - erros_antes
+    return resultado
+
+
+def relatorio_carga(registros, duracao, concorrencia):
+    """Vazão (cenários/s) e percentis de latência (ms) por cenário e no total"""
+    tabela = pd.DataFrame(registros, columns=['cenario', 'segundos', 'erro'])
+    resultado = {'duracao_s': duracao, 'concorrencia': concorrencia, 'cenarios': {}}
+    for nome, grupo in [('total', tabela)] + list(tabela.groupby('cenario')):
+        ms = grupo['segundos'].to_numpy() * 1000
+        resultado['cenarios'][nome] = {
+            'execucoes': int(len(grupo)),
+            'erros': int(grupo['erro'].sum()),
+            'vazao_por_s': len(grupo) / duracao,
+            'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+            'p90_ms': float(np.percentile(ms, 90)) if len(ms) else None,
+            'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+        }
+    return resultado
+
+
+def comparar_baseline(resultado, baseline, tolerancia=0.2):
+    """Regressões em relação ao baseline: p99 acima ou vazão abaixo da tolerância, ou erros novos"""
+    regressoes = []
+    for nome, atual in resultado['cenarios'].items():
+        anterior = baseline['cenarios'].get(nome)
+        if anterior is None or not atual['execucoes']:
+            continue
+        if anterior['p99_ms'] and atual['p99_ms'] > anterior['p99_ms'] * (1 + tolerancia):
+            regressoes.append(f"{nome}: p99 {anterior['p99_ms']:.1f} -> {atual['p99_ms']:.1f} ms")
+        if atual['vazao_por_s'] < anterior['vazao_por_s'] * (1 - tolerancia):
+            regressoes.append(f"{nome}: vazão {anterior['vazao_por_s']:.1f} -> {atual['vazao_por_s']:.1f}/s")
+        if atual['erros'] > anterior['erros']:
+            regressoes.append(f"{nome}: erros {anterior['erros']} -> {atual['erros']}")
+    if resultado.get('erros_callback', 0) > baseline.get('erros_callback', 0):
+        regressoes.append(f"erros registrados pelos callbacks {baseline.get('erros_callback', 0)} -> "
+                        f"{resultado['erros_callback']}")
+    return regressoes
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Teste de carga do app Dash")
+    parser.add_argument('--concorrencia', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=20.0, help="segundos medidos")
+    parser.add_argument('--aquecimento', type=float, default=3.0, help="segundos descartados no início")
+    parser.add_argument('--mistura', default=None,
+                        help="pesos dos cenários em JSON, ex.: '{\"previsao\": 1}' (padrão: %s)" % MISTURA_PADRAO)
+    parser.add_argument('--http', action='store_true', help="servidor werkzeug local em vez do test client")
+    parser.add_argument('--salvar-baseline', action='store_true', help=f"grava o resultado em {ARQUIVO_BASELINE}")
+    parser.add_argument('--baseline', default=ARQUIVO_BASELINE)
+    parser.add_argument('--tolerancia', type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # O app completo (páginas, métricas e perfil), com os recursos já carregados
+    from main_aviacao import app
+    from carregamento_paginas import aquecer_em_segundo_plano, dados_frota
+    aquecer_em_segundo_plano().join()
+
+    cliente = ClienteHttp(app.server) if args.http else ClienteTeste(app.server)
+    mistura = json.loads(args.mistura) if args.mistura else MISTURA_PADRAO
+    resultado = executar_carga(cliente, GeradorCenarios(dados_frota()), mistura,
+                            args.concorrencia, args.duracao, args.aquecimento)
+    resultado['modo'] = 'http' if args.http else 'test_client'
+    resultado['mistura'] = mistura
+
+    print(f"🚦 {args.concorrencia} clientes, {args.duracao:.0f}s ({resultado['modo']})")
+    print(f"{'cenário':<10} {'execuções':>9} {'erros':>6} {'vazão/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for nome, c in resultado['cenarios'].items():
+        print(f"{nome:<10} {c['execucoes']:>9} {c['erros']:>6} {c['vazao_por_s']:>8.1f} "
+            f"{c['p50_ms'] or 0:>8.1f} {c['p90_ms'] or 0:>8.1f} {c['p99_ms'] or 0:>8.1f}")
+    print(f"Erros registrados pelos callbacks (métricas): {resultado['erros_callback']}")
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as arq:
+            json.dump(resultado, arq, indent=2)
+        print(f"Baseline gravado em {args.baseline}")
+    else:
+        try:
+            with open(args.baseline, encoding='utf-8') as arq:
+                baseline = json.load(arq)
+        except FileNotFoundError:
+            print(f"Sem baseline em {args.baseline} (use --salvar-baseline)")
+            sys.exit(0)
+        if ((baseline.get('modo'), baseline['concorrencia'], baseline.get('mistura'))
+                != (resultado['modo'], resultado['concorrencia'], mistura)):
+            print(f"⚠️ Baseline medido com {baseline['concorrencia']} clientes ({baseline.get('modo')}), "
+                f"mistura {baseline.get('mistura')}: comparação pouco confiável")
+        regressoes = comparar_baseline(resultado, baseline, args.tolerancia)
+        for regressao in regressoes:
+            print(f"❌ Regressão: {regressao}")
+        if regressoes:
+            sys.exit(1)
+        print(f"✅ Sem regressões em relação a {args.baseline} (tolerância {args.tolerancia:.0%})")
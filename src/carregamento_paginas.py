@@ -0,0 +1,154 @@
+import importlib
+import os
+import threading
+import time
+import pandas as pd
+
+# Carregamento sob demanda das páginas do app: os módulos de página só
+# registram layout e callbacks no import (o Dash precisa de todos os callbacks
+# antes da primeira requisição); dados, modelo e figuras são recursos criados
+# no primeiro acesso ou pelo aquecimento em segundo plano depois que o servidor
+# sobe. Cada carga tem o tempo registrado para o relatório de inicialização.
+
+ARQUIVO_DADOS = 'aviacao_falhas.csv'
+
+# Recursos na ordem de registro (a mesma do aquecimento), passos extras do
+# aquecimento (ex.: pré-preencher o cache em disco) e tempos de import
+_recursos = []
+_aquecimentos = []
+TEMPOS_IMPORT = {}
+_local = threading.local()
+
+
+class RecursoLazy:
+    """Valor criado uma única vez, na primeira chamada (seguro entre threads)
+
+    Com `versao` (função barata, ex.: tamanho e mtime do CSV), o valor é
+    recriado quando ela muda em vez de durar o processo inteiro.
+    """
+
+    def __init__(self, fabrica, categoria, versao=None):
+        self.fabrica = fabrica
+        self.categoria = categoria
+        self.versao = versao
+        self.nome = f"{fabrica.__module__}.{fabrica.__name__}"
+        self.__doc__ = fabrica.__doc__
+        self.tempo = None
+        self._valor = None
+        self._versao_carregada = None
+        self._lock = threading.Lock()
+        _recursos.append(self)
+
+    @property
+    def carregado(self):
+        return self.tempo is not None
+
+    def __call__(self):
+        versao = self.versao() if self.versao is not None else None
+        if self.tempo is None or versao != self._versao_carregada:
+            with self._lock:
+                if self.tempo is None or versao != self._versao_carregada:
+                    self._carregar()
+                    self._versao_carregada = versao
+        return self._valor
+
+    def _carregar(self):
+        # Recursos que dependem de outros (figuras -> dados) contam só o tempo próprio
+        pilha = _local.__dict__.setdefault('pilha', [])
+        pilha.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            self._valor = self.fabrica()
+        finally:
+            total = time.perf_counter() - inicio
+            filhos = pilha.pop()
+            if pilha:
+                pilha[-1] += total
+        self.tempo = total - filhos
+
+
+def recurso(categoria, versao=None):
+    """Decorador: transforma a função em um RecursoLazy ('dados', 'modelo' ou 'figuras')"""
+    def decorador(fabrica):
+        return RecursoLazy(fabrica, categoria, versao)
+    return decorador
+
+
+def versao_arquivo(caminho):
+    """Tamanho e mtime do arquivo (None se não existe): versão barata para os recursos lidos dele"""
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return estado.st_size, estado.st_mtime_ns
+
+
+def importar(nome):
+    """Importa um módulo de página registrando o tempo de import"""
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    TEMPOS_IMPORT[nome] = time.perf_counter() - inicio
+    return modulo
+
+
+def ao_aquecer(funcao):
+    """Decorador: registra um passo extra do aquecimento, rodado depois dos recursos"""
+    _aquecimentos.append(funcao)
+    return funcao
+
+
+_aquecimento = {}
+_lock_aquecimento = threading.Lock()
+
+
+def aquecer_em_segundo_plano(ao_terminar=None):
+    """Carrega todos os recursos registrados numa thread daemon (o servidor já pode atender)
+
+    Uma vez por processo: chamadas seguintes devolvem a mesma thread.
+    """
+    def aquecer():
+        for item in list(_recursos):
+            item()
+        for passo in list(_aquecimentos):
+            passo()
+        if ao_terminar is not None:
+            ao_terminar()
+    with _lock_aquecimento:
+        if 'thread' not in _aquecimento:
+            _aquecimento['thread'] = threading.Thread(target=aquecer, name='aquecimento-paginas', daemon=True)
+            _aquecimento['thread'].start()
+        return _aquecimento['thread']
+
+
+def aquecer_no_primeiro_acesso(server, ao_terminar=None):
+    """Dispara o aquecimento na primeira requisição de cada processo (app.run, gunicorn ou app.server importado)"""
+    @server.before_request
+    def iniciar_aquecimento():
+        if 'thread' not in _aquecimento:
+            aquecer_em_segundo_plano(ao_terminar)
+
+
+def relatorio_inicializacao():
+    """Tempos de import, dados, modelo e figuras (recursos ainda não carregados ficam de fora)"""
+    totais = {'import': sum(TEMPOS_IMPORT.values()), 'dados': 0.0, 'modelo': 0.0, 'figuras': 0.0}
+    linhas = ["⏱️ Tempos de inicialização:"]
+    for nome, tempo in TEMPOS_IMPORT.items():
+        linhas.append(f"   - import {nome}: {tempo:.2f}s")
+    for item in _recursos:
+        if item.carregado:
+            totais[item.categoria] = totais.get(item.categoria, 0.0) + item.tempo
+            linhas.append(f"   - {item.categoria} {item.nome}: {item.tempo:.2f}s")
+    linhas.append("   Total: " + " | ".join(f"{categoria} {tempo:.2f}s" for categoria, tempo in totais.items()))
+    return "\n".join(linhas)
+
+
+@recurso('dados', versao=lambda: versao_arquivo(ARQUIVO_DADOS))
+def dados_frota():
+    """Dataset histórico, lido uma vez (e de novo se o CSV mudar) e compartilhado pelas páginas (não modificar)"""
+    try:
+        dados = pd.read_csv(ARQUIVO_DADOS)  # caminho relativo
+        print("✅ Dados carregados para as páginas")
+        return dados
+    except Exception as e:
+        print(f"❌ Erro ao carregar dados: {e}")
+        return pd.DataFrame()
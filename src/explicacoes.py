@@ -0,0 +1,110 @@
+import numpy as np
+from arvores_compiladas import RoteadorSegmentos
+from registro_modelos import carregar_booster
+
+# Explicações por previsão com o TreeSHAP nativo do XGBoost (pred_contribs):
+# para cada linha, quanto cada feature somou na margem (log-odds) do modelo de
+# falha_critica; base + soma das contribuições = margem prevista.
+# Usa os boosters .ubj da mesma versão do registro que o pacote de serviço.
+# No app, ExplicadorCompilado faz a atribuição por caminho (Saabas) direto nos
+# arrays do pacote, sem carregar xgboost nem os boosters em cada worker.
+
+
+class Explicador:
+    """Contribuições por feature para lotes já transformados pelo PacoteModelo"""
+
+    def __init__(self, boosters, features, roteador=None):
+        # Com roteador: um booster por especialista + o global por último
+        self.boosters = list(boosters)
+        self.features = list(features)
+        self.roteador = roteador
+
+    def _contribuicoes_booster(self, booster, X, aproximado):
+        import xgboost as xgb
+        categorico = 'c' in (booster.feature_types or [])
+        matriz = xgb.DMatrix(X, feature_names=self.features, enable_categorical=categorico,
+                            feature_types=booster.feature_types if categorico else None)
+        return booster.predict(matriz, pred_contribs=True, approx_contribs=aproximado)
+
+    def contribuicoes(self, X, aproximado=False):
+        """Matriz (n, n_features + 1): contribuição de cada feature e, na última coluna, a base
+
+        aproximado=True usa a atribuição por caminho (Saabas), bem mais rápida em lotes grandes."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.roteador is None:
+            return self._contribuicoes_booster(self.boosters[0], X, aproximado)
+
+        # Mesmo agrupamento do roteador: cada booster recebe só as linhas do seu segmento
+        contribuicoes = np.empty((len(X), len(self.features) + 1), dtype=np.float32)
+        segmentos = self.roteador.segmentos(X)
+        for i, booster in enumerate(self.boosters):
+            linhas = np.flatnonzero(segmentos == i)
+            if len(linhas):
+                contribuicoes[linhas] = self._contribuicoes_booster(booster, X[linhas], aproximado)
+        return contribuicoes
+
+
+class ExplicadorCompilado:
+    """Atribuição por caminho sobre o ensemble compilado do pacote (sem xgboost)"""
+
+    def __init__(self, ensemble, features):
+        self.ensemble = ensemble
+        self.features = list(features)
+
+    def contribuicoes(self, X, aproximado=True):
+        """Matriz (n, n_features + 1) como em Explicador.contribuicoes (sempre por caminho)"""
+        return self.ensemble.contribuicoes_caminho(X)
+
+
+def explicador_compilado(pacote):
+    """ExplicadorCompilado do pacote, ou None se o ensemble não tem o valor esperado dos nós"""
+    modelo = pacote.modelo
+    ensembles = modelo.especialistas + [modelo.global_] if isinstance(modelo, RoteadorSegmentos) else [modelo]
+    if any(e.media is None for e in ensembles):
+        return None
+    return ExplicadorCompilado(modelo, pacote.features)
+
+
+def carregar_explicador(pacote, versao=None):
+    """Explicador com os boosters da versão do pacote (padrão: a versão do próprio pacote)"""
+    versao = versao or pacote.versao
+    roteador = pacote.modelo if isinstance(pacote.modelo, RoteadorSegmentos) else None
+    nomes = [f"seg{int(c)}" for c in roteador.codigos] if roteador is not None else []
+    boosters = [carregar_booster(versao, nome=nome) for nome in nomes] + [carregar_booster(versao)]
+    return Explicador(boosters, pacote.features, roteador)
+
+
+def rotulo_feature(feature):
+    """Nome exibido de uma feature ("modelo_aeronave_encoded" -> "modelo aeronave")"""
+    return feature.replace('_encoded', '').replace('_', ' ')
+
+
+def figura_waterfall(contribuicoes, features, top=5, titulo="Principais fatores do risco"):
+    """Waterfall de uma linha: base -> top fatores -> demais -> margem final (log-odds)
+
+    Devolve a figura como dict: montar um go.Figure validado custa ~4 ms por clique."""
+    base, valores = float(contribuicoes[-1]), np.asarray(contribuicoes[:-1], dtype=np.float64)
+    ordem = np.argsort(-np.abs(valores))[:top]
+    resto = valores.sum() - valores[ordem].sum()
+
+    rotulos = ["Base"] + [rotulo_feature(features[i]) for i in ordem] + ["Demais fatores", "Previsão"]
+    medidas = ["absolute"] + ["relative"] * (len(ordem) + 1) + ["total"]
+    y = [base] + valores[ordem].tolist() + [resto, 0.0]
+    margem = base + valores.sum()
+
+    return {
+        'data': [{
+            'type': 'waterfall',
+            'x': rotulos, 'y': y, 'measure': medidas,
+            'text': [f"{v:+.2f}" if m == "relative" else f"{base if m == 'absolute' else margem:.2f}"
+                    for v, m in zip(y, medidas)],
+            'increasing': {'marker': {'color': "#dc3545"}},
+            'decreasing': {'marker': {'color': "#198754"}},
+            'totals': {'marker': {'color': "#0d6efd"}},
+        }],
+        'layout': {
+            'title': f"{titulo} (risco {100 / (1 + np.exp(-margem)):.1f}%)",
+            'yaxis': {'title': "Contribuição (log-odds)"},
+            'showlegend': False, 'height': 350, 'margin': dict(l=40, r=20, t=60, b=40),
+        },
+    }
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Modo ao vivo: uma fonte local de eventos (replay do CSV histórico em laço ou
+# o gerador sintético) empurra lotes de aeronaves inspecionadas para um buffer
+# circular de tamanho fixo. Os agregados da janela (inspeções e falhas por
+# modelo) são contadores atualizados a cada lote: soma do que entra e subtrai
+# o que sai do anel, O(1) por evento e sem varrer a janela. A página lê só os
+# eventos novos desde o seu cursor (número de sequência) e os agregados.
+# Cada processo do servidor tem a sua própria fonte.
+
+CAPACIDADE_PADRAO = 50_000
+COLUNAS_EVENTO = ['idade_aeronave_anos', 'horas_voo_total', 'ultima_manutencao_meses', 'falha_critica']
+
+
+class BufferTelemetria:
+    """Anel de eventos em arrays numpy com contagens por modelo na janela"""
+
+    def __init__(self, modelos, capacidade=CAPACIDADE_PADRAO):
+        self.modelos = list(modelos)
+        self.capacidade = capacidade
+        self.seq = np.full(capacidade, -1, dtype=np.int64)
+        self.instante = np.zeros(capacidade, dtype=np.float64)
+        self.modelo = np.zeros(capacidade, dtype=np.int16)
+        self.colunas = {col: np.zeros(capacidade, dtype=np.float64) for col in COLUNAS_EVENTO}
+        self.inspecoes = np.zeros(len(self.modelos), dtype=np.int64)
+        self.falhas = np.zeros(len(self.modelos), dtype=np.int64)
+        self.total = 0
+        self.inicio = time.time()
+        self._lock = threading.Lock()
+
+    def adicionar(self, modelo, colunas, instante=None):
+        """Lote de eventos: códigos de modelo (índices em self.modelos) + arrays de COLUNAS_EVENTO"""
+        modelo = np.asarray(modelo, dtype=np.int16)
+        falha = np.asarray(colunas['falha_critica']) > 0
+        descartados = max(len(modelo) - self.capacidade, 0)
+        if descartados:
+            # Só os últimos cabem no anel; os demais entram e saem no mesmo lote
+            modelo, falha = modelo[-self.capacidade:], falha[-self.capacidade:]
+            colunas = {col: np.asarray(v)[-self.capacidade:] for col, v in colunas.items()}
+        n = len(modelo)
+        instante = time.time() if instante is None else instante
+        n_modelos = len(self.modelos)
+
+        # Um único bloco: quem lê nunca vê o total avançado sem os eventos gravados
+        with self._lock:
+            self.total += descartados
+            posicoes = (self.total + np.arange(n)) % self.capacidade
+            ocupadas = posicoes[self.seq[posicoes] >= 0]
+            if len(ocupadas):
+                self.inspecoes -= np.bincount(self.modelo[ocupadas], minlength=n_modelos)
+                self.falhas -= np.bincount(self.modelo[ocupadas],
+                                        weights=self.colunas['falha_critica'][ocupadas] > 0,
+                                        minlength=n_modelos).astype(np.int64)
+            self.seq[posicoes] = self.total + np.arange(n)
+            self.instante[posicoes] = instante
+            self.modelo[posicoes] = modelo
+            for col in COLUNAS_EVENTO:
+                self.colunas[col][posicoes] = colunas[col]
+            self.inspecoes += np.bincount(modelo, minlength=n_modelos)
+            self.falhas += np.bincount(modelo, weights=falha, minlength=n_modelos).astype(np.int64)
+            self.total += n
+
+    def desde(self, cursor, limite=2000):
+        """Eventos com seq >= cursor (no máximo os `limite` mais recentes) e o novo cursor"""
+        with self._lock:
+            inicio = max(cursor, self.total - self.capacidade, self.total - limite)
+            seqs = np.arange(inicio, self.total)
+            posicoes = seqs % self.capacidade
+            eventos = {col: self.colunas[col][posicoes].copy() for col in COLUNAS_EVENTO}
+            eventos['modelo'] = self.modelo[posicoes].copy()
+            return eventos, self.total
+
+    def agregados(self):
+        """Inspeções, falhas e taxa de falha por modelo na janela"""
+        with self._lock:
+            inspecoes, falhas = self.inspecoes.copy(), self.falhas.copy()
+        return pd.DataFrame({
+            'modelo_aeronave': self.modelos,
+            'inspecoes': inspecoes,
+            'falhas': falhas,
+            'taxa_falha': falhas / np.maximum(inspecoes, 1),
+        })
+
+    @property
+    def na_janela(self):
+        return min(self.total, self.capacidade)
+
+
+class FonteEventos:
+    """Thread que publica lotes de eventos no buffer a uma taxa fixa"""
+
+    def __init__(self, dados, buffer, eventos_por_segundo=1000, lotes_por_segundo=20):
+        codigos = {m: i for i, m in enumerate(buffer.modelos)}
+        self.modelo = dados['modelo_aeronave'].map(codigos).fillna(0).to_numpy(dtype=np.int16)
+        self.colunas = {col: dados[col].to_numpy(dtype=np.float64) for col in COLUNAS_EVENTO}
+        self.buffer = buffer
+        self.tamanho_lote = max(1, eventos_por_segundo // lotes_por_segundo)
+        self.intervalo = self.tamanho_lote / eventos_por_segundo
+        self.posicao = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._publicar, name='fonte-telemetria', daemon=True)
+
+    def proximo_lote(self):
+        """Próximas linhas da fonte, voltando ao início ao chegar no fim (replay em laço)"""
+        linhas = (self.posicao + np.arange(self.tamanho_lote)) % len(self.modelo)
+        self.posicao = (self.posicao + self.tamanho_lote) % len(self.modelo)
+        return self.modelo[linhas], {col: v[linhas] for col, v in self.colunas.items()}
+
+    def _publicar(self):
+        proximo = time.perf_counter()
+        while not self._parar.is_set():
+            self.buffer.adicionar(*self.proximo_lote())
+            proximo += self.intervalo
+            self._parar.wait(max(0.0, proximo - time.perf_counter()))
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+
+def dados_fonte(origem='replay', linhas=100_000):
+    """Registros da fonte: o CSV histórico (replay) ou um bloco do gerador sintético"""
+    if origem == 'gerador':
+        from gerador_frota import gerar_frota
+        return gerar_frota(linhas, semente=int(time.time()))
+    from carregamento_paginas import dados_frota
+    return dados_frota()
+
+
+# Fonte do processo, criada no primeiro acesso à página ao vivo
+_fluxo_servico = {}
+_lock_servico = threading.Lock()
+
+
+def fluxo_servico():
+    """Buffer alimentado pela fonte configurada em AVIACAO_AO_VIVO_FONTE / AVIACAO_AO_VIVO_TAXA"""
+    with _lock_servico:
+        if 'buffer' not in _fluxo_servico:
+            from gerador_frota import MODELOS
+            dados = dados_fonte(os.environ.get('AVIACAO_AO_VIVO_FONTE', 'replay'))
+            modelos = sorted(set(MODELOS) | set(dados['modelo_aeronave'].unique()))
+            buffer = BufferTelemetria(modelos)
+            FonteEventos(dados, buffer, int(os.environ.get('AVIACAO_AO_VIVO_TAXA', 2000))).iniciar()
+            _fluxo_servico['buffer'] = buffer
+        return _fluxo_servico['buffer']
+
+
+if __name__ == '__main__':
+    # Vazão de ingestão do buffer (sem a espera da fonte) e custo de leitura da página
+    import argparse
+    from gerador_frota import MODELOS, gerar_frota
+    parser = argparse.ArgumentParser(description="Vazão do buffer de telemetria ao vivo")
+    parser.add_argument('--eventos', type=int, default=2_000_000)
+    parser.add_argument('--lote', type=int, default=100)
+    parser.add_argument('--capacidade', type=int, default=CAPACIDADE_PADRAO)
+    args = parser.parse_args()
+
+    buffer = BufferTelemetria(MODELOS, args.capacidade)
+    fonte = FonteEventos(gerar_frota(200_000), buffer, eventos_por_segundo=args.lote, lotes_por_segundo=1)
+    inicio = time.perf_counter()
+    for _ in range(args.eventos // args.lote):
+        buffer.adicionar(*fonte.proximo_lote())
+    segundos = time.perf_counter() - inicio
+    print(f"📡 {buffer.total:,} eventos em lotes de {args.lote}: {buffer.total / segundos:,.0f} eventos/s "
+        f"(janela de {buffer.na_janela:,})")
+
+    # Os contadores incrementais batem com a recontagem da janela
+    eventos, cursor = buffer.desde(0, limite=args.capacidade)
+    assert (np.bincount(eventos['modelo'], minlength=len(MODELOS)) == buffer.inspecoes).all()
+    assert (np.bincount(eventos['modelo'], weights=eventos['falha_critica'] > 0,
+                        minlength=len(MODELOS)) == buffer.falhas).all()
+
+    repeticoes = 1000
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        buffer.desde(cursor - 2000)
+        buffer.agregados()
+    print(f"Leitura da página (2.000 eventos + agregados): "
+        f"{(time.perf_counter() - inicio) / repeticoes * 1000:.3f} ms")
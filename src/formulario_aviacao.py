@@ -1,21 +1,83 @@
+import os
 from dash import html, dcc
-from dash.dependencies import Input, Output, State
+from flask import abort, send_file
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
-import joblib
-import pandas as pd
 import numpy as np
+import pandas as pd
 from app import app
+from arvores_compiladas import ARQUIVO_MODELO_CLIENTE
+from registro_modelos import carregar_pacote, listar_versoes, resolver_versao, versao_atual
+from carregamento_paginas import ARQUIVO_DADOS, dados_frota, recurso, versao_arquivo
+from explicacoes import explicador_compilado, figura_waterfall
+from metricas_app import medir_inferencia, metricas
+from monitor_drift import monitor_servico
+
+
+# Versões do registro são imutáveis: o JSON de uma versão pode ficar um ano no cache
+CACHE_MODELO_CLIENTE = 365 * 24 * 3600
+
+
+# Recursos carregados no primeiro uso (ou no aquecimento depois que o servidor sobe)
+@recurso('modelo')
+def modelo_servico():
+    """Pacote da versão ATUAL do registro (features + codificação + ensemble, sem xgboost/sklearn)"""
+    try:
+        modelo = carregar_pacote()
+        print(f"Modelo carregado com sucesso! (versão {modelo.versao})")
+        return modelo
+    except Exception as e:
+        print(f"Erro ao carregar modelo: {e}")
+        return None
+
+
+@recurso('modelo')
+def explicador_servico():
+    """Contribuições por caminho calculadas no próprio pacote (sem xgboost nem boosters)"""
+    modelo = modelo_servico()
+    if modelo is None:
+        return None
+    explicador = explicador_compilado(modelo)
+    if explicador is None:
+        print(f"Explicações indisponíveis: a versão {modelo.versao} foi exportada sem o valor "
+            "esperado dos nós (treine novamente para gerar)")
+    return explicador
+
+
+@recurso('dados', versao=lambda: versao_arquivo(ARQUIVO_DADOS))
+def indice_similares():
+    """Índice de aeronaves semelhantes no histórico (KD-tree por modelo/motor)"""
+    try:
+        from aeronaves_similares import IndiceSimilares
+        return IndiceSimilares(dados_frota())
+    except Exception as e:
+        print(f"Busca de aeronaves semelhantes indisponível: {e}")
+        return None
+
+
+@recurso('modelo')
+def modelo_cliente():
+    """URL do modelo em JSON para a prévia de risco no navegador (opcional)
+
+    O JSON não entra no layout: o navegador baixa uma vez pela URL com a versão,
+    que nunca muda de conteúdo e pode ficar em cache.
+    """
+    versao = versao_atual()
+    if versao is None or not os.path.exists(os.path.join(resolver_versao(versao), ARQUIVO_MODELO_CLIENTE)):
+        return None
+    return f"/modelo-cliente/{versao}.json"
+
 
-# Carregar modelo e metadados
-try:
-    modelo = joblib.load("modelo_aviacao.pkl")
-    label_encoders = joblib.load("label_encoders.pkl")
-    features_modelo = joblib.load("features_modelo.pkl")
-    mapeamento_categorias = joblib.load("mapeamento_categorias.pkl")
-    print("Modelo e metadados carregados com sucesso!")
-except Exception as e:
-    print(f"Erro ao carregar modelo: {e}")
-    modelo = None
+@app.server.route("/modelo-cliente/<versao>.json")
+def servir_modelo_cliente(versao):
+    """Entrega o modelo_cliente.json de uma versão registrada (com ETag)"""
+    if versao not in listar_versoes():
+        abort(404)
+    caminho = os.path.abspath(os.path.join(resolver_versao(versao), ARQUIVO_MODELO_CLIENTE))
+    if not os.path.exists(caminho):
+        abort(404)
+    return send_file(caminho, mimetype="application/json", etag=True,
+                     conditional=True, max_age=CACHE_MODELO_CLIENTE)
 
 # Opções para os dropdowns (SEM companhia aérea)
 opcoes_modelo = [
@@ -134,24 +196,29 @@ formulario = dbc.Container([
                                 className="w-100"
                             )
                         ], md=8, className="mx-auto")
-                    ])
+                    ]),
+
+                    # Prévia calculada no navegador; o resultado oficial vem do servidor
+                    html.Div(id="previa-risco", className="text-center text-muted mt-3")
                 ])
             ])
         ])
     ])
 ])
 
-# Layout principal da página
-layout = html.Div([
-    html.Div([
-        html.H1("Sistema de Previsão de Falhas em Aeronaves", 
-            className="text-center mt-4 mb-4 text-dark"),
-        html.P("Preveja o risco de falha crítica baseado nas características da aeronave",
-            className="text-center text-muted mb-5"),
-        formulario,
-        html.Div(id="previsao-aviacao", className="mt-4")
-    ], className="container")
-])
+# Layout principal da página (só a URL do modelo do navegador entra no layout)
+def criar_layout():
+    return html.Div([
+        html.Div([
+            html.H1("Sistema de Previsão de Falhas em Aeronaves", 
+                className="text-center mt-4 mb-4 text-dark"),
+            html.P("Preveja o risco de falha crítica baseado nas características da aeronave",
+                className="text-center text-muted mb-5"),
+            formulario,
+            dcc.Store(id="modelo-cliente", data=modelo_cliente()),
+            html.Div(id="previsao-aviacao", className="mt-4")
+        ], className="container")
+    ])
 
 @app.callback(
     Output("previsao-aviacao", "children"),
@@ -179,31 +246,56 @@ def prever_falha_aviacao(n_clicks, modelo_aeronave, tipo_motor, idade_aeronave,
         return dbc.Alert("Por favor, preencha todos os campos obrigatórios!", 
                         color="warning", className="text-center")
     
+    modelo = modelo_servico()
     if modelo is None:
         return dbc.Alert("Modelo não carregado. Execute o script de treinamento primeiro.", 
                         color="danger", className="text-center")
     
     try:
-        # Preparar dados para predição (SEM companhia_aerea)
-        entradas_usuario = pd.DataFrame({
+        # Preparar dados para predição (SEM companhia_aerea); o pacote
+        # codifica as categorias e garante a ordem das features
+        entradas_usuario = {
             'idade_aeronave_anos': [idade_aeronave],
             'horas_voo_total': [horas_voo],
             'ultima_manutencao_meses': [ultima_manutencao],
             'ciclos_pouso_decolagem': [ciclos_pouso],
             'temperatura_media_operacao': [temperatura_media],
-            'modelo_aeronave_encoded': [label_encoders['modelo_aeronave'].transform([modelo_aeronave])[0]],
-            'tipo_motor_encoded': [label_encoders['tipo_motor'].transform([tipo_motor])[0]]
-        })
+            'modelo_aeronave': [modelo_aeronave],
+            'tipo_motor': [tipo_motor]
+        }
         
-        # Garantir ordem correta das features
-        entradas_usuario = entradas_usuario[features_modelo]
-        
-        # Fazer a previsão
-        previsao = modelo.predict(entradas_usuario)[0]
-        probabilidade = modelo.predict_proba(entradas_usuario)[0]
+        # Fazer a previsão: risco de falha e tipo de falha na mesma passada;
+        # as contribuições usam a mesma matriz já codificada
+        X = modelo.transform(entradas_usuario)
+        monitor_drift = monitor_servico()
+        if monitor_drift is not None:
+            monitor_drift.registrar(entradas_usuario)
+        with medir_inferencia('predicao'):
+            risco, prob_tipos = modelo.predict_conjunto_matriz(X)
+        explicacao = []
+        explicador = explicador_servico()
+        if explicador is not None:
+            with medir_inferencia('explicacao'):
+                contribuicoes = explicador.contribuicoes(X)[0]
+            explicacao = [
+                html.H5("Por que este risco?"),
+                dcc.Graph(figure=figura_waterfall(contribuicoes, modelo.features),
+                        config={'displayModeBar': False}),
+                html.P("Barras vermelhas aumentam o risco e verdes reduzem (escala log-odds).",
+                    className="text-muted small"),
+            ]
+        previsao = int(risco[0] >= 0.5)
         
         # Calcular risco percentual
-        risco_percentual = probabilidade[1] * 100
+        risco_percentual = risco[0] * 100
+
+        # Sistemas mais prováveis (P(falha e sistema), somam o risco total)
+        ordem = np.argsort(-prob_tipos[0])[:3]
+        sistemas = [
+            html.Li(f"{modelo.classes_tipo[i]}: {prob_tipos[0, i] * 100:.1f}% "
+                    f"({prob_tipos[0, i] / risco[0] * 100:.0f}% das falhas previstas)")
+            for i in ordem
+        ]
         
         # Criar resultado
         if previsao == 1:
@@ -228,6 +320,38 @@ def prever_falha_aviacao(n_clicks, modelo_aeronave, tipo_motor, idade_aeronave,
             mensagem = f"{icone} RISCO BAIXO DE FALHA: {risco_percentual:.1f}%"
             recomendacao = "Aeronave em condições operacionais adequadas."
         
+        # Aeronaves semelhantes do histórico e o que aconteceu com elas
+        semelhantes = []
+        indice = indice_similares()
+        if indice is not None:
+            with medir_inferencia('similares'):
+                vizinhos = indice.buscar({
+                    'modelo_aeronave': modelo_aeronave, 'tipo_motor': tipo_motor,
+                    'idade_aeronave_anos': idade_aeronave, 'horas_voo_total': horas_voo,
+                    'ultima_manutencao_meses': ultima_manutencao, 'ciclos_pouso_decolagem': ciclos_pouso,
+                    'temperatura_media_operacao': temperatura_media
+                }, k=5)
+            tabela = pd.DataFrame({
+                'Modelo': vizinhos['modelo_aeronave'],
+                'Motor': vizinhos['tipo_motor'],
+                'Idade': vizinhos['idade_aeronave_anos'],
+                'Horas de voo': vizinhos['horas_voo_total'].map('{:,.0f}'.format),
+                'Manutenção (meses)': vizinhos['ultima_manutencao_meses'],
+                'Ciclos': vizinhos['ciclos_pouso_decolagem'],
+                'Falha crítica': vizinhos['falha_critica'].map({1: "Sim", 0: "Não"}),
+                'Tipo de falha': vizinhos['tipo_falha'],
+            })
+            n_falhas = int(vizinhos['falha_critica'].sum())
+            semelhantes = [
+                html.Hr(),
+                html.H5("Aeronaves Semelhantes no Histórico:"),
+                html.P(f"{n_falhas} de {len(vizinhos)} tiveram falha crítica"
+                    + (" (sem histórico suficiente deste modelo/motor: busca em toda a frota)"
+                        if vizinhos['indice_global'].iloc[0] else ""),
+                    className="text-muted"),
+                dbc.Table.from_dataframe(tabela, striped=True, bordered=False, hover=True, size="sm"),
+            ]
+
         # Card de resultado
         resultado = dbc.Card([
             dbc.CardHeader("Resultado da Análise", className="bg-light"),
@@ -241,6 +365,8 @@ def prever_falha_aviacao(n_clicks, modelo_aeronave, tipo_motor, idade_aeronave,
                 ], style={"height": "25px"}, className="mb-2"),
                 html.P(f"Probabilidade de falha: {risco_percentual:.1f}%"),
                 html.P(f"Probabilidade de operação segura: {100-risco_percentual:.1f}%"),
+                *([html.H5("Sistemas Mais Prováveis de Falhar:"), html.Ul(sistemas)] if sistemas else []),
+                *explicacao,
                 html.Hr(),
                 html.H5("Resumo dos Dados:"),
                 html.Ul([
@@ -251,18 +377,21 @@ def prever_falha_aviacao(n_clicks, modelo_aeronave, tipo_motor, idade_aeronave,
                     html.Li(f"Última manutenção: {ultima_manutencao} meses atrás"),
                     html.Li(f"Ciclos: {ciclos_pouso} pousos/decolagens"),
                     html.Li(f"Temperatura média: {temperatura_media}°C")
-                ])
+                ]),
+                *semelhantes
             ])
         ], color=cor_alerta, outline=True, className="mt-3")
         
         return resultado
         
     except Exception as e:
+        metricas.registrar_erro('prever_falha_aviacao')
         return dbc.Alert(f"Erro na previsão: {str(e)}", 
                         color="danger", className="text-center")
 
-# Callback para validação em tempo real (SEM companhia aérea)
-@app.callback(
+# Callbacks executados no navegador (assets/previsao_cliente.js), sem ida ao servidor
+app.clientside_callback(
+    ClientsideFunction(namespace="aviacao", function_name="validar_formulario"),
     Output("botao-prever", "disabled"),
     [Input("modelo_aeronave", "value"),
     Input("tipo_motor", "value"),
@@ -272,8 +401,17 @@ def prever_falha_aviacao(n_clicks, modelo_aeronave, tipo_motor, idade_aeronave,
     Input("ciclos_pouso", "value"),
     Input("temperatura_media", "value")]
 )
-def validar_formulario(modelo_aeronave, tipo_motor, idade_aeronave, 
-                    horas_voo, ultima_manutencao, ciclos_pouso, temperatura_media):
-    campos_obrigatorios = [modelo_aeronave, tipo_motor, idade_aeronave, 
-                        horas_voo, ultima_manutencao, ciclos_pouso, temperatura_media]
-    return any(campo is None for campo in campos_obrigatorios)
\ No newline at end of file
+
+app.clientside_callback(
+    ClientsideFunction(namespace="aviacao", function_name="prever_risco"),
+    [Output("previa-risco", "children"),
+    Output("previa-risco", "className")],
+    [Input("modelo_aeronave", "value"),
+    Input("tipo_motor", "value"),
+    Input("idade_aeronave", "value"),
+    Input("horas_voo", "value"),
+    Input("ultima_manutencao", "value"),
+    Input("ciclos_pouso", "value"),
+    Input("temperatura_media", "value")],
+    State("modelo-cliente", "data")
+)
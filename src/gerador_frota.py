@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# Gerador vetorizado de frotas sintéticas com o esquema e as regras de risco de
+# data/aviacao_falhas.py (o script original usa iterrows e serve para os 2.000
+# registros do dataset; aqui milhões de linhas saem em segundos). Usado pelo
+# benchmark de escala e pela fonte de eventos do modo ao vivo.
+
+MODELOS = ['Boeing 737', 'Airbus A320', 'Boeing 787', 'Airbus A330',
+        'Embraer E190', 'Boeing 777', 'Airbus A350', 'Bombardier CRJ']
+MOTORES = ['Turbojato', 'Turbofan', 'Turboprop']
+COMPANHIAS = ['LATAM', 'GOL', 'Azul', 'American', 'Delta', 'United', 'British', 'Emirates']
+
+
+def gerar_frota(n, semente=42):
+    """Bloco de n aeronaves com o esquema e as regras de risco de data/aviacao_falhas.py"""
+    rng = np.random.default_rng(semente)
+    dados = pd.DataFrame({
+        'modelo_aeronave': rng.choice(MODELOS, n),
+        'idade_aeronave_anos': rng.integers(1, 30, n),
+        'horas_voo_total': rng.integers(500, 50000, n),
+        'tipo_motor': rng.choice(MOTORES, n),
+        'companhia_aerea': rng.choice(COMPANHIAS, n),
+        'ultima_manutencao_meses': rng.integers(1, 24, n),
+        'ciclos_pouso_decolagem': rng.integers(50, 5000, n),
+        'temperatura_media_operacao': rng.uniform(-40, 45, n),
+    })
+
+    idade, horas = dados['idade_aeronave_anos'].to_numpy(), dados['horas_voo_total'].to_numpy()
+    manutencao, ciclos = dados['ultima_manutencao_meses'].to_numpy(), dados['ciclos_pouso_decolagem'].to_numpy()
+    motor = dados['tipo_motor'].to_numpy()
+    prob = (np.select([idade > 20, idade > 15, idade > 10], [0.3, 0.2, 0.1], 0.0)
+            + np.select([horas > 40000, horas > 30000, horas > 20000], [0.25, 0.15, 0.05], 0.0)
+            + np.select([manutencao > 18, manutencao > 12], [0.2, 0.1], 0.0)
+            + np.select([ciclos > 4000, ciclos > 3000], [0.15, 0.08], 0.0)
+            + np.select([motor == 'Turbojato', motor == 'Turboprop'], [0.05, 0.03], 0.0)
+            + np.where(np.abs(dados['temperatura_media_operacao'].to_numpy()) > 35, 0.1, 0.0))
+    prob = np.clip(prob + rng.uniform(-0.1, 0.1, n), 0, 1)
+    falha = rng.random(n) < prob
+    dados['falha_critica'] = falha.astype(float)
+
+    # Tipo de falha pelas mesmas faixas do gerador original
+    grupos = np.select([idade > 20, horas > 40000, manutencao > 18], [0, 1, 2], 3)
+    opcoes = [(['Sistema Hidráulico', 'Estrutural', 'Elétrico'], [0.4, 0.3, 0.3]),
+            (['Motor', 'Sistema de Combustível', 'APU'], [0.5, 0.3, 0.2]),
+            (['Sistemas de Navegação', 'Comunicações', 'Instrumentos'], [0.4, 0.3, 0.3]),
+            (['Sistema de Pouso', 'Pressurização', 'Outros'], [1 / 3, 1 / 3, 1 / 3])]
+    tipo = np.full(n, 'Nenhuma', dtype=object)
+    for grupo, (tipos, pesos) in enumerate(opcoes):
+        linhas = np.flatnonzero(falha & (grupos == grupo))
+        tipo[linhas] = rng.choice(tipos, len(linhas), p=pesos)
+    dados['tipo_falha'] = tipo
+    return dados
@@ -1,15 +1,87 @@
+import json
+import time
+inicio_import = time.perf_counter()
 from dash import Dash, html, dcc
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
 from app import app
-import graficos_aviacao, formulario_aviacao, analises_avancadas
+from carregamento_paginas import TEMPOS_IMPORT, aquecer_no_primeiro_acesso, importar, relatorio_inicializacao
+from metricas_app import instrumentar
+from perfil_requisicoes import instrumentar_perfil
+from particoes_companhia import companhia_da_url, companhias
+try:
+    # O plotly importa o orjson sob demanda; com o aquecimento rodando junto com as primeiras
+    # requisições, duas threads podiam importá-lo ao mesmo tempo (módulo parcialmente iniciado)
+    import orjson
+except ImportError:
+    orjson = None
+TEMPOS_IMPORT['bibliotecas (dash, plotly, pandas)'] = time.perf_counter() - inicio_import
+
+# Import das páginas só registra layouts e callbacks; dados, modelo e figuras
+# carregam no primeiro acesso ou no aquecimento após o servidor subir
+graficos_aviacao = importar('graficos_aviacao')
+formulario_aviacao = importar('formulario_aviacao')
+analises_avancadas = importar('analises_avancadas')
+monitoramento_aviacao = importar('monitoramento_aviacao')
+operacoes_aviacao = importar('operacoes_aviacao')
+ao_vivo_aviacao = importar('ao_vivo_aviacao')
+
+# Tempo, tamanho e erros por callback + GET /metrics (Prometheus)
+instrumentar(app)
+# Perfil sob demanda (AVIACAO_PERFIL_TOKEN / AVIACAO_PERFIL_AMOSTRAGEM)
+instrumentar_perfil(app)
+# Dados, modelo e gráficos carregam em segundo plano a partir da primeira
+# requisição de cada processo -- vale para app.run e para gunicorn (o processo
+# pai do reloader não atende, então não aquece)
+aquecer_no_primeiro_acesso(app.server, ao_terminar=lambda: print(relatorio_inicializacao()))
+
+# Relatório gerado por: python src/modelo_aviacao.py --modo avaliacao
+ARQUIVO_METRICAS = "metricas_modelo.json"
+
+
+def carregar_metricas(caminho=ARQUIVO_METRICAS):
+    """Relatório de avaliação (k-fold + bootstrap) ou None se ainda não foi gerado"""
+    try:
+        with open(caminho, encoding='utf-8') as arq:
+            return json.load(arq)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def formatar_estatisticas(relatorio):
+    """Textos da página inicial a partir do relatório; "—" quando não há relatório"""
+    if relatorio is None:
+        return {'registros': "—", 'taxa_falha': "—", 'acuracia': "—", 'acuracia_ic': "",
+                'auc': "—", 'modelos': "—", 'motores': "—", 'configuracao': "—"}
+    dataset, metricas = relatorio['dataset'], relatorio['metricas']
+    ic = metricas['acuracia']['ic95']
+    return {
+        'registros': f"{dataset['n_registros']:,}".replace(",", "."),
+        'taxa_falha': f"{dataset['taxa_falha']:.1%}",
+        'acuracia': f"{metricas['acuracia']['media_cv']:.1%}",
+        'acuracia_ic': f"IC 95%: {ic[0]:.1%} – {ic[1]:.1%} ({relatorio['k_folds']}-fold)",
+        'auc': f"{metricas['roc_auc']['media_cv']:.3f}",
+        'modelos': str(dataset['n_modelos_aeronave']),
+        'motores': str(dataset['n_tipos_motor']),
+        'configuracao': relatorio.get('configuracao') or f"versão {relatorio.get('versao_modelo')}",
+    }
+
+
+estatisticas = formatar_estatisticas(carregar_metricas())
 
 # Configuração da navegação com base na AZUL airlines 
+ROTAS_NAVEGACAO = [
+    ("Dashboard", "/graficos"),
+    ("Previsão de Falhas", "/formulario"),
+    ("Análises", "/analises"),
+    ("Monitoramento", "/monitoramento"),
+    ("Ao Vivo", "/ao-vivo"),
+    ("Operações", "/operacoes"),
+]
 navegacao = dbc.NavbarSimple(
     children=[
-        dbc.NavItem(dbc.NavLink("Dashboard", href="/graficos", className="nav-link-custom")),
-        dbc.NavItem(dbc.NavLink("Previsão de Falhas", href="/formulario", className="nav-link-custom")),
-        dbc.NavItem(dbc.NavLink("Análises", href="/analises", className="nav-link-custom")),
+        dbc.NavItem(dbc.NavLink(rotulo, href=rota, id=f"nav{rota.replace('/', '-')}", className="nav-link-custom"))
+        for rotulo, rota in ROTAS_NAVEGACAO
     ],
     brand="Sistema de Gestão de Aviação",
     brand_href="/",
@@ -72,7 +144,7 @@ pagina_inicial = dbc.Container([
                     dbc.Col([
                         dbc.Card([
                             dbc.CardBody([
-                                html.H4("2.000+", className="text-primary"),
+                                html.H4(estatisticas['registros'], className="text-primary"),
                                 html.P("Aeronaves Monitoradas", className="text-muted")
                             ])
                         ], className="text-center border-0 shadow-sm")
@@ -80,7 +152,7 @@ pagina_inicial = dbc.Container([
                     dbc.Col([
                         dbc.Card([
                             dbc.CardBody([
-                                html.H4("24.2%", className="text-warning"),
+                                html.H4(estatisticas['taxa_falha'], className="text-warning"),
                                 html.P("Taxa de Falha Média", className="text-muted")
                             ])
                         ], className="text-center border-0 shadow-sm")
@@ -88,15 +160,16 @@ pagina_inicial = dbc.Container([
                     dbc.Col([
                         dbc.Card([
                             dbc.CardBody([
-                                html.H4("88.7%", className="text-success"),
-                                html.P("Precisão do Modelo", className="text-muted")
+                                html.H4(estatisticas['acuracia'], className="text-success"),
+                                html.P("Acurácia do Modelo", className="text-muted"),
+                                html.Small(estatisticas['acuracia_ic'], className="text-muted")
                             ])
                         ], className="text-center border-0 shadow-sm")
                     ], md=3),
                     dbc.Col([
                         dbc.Card([
                             dbc.CardBody([
-                                html.H4("8", className="text-info"),
+                                html.H4(estatisticas['modelos'], className="text-info"),
                                 html.P("Modelos de Aeronaves", className="text-muted")
                             ])
                         ], className="text-center border-0 shadow-sm")
@@ -106,11 +179,12 @@ pagina_inicial = dbc.Container([
                 # Informações técnicas sobre os dados a serem mostrados
                 html.Div([
                     html.H4("Sobre o Sistema", className="mt-5 mb-3"),
-                    html.P("""
+                    html.P(f"""
                         Este sistema utiliza machine learning para prever falhas críticas em aeronaves 
                         baseado em dados históricos de operação, manutenção e características técnicas. 
-                        O modelo foi treinado com dados de 2.000 aeronaves e alcança 88.7% de precisão 
-                        na previsão de falhas.
+                        O modelo foi treinado com dados de {estatisticas['registros']} aeronaves e alcança 
+                        {estatisticas['acuracia']} de acurácia (ROC-AUC {estatisticas['auc']}) em validação 
+                        cruzada na previsão de falhas (configuração avaliada: {estatisticas['configuracao']}).
                     """, className="text-justify"),
                     
                     html.H5("Funcionalidades Principais:", className="mt-4"),
@@ -157,21 +231,50 @@ app.layout = html.Div([
     html.Div(id='page-content', style={'minHeight': '80vh'})
 ])
 
+# Páginas com dados por companhia (?companhia=<nome> lê só a partição dela)
+PAGINAS_POR_COMPANHIA = ('/graficos', '/analises')
+
+
 # Callback para roteamento de páginas
 @app.callback(
     Output('page-content', 'children'),
-    [Input('url', 'pathname')]
+    [Input('url', 'pathname'),
+    Input('url', 'search')]
 )
-def display_page(pathname):
+def display_page(pathname, search=None):
+    companhia = companhia_da_url(search)
+    if companhia is not None and pathname in PAGINAS_POR_COMPANHIA:
+        if companhia not in companhias():
+            return dbc.Container(dbc.Alert(f"Companhia desconhecida: {companhia}", color="danger",
+                                        className="text-center mt-4"))
+        pagina = (graficos_aviacao.layout_companhia(companhia) if pathname == '/graficos'
+                else analises_avancadas.layout)
+        return html.Div([dbc.Badge(f"Companhia: {companhia}", color="info", className="ms-4 mb-2"), pagina])
+
     if pathname == '/formulario':
-        return formulario_aviacao.layout
+        return formulario_aviacao.criar_layout()
     elif pathname == '/graficos':
-        return graficos_aviacao.layout
+        return graficos_aviacao.criar_layout()
     elif pathname == '/analises':
         return analises_avancadas.layout
+    elif pathname == '/monitoramento':
+        return monitoramento_aviacao.layout
+    elif pathname == '/ao-vivo':
+        return ao_vivo_aviacao.criar_layout()
+    elif pathname == '/operacoes':
+        return operacoes_aviacao.layout
     else:
         return pagina_inicial
 
+
+# A navegação mantém o ?companhia= da página atual (no navegador, sem ida ao servidor)
+app.clientside_callback(
+    "function(search) { return %s.map(rota => rota + (search || '')); }" % json.dumps(
+        [rota for _, rota in ROTAS_NAVEGACAO]),
+    [Output(f"nav{rota.replace('/', '-')}", 'href') for _, rota in ROTAS_NAVEGACAO],
+    Input('url', 'search')
+)
+
 # CSS personalizado
 app.index_string = '''
 <!DOCTYPE html>
@@ -223,10 +326,16 @@ if __name__ == '__main__':
     print("   - http://localhost:8050/graficos (Dashboard)")
     print("   - http://localhost:8050/formulario (Previsão de Falhas)")
     print("   - http://localhost:8050/analises (Análises Avançadas)")
+    print("   - http://localhost:8050/monitoramento (Monitoramento de Drift)")
+    print("   - http://localhost:8050/ao-vivo (Telemetria ao Vivo)")
+    print("   - http://localhost:8050/operacoes (Latência dos Callbacks)")
+    print("   - http://localhost:8050/graficos?companhia=LATAM (Dashboard e Análises só da companhia)")
+    print("   - http://localhost:8050/metrics (Métricas no formato Prometheus)")
     print("\n   Estatísticas do sistema:")
-    print("   - 2.000 aeronaves no dataset")
-    print("   - Modelo com 88.7% de precisão")
-    print("   - 8 tipos de aeronaves diferentes")
-    print("   - 3 tipos de motor analisados")
-    
-    app.run(debug=True, host='0.0.0.0', port=8050)
\ No newline at end of file
+    print(f"   - {estatisticas['registros']} aeronaves no dataset")
+    print(f"   - Modelo com {estatisticas['acuracia']} de acurácia ({estatisticas['acuracia_ic']})")
+    print(f"   - {estatisticas['modelos']} tipos de aeronaves diferentes")
+    print(f"   - {estatisticas['motores']} tipos de motor analisados")
+    print("\n   Dados, modelo e gráficos carregam em segundo plano a partir da primeira requisição")
+
+    app.run(debug=True, host='0.0.0.0', port=8050)
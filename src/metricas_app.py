@@ -0,0 +1,187 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+
+# Métricas do servidor do app no formato texto do Prometheus (GET /metrics):
+# tempo e tamanho da resposta por callback do Dash, erros por callback e tempo
+# de inferência do modelo por etapa. A medição fica nos hooks do Flask em
+# /_dash-update-component (um perf_counter e um bisect por requisição, alguns
+# microssegundos contra milissegundos de callback). Cada processo do servidor
+# tem as suas próprias métricas; callbacks clientside rodam no navegador e não
+# passam por aqui.
+
+ROTA_CALLBACKS = '/_dash-update-component'
+LIMITES_TEMPO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histograma:
+    """Histograma de faixas fixas (contagens por faixa, soma e total)"""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def quantil(self, q):
+        """Quantil estimado por interpolação linear dentro da faixa"""
+        if not self.total:
+            return float('nan')
+        alvo, acumulado = q * self.total, 0
+        for i, contagem in enumerate(self.contagens):
+            if acumulado + contagem >= alvo and contagem:
+                inicio = self.limites[i - 1] if i > 0 else 0.0
+                fim = self.limites[i] if i < len(self.limites) else self.limites[-1]
+                return inicio + (fim - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-1]
+
+
+class MetricasApp:
+    """Registro das métricas do processo (seguro entre threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tempo_callback = {}
+        self.bytes_callback = {}
+        self.erros_callback = {}
+        self.tempo_inferencia = {}
+        self.inicio = time.time()
+
+    def registrar_callback(self, nome, segundos, n_bytes, erro=False):
+        with self._lock:
+            if nome not in self.tempo_callback:
+                self.tempo_callback[nome] = Histograma(LIMITES_TEMPO)
+                self.bytes_callback[nome] = Histograma(LIMITES_BYTES)
+                self.erros_callback[nome] = 0
+            self.tempo_callback[nome].observar(segundos)
+            self.bytes_callback[nome].observar(n_bytes)
+            self.erros_callback[nome] += erro
+
+    def registrar_erro(self, nome):
+        """Erro tratado dentro do callback (a resposta sai 200 com a mensagem de erro)"""
+        with self._lock:
+            self.erros_callback[nome] = self.erros_callback.get(nome, 0) + 1
+
+    def registrar_inferencia(self, etapa, segundos):
+        with self._lock:
+            if etapa not in self.tempo_inferencia:
+                self.tempo_inferencia[etapa] = Histograma(LIMITES_TEMPO)
+            self.tempo_inferencia[etapa].observar(segundos)
+
+    def resumo(self):
+        """Linhas por callback para a página de operações"""
+        with self._lock:
+            return [{
+                'callback': nome,
+                'chamadas': tempo.total,
+                'erros': self.erros_callback.get(nome, 0),
+                'p50_ms': tempo.quantil(0.5) * 1000,
+                'p95_ms': tempo.quantil(0.95) * 1000,
+                'p99_ms': tempo.quantil(0.99) * 1000,
+                'media_kb': self.bytes_callback[nome].soma / max(self.bytes_callback[nome].total, 1) / 1024,
+            } for nome, tempo in sorted(self.tempo_callback.items())]
+
+    def texto_prometheus(self):
+        """Exposição no formato texto 0.0.4 do Prometheus"""
+        linhas = []
+        with self._lock:
+            _histogramas(linhas, 'aviacao_callback_duracao_segundos',
+                        "Tempo de resposta dos callbacks do Dash", 'callback', self.tempo_callback)
+            _histogramas(linhas, 'aviacao_callback_resposta_bytes',
+                        "Tamanho da resposta dos callbacks do Dash", 'callback', self.bytes_callback)
+            linhas.append("# HELP aviacao_callback_erros_total Erros por callback do Dash")
+            linhas.append("# TYPE aviacao_callback_erros_total counter")
+            for nome, erros in sorted(self.erros_callback.items()):
+                linhas.append(f'aviacao_callback_erros_total{{callback="{_escapar_rotulo(nome)}"}} {erros}')
+            _histogramas(linhas, 'aviacao_inferencia_duracao_segundos',
+                        "Tempo de inferência do modelo por etapa", 'etapa', self.tempo_inferencia)
+        linhas.append("# HELP aviacao_processo_inicio_segundos Início do processo (epoch)")
+        linhas.append("# TYPE aviacao_processo_inicio_segundos gauge")
+        linhas.append(f"aviacao_processo_inicio_segundos {self.inicio:.3f}")
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar_rotulo(valor):
+    """Valor de rótulo no formato texto do Prometheus (\\, \" e quebras de linha escapados)"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogramas(linhas, metrica, ajuda, rotulo, histogramas):
+    linhas.append(f"# HELP {metrica} {ajuda}")
+    linhas.append(f"# TYPE {metrica} histogram")
+    for nome, hist in sorted(histogramas.items()):
+        nome = _escapar_rotulo(nome)
+        acumulado = 0
+        for limite, contagem in zip(hist.limites + (float('inf'),), hist.contagens):
+            acumulado += contagem
+            le = '+Inf' if limite == float('inf') else f"{limite:g}"
+            linhas.append(f'{metrica}_bucket{{{rotulo}="{nome}",le="{le}"}} {acumulado}')
+        linhas.append(f'{metrica}_sum{{{rotulo}="{nome}"}} {hist.soma:.6f}')
+        linhas.append(f'{metrica}_count{{{rotulo}="{nome}"}} {hist.total}')
+
+
+metricas = MetricasApp()
+
+
+@contextmanager
+def medir_inferencia(etapa):
+    """Mede um trecho de inferência do modelo (ex.: 'predicao', 'explicacao')"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.registrar_inferencia(etapa, time.perf_counter() - inicio)
+
+
+_nomes_callback = {}
+
+
+def nome_callback(app, saida):
+    """Nome da função do callback a partir do id de saída enviado pelo Dash (chave de app.callback_map)
+
+    Saídas que o app não registrou (o id vem do cliente) caem todas em
+    'desconhecido' e não entram no cache: uma série por callback, não por id.
+    """
+    nome = _nomes_callback.get(saida)
+    if nome is None:
+        if saida not in app.callback_map:
+            return 'desconhecido'
+        funcao = app.callback_map[saida].get('callback')
+        nome = _nomes_callback[saida] = getattr(funcao, '__name__', 'desconhecido')
+    return nome
+
+
+def instrumentar(app):
+    """Registra os hooks de medição dos callbacks e a rota /metrics no servidor Flask do app"""
+    server = app.server
+
+    @server.before_request
+    def iniciar_medicao():
+        if request.path.endswith(ROTA_CALLBACKS):
+            g.inicio_callback = time.perf_counter()
+
+    @server.after_request
+    def registrar_medicao(resposta):
+        inicio = g.pop('inicio_callback', None)
+        if inicio is not None:
+            corpo = request.get_json(silent=True) or {}
+            metricas.registrar_callback(
+                nome_callback(app, corpo.get('output', '?')),
+                time.perf_counter() - inicio,
+                resposta.content_length or 0,
+                erro=resposta.status_code >= 500,
+            )
+        return resposta
+
+    @server.route('/metrics')
+    def exportar_metricas():
+        return Response(metricas.texto_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -1,120 +1,297 @@
+import argparse
+import json
+import time
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 import xgboost as xgb
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import joblib
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
 from sklearn.preprocessing import LabelEncoder
+from pacote_modelo import PacoteModelo
+from registro_modelos import registrar_versao
+from monitor_drift import criar_baseline
 
-# Carregando o Dataset de Aviação
-dados = pd.read_csv('aviacao_falhas.csv')
-
-print("📊 Estatísticas do Dataset:")
-print(f"Total de registros: {len(dados)}")
-print(f"Falhas críticas: {dados['falha_critica'].sum()} ({dados['falha_critica'].mean()*100:.1f}%)")
-print("\nColunas disponíveis:")
-print(dados.columns.tolist())
-
-# Pré-processamento dos dados
-print("\n🔧 Pré-processando dados...")
+ARQUIVO_DADOS = 'aviacao_falhas.csv'
 
 # Codificar variáveis categóricas (SEM companhia_aerea)
-label_encoders = {}
 categorical_columns = ['modelo_aeronave', 'tipo_motor', 'tipo_falha']
 
-for col in categorical_columns:
-    if col in dados.columns:
-        le = LabelEncoder()
-        dados[f'{col}_encoded'] = le.fit_transform(dados[col])
-        label_encoders[col] = le
-        print(f"Codificada coluna: {col} -> {col}_encoded")
-
 # Selecionar features para o modelo (SEM companhia_aerea)
 features = [
-    'idade_aeronave_anos', 
-    'horas_voo_total', 
+    'idade_aeronave_anos',
+    'horas_voo_total',
     'ultima_manutencao_meses',
-    'ciclos_pouso_decolagem', 
+    'ciclos_pouso_decolagem',
     'temperatura_media_operacao',
-    'modelo_aeronave_encoded', 
+    'modelo_aeronave_encoded',
     'tipo_motor_encoded'
 ]
 
-X = dados[features]
-y = dados['falha_critica']
-
-print(f"\nFeatures utilizadas: {features}")
-print(f"Shape de X: {X.shape}")
-print(f"Shape de y: {y.shape}")
-
-# Separando os dados
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, 
-    test_size=0.2, 
-    random_state=42, 
-    stratify=y
-)
-
-print(f"\nDivisão dos dados:")
-print(f"Treino: {X_train.shape[0]} amostras")
-print(f"Teste: {X_test.shape[0]} amostras")
-print(f"Taxa de falhas no treino: {y_train.mean():.3f}")
-print(f"Taxa de falhas no teste: {y_test.mean():.3f}")
-
-# Criando e treinando modelo XGBoost
-print("\nTreinando modelo XGBoost...")
-modelo = xgb.XGBClassifier(
-    objective="binary:logistic",
-    eval_metric="logloss",
-    n_estimators=100,
-    max_depth=6,
-    learning_rate=0.1,
-    random_state=42
-)
-
-modelo.fit(X_train, y_train)
-
-# Fazendo previsões
-print("\nAvaliando o modelo...")
-preds_train = modelo.predict(X_train)
-preds_test = modelo.predict(X_test)
-
-# Avaliando o modelo
-acuracia_train = accuracy_score(y_train, preds_train)
-acuracia_test = accuracy_score(y_test, preds_test)
-
-print(f"Acurácia no treino: {acuracia_train:.2%}")
-print(f"Acurácia no teste: {acuracia_test:.2%}")
-
-print("\nRelatório de classificação (teste):")
-print(classification_report(y_test, preds_test))
-
-# Importância das features
-print("\nImportância das features:")
-importancias = modelo.feature_importances_
-feature_importance_df = pd.DataFrame({
-    'feature': features,
-    'importance': importancias
-}).sort_values('importance', ascending=False)
-
-print(feature_importance_df)
-
-# Salvando o modelo treinado e informações
-print("\nSalvando modelo e metadados...")
-joblib.dump(modelo, "modelo_aviacao.pkl")
-joblib.dump(label_encoders, "label_encoders.pkl")
-joblib.dump(features, "features_modelo.pkl")
-
-# Salvar mapeamentos para uso no formulário
-mapeamento_categorias = {}
-for col in categorical_columns:
-    if col in label_encoders:
-        mapeamento_categorias[col] = {
-            'classes': label_encoders[col].classes_.tolist(),
-            'encoded': list(range(len(label_encoders[col].classes_)))
-        }
-
-joblib.dump(mapeamento_categorias, "mapeamento_categorias.pkl")
-
-print("Modelo e arquivos auxiliares salvos com sucesso!")
-print("Modelo treinado e pronto para uso!")
\ No newline at end of file
+PARAMETROS_PADRAO = {
+    'objective': "binary:logistic",
+    'eval_metric': "logloss",
+    'n_estimators': 100,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'random_state': 42
+}
+
+# Modelo de tipo_falha: multiclasse treinado só nos registros com falha, ou seja,
+# estima P(tipo | falha); multiplicado pelo risco do binário dá P(falha e tipo).
+# Raso e com poucas rodadas porque tem uma árvore por classe a cada rodada
+# (15 x 12 árvores de profundidade 3 acertam o mesmo top-3 que 50 x 12 de profundidade 4).
+SEM_FALHA = 'Nenhuma'
+PARAMETROS_TIPO = {
+    'objective': "multi:softprob",
+    'eval_metric': "mlogloss",
+    'n_estimators': 15,
+    'max_depth': 3,
+    'learning_rate': 0.3,
+    'random_state': 42
+}
+
+
+def carregar_parametros(caminho=None):
+    """PARAMETROS_PADRAO com os valores de um JSON por cima (ex.: melhores_hiperparametros.json do ajuste)"""
+    if caminho is None:
+        return dict(PARAMETROS_PADRAO)
+    with open(caminho, encoding='utf-8') as arq:
+        return dict(PARAMETROS_PADRAO, **json.load(arq))
+
+
+def carregar_dados(caminho=ARQUIVO_DADOS):
+    """Carrega o dataset e codifica as colunas categóricas"""
+    dados = pd.read_csv(caminho)
+
+    print("📊 Estatísticas do Dataset:")
+    print(f"Total de registros: {len(dados)}")
+    print(f"Falhas críticas: {dados['falha_critica'].sum()} ({dados['falha_critica'].mean()*100:.1f}%)")
+    print("\nColunas disponíveis:")
+    print(dados.columns.tolist())
+
+    # Pré-processamento dos dados
+    print("\n🔧 Pré-processando dados...")
+    label_encoders = codificar_categoricas(dados)
+
+    return dados, label_encoders
+
+
+def codificar_categoricas(dados):
+    """Adiciona as colunas *_encoded (LabelEncoder) e devolve os encoders por coluna"""
+    label_encoders = {}
+    for col in categorical_columns:
+        if col in dados.columns:
+            le = LabelEncoder()
+            dados[f'{col}_encoded'] = le.fit_transform(dados[col])
+            label_encoders[col] = le
+            print(f"Codificada coluna: {col} -> {col}_encoded")
+    return label_encoders
+
+
+def dividir_dados(dados):
+    """Separa treino e teste (80/20 estratificado)"""
+    X = dados[features]
+    y = dados['falha_critica']
+
+    print(f"\nFeatures utilizadas: {features}")
+    print(f"Shape de X: {X.shape}")
+    print(f"Shape de y: {y.shape}")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=0.2,
+        random_state=42,
+        stratify=y
+    )
+
+    print(f"\nDivisão dos dados:")
+    print(f"Treino: {X_train.shape[0]} amostras")
+    print(f"Teste: {X_test.shape[0]} amostras")
+    print(f"Taxa de falhas no treino: {y_train.mean():.3f}")
+    print(f"Taxa de falhas no teste: {y_test.mean():.3f}")
+
+    return X_train, X_test, y_train, y_test
+
+
+def treinar_modelo_tipo(dados, X_train, X_test):
+    """Multiclasse de tipo_falha nos registros com falha do mesmo split do binário"""
+    com_falha = dados['tipo_falha'] != SEM_FALHA
+    classes_tipo = sorted(dados.loc[com_falha, 'tipo_falha'].unique())
+    codigos = {classe: i for i, classe in enumerate(classes_tipo)}
+
+    treino = X_train.index[com_falha.loc[X_train.index]]
+    teste = X_test.index[com_falha.loc[X_test.index]]
+    y_treino = dados.loc[treino, 'tipo_falha'].map(codigos)
+    y_teste = dados.loc[teste, 'tipo_falha'].map(codigos)
+
+    print(f"\nTreinando modelo de tipo de falha ({len(classes_tipo)} sistemas, {len(treino)} falhas)...")
+    modelo_tipo = xgb.XGBClassifier(**PARAMETROS_TIPO)
+    modelo_tipo.fit(X_train.loc[treino], y_treino)
+
+    proba = modelo_tipo.predict_proba(X_test.loc[teste])
+    top3 = np.argsort(-proba, axis=1)[:, :3]
+    metricas = {
+        'acuracia_tipo_teste': accuracy_score(y_teste, proba.argmax(axis=1)),
+        'top3_tipo_teste': float((top3 == y_teste.to_numpy()[:, None]).any(axis=1).mean()),
+    }
+    print(f"Tipo de falha (dado que houve falha): acurácia {metricas['acuracia_tipo_teste']:.2%}, "
+        f"top-3 {metricas['top3_tipo_teste']:.2%}")
+    return modelo_tipo, classes_tipo, metricas
+
+
+def treinar_modelo_padrao(parametros=PARAMETROS_PADRAO):
+    """Treino padrão: um XGBClassifier (PARAMETROS_PADRAO ou os do ajuste) registrado como nova versão"""
+    dados, label_encoders = carregar_dados()
+    X_train, X_test, y_train, y_test = dividir_dados(dados)
+
+    # Criando e treinando modelo XGBoost
+    print("\nTreinando modelo XGBoost...")
+    modelo = xgb.XGBClassifier(**parametros)
+
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    tempo_treino = time.perf_counter() - inicio
+
+    # Fazendo previsões
+    print("\nAvaliando o modelo...")
+    preds_train = modelo.predict(X_train)
+    preds_test = modelo.predict(X_test)
+
+    # Avaliando o modelo
+    acuracia_train = accuracy_score(y_train, preds_train)
+    acuracia_test = accuracy_score(y_test, preds_test)
+
+    print(f"Acurácia no treino: {acuracia_train:.2%}")
+    print(f"Acurácia no teste: {acuracia_test:.2%}")
+
+    print("\nRelatório de classificação (teste):")
+    print(classification_report(y_test, preds_test))
+
+    # Importância das features
+    print("\nImportância das features:")
+    importancias = modelo.feature_importances_
+    feature_importance_df = pd.DataFrame({
+        'feature': features,
+        'importance': importancias
+    }).sort_values('importance', ascending=False)
+
+    print(feature_importance_df)
+
+    modelo_tipo, classes_tipo, metricas_tipo = treinar_modelo_tipo(dados, X_train, X_test)
+
+    # Pacote único para o serviço: features + vocabulários + ensembles compilados
+    print("\nSalvando modelo e metadados...")
+    pacote = PacoteModelo.de_modelo(modelo, features, label_encoders,
+                                    modelo_tipo=modelo_tipo, classes_tipo=classes_tipo)
+    diferenca = np.abs(pacote.modelo.predict_proba(X_test) - modelo.predict_proba(X_test)).max()
+    print(f"Diferença máxima compilado vs predict_proba: {diferenca:.2e}")
+
+    # Booster nativo + pacote + metadados em uma nova versão do registro
+    metricas = {
+        'acuracia_treino': acuracia_train,
+        'acuracia_teste': acuracia_test,
+        'roc_auc_teste': roc_auc_score(y_test, modelo.predict_proba(X_test)[:, 1]),
+        **metricas_tipo,
+    }
+    registrar_versao(modelo, pacote, metricas, parametros, ARQUIVO_DADOS, tempo_treino,
+                    extras={'parametros_tipo': PARAMETROS_TIPO}, boosters_extras={'tipo': modelo_tipo},
+                    baseline=criar_baseline(dados.loc[X_train.index]))
+
+    print("Modelo e arquivos auxiliares salvos com sucesso!")
+    print("Modelo treinado e pronto para uso!")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Treinamento do modelo de falhas em aeronaves")
+    parser.add_argument('--modo', choices=['padrao', 'ajuste', 'externo', 'incremental', 'categorico',
+                                        'avaliacao', 'segmentado'],
+                        default='padrao',
+                        help="padrao: treino fixo | ajuste: busca de hiperparâmetros | "
+                            "externo: treino em memória externa sobre partições | "
+                            "incremental: adiciona árvores com registros novos | "
+                            "categorico: categóricas nativas x LabelEncoder | "
+                            "avaliacao: k-fold + bootstrap para o dashboard | "
+                            "segmentado: um modelo por segmento + roteador")
+    parser.add_argument('--parametros', default=None,
+                        help="JSON de hiperparâmetros sobre os padrões, ex.: melhores_hiperparametros.json "
+                            "do --modo ajuste (padrao/externo/categorico/avaliacao/segmentado)")
+    parser.add_argument('--configs', type=int, default=27,
+                        help="(ajuste) número de configurações aleatórias iniciais")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="(ajuste/avaliacao/segmentado) processos em paralelo (padrão: núcleos / threads)")
+    parser.add_argument('--threads', type=int, default=2,
+                        help="(ajuste) threads do XGBoost por trial")
+    parser.add_argument('--dados', default=ARQUIVO_DADOS,
+                        help="(externo) arquivo, diretório ou glob de partições CSV/Parquet")
+    parser.add_argument('--linhas-bloco', type=int, default=100_000,
+                        help="(externo) linhas por bloco lido")
+    parser.add_argument('--novos', default=None,
+                        help="(incremental) CSV com os registros novos")
+    parser.add_argument('--novas-arvores', type=int, default=20,
+                        help="(incremental) árvores adicionadas ao modelo atual")
+    parser.add_argument('--com-companhia', action='store_true',
+                        help="(categorico) inclui companhia_aerea como feature")
+    parser.add_argument('--folds', type=int, default=5,
+                        help="(avaliacao) número de folds do k-fold estratificado")
+    parser.add_argument('--bootstrap', type=int, default=1000,
+                        help="(avaliacao) número de reamostras bootstrap")
+    parser.add_argument('--segmento', choices=['modelo_aeronave', 'tipo_motor'], default='modelo_aeronave',
+                        help="(segmentado) coluna que define os segmentos")
+    parser.add_argument('--min-registros', type=int, default=150,
+                        help="(segmentado) mínimo de registros de treino para ter modelo próprio")
+    args = parser.parse_args()
+    parametros = carregar_parametros(args.parametros)
+
+    if args.modo == 'ajuste':
+        from ajuste_hiperparametros import executar_ajuste
+        dados, _ = carregar_dados()
+        X_train, X_test, y_train, y_test = dividir_dados(dados)
+        executar_ajuste(X_train, y_train, n_configs=args.configs,
+                        n_processos=args.processos, threads_por_trial=args.threads)
+    elif args.modo == 'externo':
+        from treino_externo import treinar_memoria_externa, salvar_artefatos_externos
+        opcoes = {}
+        if args.parametros:
+            # API nativa: n_estimators vira o número de rodadas e random_state vira seed
+            nativos = dict(parametros, tree_method="hist")
+            opcoes = {'n_estimators': nativos.pop('n_estimators'), 'parametros': nativos}
+            nativos['seed'] = nativos.pop('random_state')
+        resultado = treinar_memoria_externa(
+            args.dados, features,
+            [c for c in categorical_columns if f'{c}_encoded' in features],
+            linhas_bloco=args.linhas_bloco, **opcoes
+        )
+        salvar_artefatos_externos(*resultado, features, linhas_bloco=args.linhas_bloco)
+    elif args.modo == 'incremental':
+        from treino_incremental import treinar_incremental
+        if args.novos is None:
+            parser.error("--modo incremental requer --novos")
+        treinar_incremental(args.novos, novas_arvores=args.novas_arvores)
+    elif args.modo == 'categorico':
+        from treino_categorico import comparar_codificacoes
+        dados, _ = carregar_dados()
+        comparar_codificacoes(dados, features, parametros, ARQUIVO_DADOS,
+                            com_companhia=args.com_companhia)
+    elif args.modo == 'avaliacao':
+        from avaliacao_modelo import avaliar_modelo, configuracao_da_versao
+        dados, _ = carregar_dados()
+        # Sem --parametros, avalia a configuração da versão ATUAL; se o k-fold não a
+        # reproduz, o relatório fica sem versão e diz quais parâmetros foram avaliados
+        versao, configuracao = None, args.parametros or "PARAMETROS_PADRAO"
+        atual = configuracao_da_versao(features) if args.parametros is None else None
+        if atual is not None:
+            versao, parametros = atual
+            configuracao = f"versão {versao}"
+        elif args.parametros is None:
+            print("⚠️ A versão ATUAL não é reproduzível pelo k-fold (modo categorico, segmentado ou "
+                "incremental): avaliando PARAMETROS_PADRAO, sem versão no relatório")
+        avaliar_modelo(dados, features, parametros, k=args.folds, n_bootstrap=args.bootstrap,
+                    n_processos=args.processos, versao_modelo=versao, configuracao=configuracao)
+    elif args.modo == 'segmentado':
+        from treino_segmentado import treinar_segmentos
+        dados, label_encoders = carregar_dados()
+        treinar_segmentos(dados, features, label_encoders, parametros, ARQUIVO_DADOS,
+                        coluna_segmento=args.segmento, min_registros=args.min_registros,
+                        n_processos=args.processos)
+    else:
+        treinar_modelo_padrao(parametros)
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# Monitor de drift das entradas servidas, com memória constante:
+# o treino gera um baseline (limites de quantis + proporções por feature
+# numérica e frequências por categoria) salvo junto com a versão do modelo.
+# Em produção, cada requisição só incrementa contadores; a janela móvel é um
+# anel de sub-janelas de contagens, então a memória não cresce com o tráfego.
+# Cada processo do servidor mantém o seu próprio monitor.
+
+COLUNAS_NUMERICAS = [
+    'idade_aeronave_anos',
+    'horas_voo_total',
+    'ultima_manutencao_meses',
+    'ciclos_pouso_decolagem',
+    'temperatura_media_operacao'
+]
+COLUNAS_CATEGORICAS = ['modelo_aeronave', 'tipo_motor']
+
+# Faixas usuais do PSI
+LIMITE_PSI_ATENCAO = 0.1
+LIMITE_PSI_ALERTA = 0.25
+
+
+def criar_baseline(dados, colunas_numericas=COLUNAS_NUMERICAS, colunas_categoricas=COLUNAS_CATEGORICAS,
+                n_faixas=10):
+    """Histogramas do treino: faixas por quantis para numéricas e frequências para categóricas"""
+    baseline = {'n_registros': int(len(dados)), 'numericas': {}, 'categoricas': {}}
+    for col in colunas_numericas:
+        valores = dados[col].dropna().to_numpy(dtype=np.float64)
+        limites = np.unique(np.quantile(valores, np.linspace(0, 1, n_faixas + 1)[1:-1]))
+        contagens = np.bincount(np.searchsorted(limites, valores, side='right'), minlength=len(limites) + 1)
+        baseline['numericas'][col] = {
+            'limites': limites.tolist(),
+            'proporcoes': (contagens / contagens.sum()).tolist(),
+        }
+    for col in colunas_categoricas:
+        frequencias = dados[col].value_counts(normalize=True).sort_index()
+        baseline['categoricas'][col] = {
+            'categorias': frequencias.index.tolist(),
+            'proporcoes': frequencias.tolist(),
+        }
+    return baseline
+
+
+def psi(esperado, observado, epsilon=1e-4):
+    """Population Stability Index entre duas distribuições (proporções)"""
+    esperado = np.clip(np.asarray(esperado, dtype=np.float64), epsilon, None)
+    observado = np.clip(np.asarray(observado, dtype=np.float64), epsilon, None)
+    return float(np.sum((observado - esperado) * np.log(observado / esperado)))
+
+
+def ks(esperado, observado):
+    """Estatística KS aproximada pelas distribuições acumuladas nas faixas"""
+    return float(np.abs(np.cumsum(esperado) - np.cumsum(observado)).max())
+
+
+class MonitorDrift:
+    """Contadores em janela móvel por feature, comparados com o baseline do treino"""
+
+    def __init__(self, baseline, tamanho_subjanela=200, n_subjanelas=10):
+        self.baseline = baseline
+        self.tamanho_subjanela = tamanho_subjanela
+        self._lock = threading.Lock()
+
+        self._limites = {col: np.asarray(b['limites']) for col, b in baseline['numericas'].items()}
+        # Categoria desconhecida pelo treino ocupa a última posição
+        self._codigos = {col: {c: i for i, c in enumerate(b['categorias'])}
+                        for col, b in baseline['categoricas'].items()}
+        self._tamanhos = {col: len(l) + 1 for col, l in self._limites.items()}
+        self._tamanhos.update({col: len(c) + 1 for col, c in self._codigos.items()})
+
+        self._subjanelas = deque(maxlen=n_subjanelas)
+        self._atual = self._contadores_vazios()
+        self._n_atual = 0
+        self.total_registros = 0
+        self.inicio = time.time()
+
+    def _contadores_vazios(self):
+        return {col: np.zeros(n, dtype=np.int64) for col, n in self._tamanhos.items()}
+
+    def registrar(self, entradas):
+        """Conta um lote de entradas servidas (dict de colunas ou DataFrame)"""
+        faixas = {}
+        for col, limites in self._limites.items():
+            if col in entradas:
+                valores = np.atleast_1d(np.asarray(entradas[col], dtype=np.float64))
+                faixas[col] = np.searchsorted(limites, valores, side='right')
+        for col, codigos in self._codigos.items():
+            if col in entradas:
+                desconhecida = len(codigos)
+                faixas[col] = np.fromiter((codigos.get(v, desconhecida) for v in np.atleast_1d(entradas[col])),
+                                        dtype=np.int64)
+        if not faixas:
+            return
+        n = max(len(f) for f in faixas.values())
+
+        with self._lock:
+            for col, f in faixas.items():
+                self._atual[col] += np.bincount(f, minlength=self._tamanhos[col])
+            self._n_atual += n
+            self.total_registros += n
+            if self._n_atual >= self.tamanho_subjanela:
+                self._subjanelas.append(self._atual)
+                self._atual = self._contadores_vazios()
+                self._n_atual = 0
+
+    def relatorio(self):
+        """PSI e KS por feature na janela atual (sub-janelas fechadas + a corrente)"""
+        with self._lock:
+            janelas = list(self._subjanelas) + [self._atual]
+            contagens = {col: sum(j[col] for j in janelas) for col in self._tamanhos}
+
+        linhas = []
+        for col, contagem in contagens.items():
+            n = int(contagem.sum())
+            if col in self._limites:
+                esperado = self.baseline['numericas'][col]['proporcoes']
+                tipo = 'numérica'
+            else:
+                esperado = self.baseline['categoricas'][col]['proporcoes'] + [0.0]
+                tipo = 'categórica'
+            observado = contagem / n if n else np.zeros(len(contagem))
+            valor_psi = psi(esperado, observado) if n else np.nan
+            linhas.append({
+                'feature': col,
+                'tipo': tipo,
+                'n_janela': n,
+                'psi': valor_psi,
+                # KS só faz sentido com faixas ordenadas
+                'ks': ks(esperado, observado) if n and tipo == 'numérica' else np.nan,
+                'desconhecidas': int(contagem[-1]) if tipo == 'categórica' else 0,
+                'status': ('sem dados' if not n else 'alerta' if valor_psi >= LIMITE_PSI_ALERTA
+                        else 'atenção' if valor_psi >= LIMITE_PSI_ATENCAO else 'estável'),
+            })
+        return pd.DataFrame(linhas)
+
+
+# Monitor do processo, criado na primeira chamada com o baseline da versão ATUAL
+_monitor_servico = {}
+
+
+def monitor_servico():
+    """Monitor compartilhado pelos callbacks do app (None se a versão não tem baseline)"""
+    if 'monitor' not in _monitor_servico:
+        from registro_modelos import carregar_baseline
+        try:
+            baseline = carregar_baseline()
+        except FileNotFoundError:
+            baseline = None
+        _monitor_servico['monitor'] = MonitorDrift(baseline) if baseline is not None else None
+    return _monitor_servico['monitor']
@@ -0,0 +1,92 @@
+from datetime import datetime
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+from app import app
+from monitor_drift import LIMITE_PSI_ALERTA, LIMITE_PSI_ATENCAO, monitor_servico
+
+# Página de monitoramento: drift das entradas recebidas pelo formulário
+# (PSI/KS na janela móvel do MonitorDrift), atualizada periodicamente.
+
+CORES_STATUS = {'estável': 'success', 'atenção': 'warning', 'alerta': 'danger', 'sem dados': 'secondary'}
+
+
+def criar_grafico_psi(relatorio):
+    """Barras de PSI por feature com as faixas de atenção/alerta"""
+    return {
+        'data': [{
+            'type': 'bar',
+            'x': relatorio['feature'].tolist(),
+            'y': relatorio['psi'].fillna(0).tolist(),
+            'marker': {'color': [{'success': '#198754', 'warning': '#ffc107', 'danger': '#dc3545',
+                                'secondary': '#6c757d'}[CORES_STATUS[s]] for s in relatorio['status']]},
+        }],
+        'layout': {
+            'title': "PSI por feature (janela móvel)",
+            'yaxis': {'title': "PSI"},
+            'shapes': [
+                {'type': 'line', 'xref': 'paper', 'x0': 0, 'x1': 1, 'y0': limite, 'y1': limite,
+                'line': {'dash': 'dash', 'color': cor}}
+                for limite, cor in ((LIMITE_PSI_ATENCAO, '#ffc107'), (LIMITE_PSI_ALERTA, '#dc3545'))
+            ],
+            'height': 350, 'margin': dict(l=40, r=20, t=60, b=100),
+        },
+    }
+
+
+layout = dbc.Container([
+    html.H1("Monitoramento de Drift", className="text-center my-4"),
+    html.P("Compara as entradas recebidas pelo formulário com a distribuição de treino da versão em produção",
+        className="text-center text-muted mb-4"),
+    dcc.Interval(id="intervalo-monitoramento", interval=5000),
+    html.Div(id="resumo-monitoramento", className="mb-3"),
+    dcc.Graph(id="grafico-psi", config={'displayModeBar': False}),
+    html.Div(id="tabela-monitoramento", className="mt-3"),
+], className="container")
+
+
+@app.callback(
+    [Output("resumo-monitoramento", "children"),
+    Output("grafico-psi", "figure"),
+    Output("tabela-monitoramento", "children")],
+    Input("intervalo-monitoramento", "n_intervals")
+)
+def atualizar_monitoramento(_):
+    monitor = monitor_servico()
+    if monitor is None:
+        aviso = dbc.Alert("A versão em produção não tem baseline de drift. "
+                        "Treine novamente com python src/modelo_aviacao.py.", color="info")
+        return aviso, {'data': [], 'layout': {}}, ""
+
+    relatorio = monitor.relatorio()
+    resumo = dbc.Row([
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H4(f"{monitor.total_registros:,}".replace(",", "."), className="text-primary"),
+            html.P("Previsões monitoradas", className="text-muted mb-0")
+        ]), className="text-center border-0 shadow-sm"), md=4),
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H4(f"{int(relatorio['n_janela'].max()):,}".replace(",", "."), className="text-info"),
+            html.P("Na janela atual", className="text-muted mb-0")
+        ]), className="text-center border-0 shadow-sm"), md=4),
+        dbc.Col(dbc.Card(dbc.CardBody([
+            html.H4(str(int((relatorio['status'] == 'alerta').sum())), className="text-danger"),
+            html.P("Features em alerta", className="text-muted mb-0")
+        ]), className="text-center border-0 shadow-sm"), md=4),
+    ])
+
+    tabela = dbc.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ("Feature", "Tipo", "PSI", "KS", "Desconhecidas", "Status")])),
+        html.Tbody([
+            html.Tr([
+                html.Td(linha.feature), html.Td(linha.tipo),
+                html.Td("—" if linha.psi != linha.psi else f"{linha.psi:.3f}"),
+                html.Td("—" if linha.ks != linha.ks else f"{linha.ks:.3f}"),
+                html.Td(linha.desconhecidas),
+                html.Td(dbc.Badge(linha.status, color=CORES_STATUS[linha.status])),
+            ])
+            for linha in relatorio.itertuples()
+        ])
+    ], striped=True, hover=True, size="sm")
+
+    rodape = html.P(f"Atualizado em {datetime.now():%H:%M:%S} | baseline com "
+                    f"{monitor.baseline['n_registros']} registros de treino", className="text-muted small")
+    return resumo, criar_grafico_psi(relatorio), [tabela, rodape]
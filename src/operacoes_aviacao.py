@@ -0,0 +1,50 @@
+from datetime import datetime
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+from app import app
+from metricas_app import metricas
+
+# Página de operações: latência, tamanho de resposta e erros por callback do
+# processo que atende a página (os mesmos números expostos em /metrics).
+
+layout = dbc.Container([
+    html.H1("Operações", className="text-center my-4"),
+    html.P("Latência, tamanho de resposta e erros dos callbacks deste processo do servidor "
+        "(formato Prometheus em /metrics)", className="text-center text-muted mb-4"),
+    dcc.Interval(id="intervalo-operacoes", interval=5000),
+    dcc.Graph(id="grafico-operacoes", config={'displayModeBar': False}),
+    html.Div(id="tabela-operacoes", className="mt-3"),
+], className="container")
+
+
+@app.callback(
+    [Output("grafico-operacoes", "figure"),
+    Output("tabela-operacoes", "children")],
+    Input("intervalo-operacoes", "n_intervals")
+)
+def atualizar_operacoes(_):
+    linhas = metricas.resumo()
+    figura = {
+        'data': [
+            {'type': 'bar', 'name': rotulo, 'x': [l['callback'] for l in linhas], 'y': [l[chave] for l in linhas]}
+            for chave, rotulo in (('p50_ms', 'p50'), ('p95_ms', 'p95'), ('p99_ms', 'p99'))
+        ],
+        'layout': {'title': "Latência por callback (ms)", 'barmode': 'group', 'height': 350,
+                'margin': dict(l=40, r=20, t=60, b=120)},
+    }
+    tabela = dbc.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ("Callback", "Chamadas", "Erros", "p50 (ms)", "p95 (ms)",
+                                                "p99 (ms)", "Resposta média (KB)")])),
+        html.Tbody([
+            html.Tr([
+                html.Td(l['callback']), html.Td(l['chamadas']),
+                html.Td(dbc.Badge(l['erros'], color="danger" if l['erros'] else "success")),
+                html.Td(f"{l['p50_ms']:.1f}"), html.Td(f"{l['p95_ms']:.1f}"), html.Td(f"{l['p99_ms']:.1f}"),
+                html.Td(f"{l['media_kb']:.1f}"),
+            ])
+            for l in linhas
+        ])
+    ], striped=True, hover=True, size="sm")
+    rodape = html.P(f"Atualizado em {datetime.now():%H:%M:%S} | processo ativo desde "
+                    f"{datetime.fromtimestamp(metricas.inicio):%d/%m %H:%M}", className="text-muted small")
+    return figura, [tabela, rodape]
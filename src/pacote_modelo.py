@@ -0,0 +1,184 @@
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from arvores_compiladas import (EnsembleCompilado, combinar_ensembles, ensemble_de_arrays,
+                                exportar_arvores, probabilidades_de_margem)
+
+# Pacote único do modelo: ordem das features, tabelas categoria -> código e o
+# ensemble compilado em um só .npz versionado (sem pickle, sem sklearn).
+# transform/predict trabalham sobre lotes inteiros, e o mesmo pacote é usado no
+# treino e no serviço, então a codificação é sempre a mesma dos dois lados.
+# Opcionalmente carrega também o modelo multiclasse de tipo_falha (P(tipo | falha)),
+# avaliado junto com o binário em uma única passada pelas árvores.
+
+ARQUIVO_PACOTE = "pacote_modelo.npz"
+VERSAO_FORMATO = 1
+
+# Código reservado para categorias desconhecidas: tratado como valor ausente
+# pelas árvores (segue o ramo padrão de cada split)
+CODIGO_DESCONHECIDO = np.nan
+
+# Abaixo deste tamanho de lote a busca em dict é mais barata que pd.Index
+_LIMITE_LOTE_PEQUENO = 1000
+
+
+class PacoteModelo:
+    """Pré-processamento + modelo com API em lote"""
+
+    def __init__(self, features, vocabularios, modelo, versao=None, metadados=None,
+                modelo_tipo=None, classes_tipo=None):
+        self.features = list(features)
+        self.vocabularios = {col: list(classes) for col, classes in vocabularios.items()}
+        self.modelo = modelo
+        self.versao = versao or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.metadados = metadados or {}
+        self.modelo_tipo = modelo_tipo
+        self.classes_tipo = list(classes_tipo or [])
+
+        # Binário + tipo em um só ensemble: coluna 0 = falha, demais = tipos
+        self._conjunto = None
+        if isinstance(modelo, EnsembleCompilado) and isinstance(modelo_tipo, EnsembleCompilado):
+            self._conjunto = combinar_ensembles([modelo, modelo_tipo])
+
+        self._codigos = {
+            col: {classe: float(codigo) for codigo, classe in enumerate(classes)}
+            for col, classes in self.vocabularios.items()
+        }
+        self._indices = {col: pd.Index(classes) for col, classes in self.vocabularios.items()}
+
+    @classmethod
+    def de_modelo(cls, modelo, features, label_encoders, metadados=None, modelo_tipo=None, classes_tipo=None):
+        """Cria o pacote a partir do(s) modelo(s) treinado(s) e dos LabelEncoders do treino"""
+        vocabularios = {
+            col: le.classes_.tolist() for col, le in label_encoders.items()
+            if f"{col}_encoded" in features or col in features
+        }
+        return cls(features, vocabularios, exportar_arvores(modelo), metadados=metadados,
+                modelo_tipo=exportar_arvores(modelo_tipo) if modelo_tipo is not None else None,
+                classes_tipo=classes_tipo)
+
+    # ========== PRÉ-PROCESSAMENTO ==========
+
+    def _codificar(self, col, valores):
+        """Categoria -> código; desconhecida vira CODIGO_DESCONHECIDO sem exceção"""
+        if len(valores) < _LIMITE_LOTE_PEQUENO:
+            tabela = self._codigos[col]
+            return np.fromiter((tabela.get(v, CODIGO_DESCONHECIDO) for v in valores),
+                            dtype=np.float32, count=len(valores))
+        codigos = self._indices[col].get_indexer(valores).astype(np.float32)
+        codigos[codigos < 0] = CODIGO_DESCONHECIDO
+        return codigos
+
+    def _coluna_categorica(self, feature):
+        """Coluna de origem de uma feature categórica ("col_encoded" ou "col" nativa)"""
+        col = feature[:-len('_encoded')] if feature.endswith('_encoded') else feature
+        return col if col in self._codigos else None
+
+    def transform(self, dados):
+        """DataFrame ou dict de colunas (escalares ou listas) -> matriz float32 na ordem do modelo
+
+        Colunas categóricas ausentes da entrada (ex.: companhia_aerea no formulário)
+        são tratadas como desconhecidas."""
+        colunas = {}
+        for feature in self.features:
+            col = self._coluna_categorica(feature)
+            if col is None:
+                colunas[feature] = np.atleast_1d(np.asarray(dados[feature], dtype=np.float32))
+            elif col in dados:
+                valores = np.atleast_1d(np.asarray(dados[col], dtype=object))
+                colunas[feature] = self._codificar(col, valores)
+
+        n = max(len(v) for v in colunas.values())
+        for feature in self.features:
+            colunas.setdefault(feature, np.full(n, CODIGO_DESCONHECIDO, dtype=np.float32))
+        X = np.empty((n, len(self.features)), dtype=np.float32)
+        for i, feature in enumerate(self.features):
+            X[:, i] = colunas[feature]
+        return X
+
+    def predict_proba(self, dados):
+        """Probabilidades para um lote inteiro"""
+        return self.modelo.predict_proba(self.transform(dados))
+
+    def predict(self, dados):
+        """Classe prevista para um lote inteiro"""
+        return self.predict_proba(dados).argmax(axis=1)
+
+    def predict_conjunto(self, dados):
+        """Risco de falha (n,) e P(falha e tipo) (n, n_tipos) com um só pré-processamento
+
+        Sem modelo de tipo, a segunda matriz tem zero colunas."""
+        return self.predict_conjunto_matriz(self.transform(dados))
+
+    def predict_conjunto_matriz(self, X):
+        """predict_conjunto sobre uma matriz já transformada (reaproveitada pelas explicações)"""
+        if self._conjunto is not None:
+            margem = self._conjunto.predict_margin(X)
+            risco = probabilidades_de_margem(margem[:, :1], "binary:logistic")[:, 1]
+            tipo_dado_falha = probabilidades_de_margem(margem[:, 1:], self.modelo_tipo.objetivo)
+        else:
+            risco = self.modelo.predict_proba(X)[:, 1]
+            tipo_dado_falha = (self.modelo_tipo.predict_proba(X) if self.modelo_tipo is not None
+                            else np.zeros((len(X), 0)))
+        return risco, risco[:, None] * tipo_dado_falha
+
+    def pontuar(self, dados, top=3, explicador=None, aproximado=False):
+        """Tabela em lote: risco de falha + os top sistemas mais prováveis com suas probabilidades
+
+        Com um explicador (explicacoes.carregar_explicador), acrescenta a contribuição de
+        cada feature (contrib_<feature>, em log-odds) calculada sobre a mesma matriz."""
+        X = self.transform(dados)
+        risco, tipos = self.predict_conjunto_matriz(X)
+        tabela = pd.DataFrame({'risco_falha': risco})
+        ordem = np.argsort(-tipos, axis=1)[:, :top]
+        for i in range(ordem.shape[1]):
+            tabela[f'sistema_{i + 1}'] = np.asarray(self.classes_tipo, dtype=object)[ordem[:, i]]
+            tabela[f'prob_sistema_{i + 1}'] = np.take_along_axis(tipos, ordem[:, i:i + 1], axis=1)[:, 0]
+
+        if explicador is not None:
+            contribuicoes = explicador.contribuicoes(X, aproximado=aproximado)
+            for j, feature in enumerate(self.features):
+                tabela[f'contrib_{feature}'] = contribuicoes[:, j]
+            tabela['contrib_base'] = contribuicoes[:, -1]
+        return tabela
+
+    # ========== PERSISTÊNCIA ==========
+
+    def salvar(self, caminho=ARQUIVO_PACOTE):
+        """Salva features, vocabulários e ensemble em um único .npz"""
+        meta = {
+            'versao_formato': VERSAO_FORMATO,
+            'versao': self.versao,
+            'features': self.features,
+            'metadados': self.metadados,
+            'classes_tipo': self.classes_tipo,
+        }
+        arrays = {f"modelo_{k}": v for k, v in self.modelo.para_arrays().items()}
+        if self.modelo_tipo is not None:
+            arrays.update({f"tipo_{k}": v for k, v in self.modelo_tipo.para_arrays().items()})
+        for col, classes in self.vocabularios.items():
+            arrays[f"vocab_{col}"] = np.array(classes)
+        np.savez(caminho, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_PACOTE):
+        """Carrega um pacote salvo; recusa versões de formato desconhecidas"""
+        with np.load(caminho, allow_pickle=False) as arq:
+            meta = json.loads(arq['meta'][()])
+            if meta['versao_formato'] != VERSAO_FORMATO:
+                raise ValueError(f"Formato de pacote não suportado: {meta['versao_formato']}")
+
+            modelo = ensemble_de_arrays(
+                {k[len('modelo_'):]: arq[k] for k in arq.files if k.startswith('modelo_')}
+            )
+            vocabularios = {
+                k[len('vocab_'):]: arq[k].tolist() for k in arq.files if k.startswith('vocab_')
+            }
+            arrays_tipo = {k[len('tipo_'):]: arq[k] for k in arq.files if k.startswith('tipo_')}
+            modelo_tipo = EnsembleCompilado.de_arrays(arrays_tipo) if arrays_tipo else None
+
+        return cls(meta['features'], vocabularios, modelo,
+                versao=meta['versao'], metadados=meta['metadados'],
+                modelo_tipo=modelo_tipo, classes_tipo=meta.get('classes_tipo'))
+
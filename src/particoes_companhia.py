@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+from carregamento_paginas import ARQUIVO_DADOS
+
+try:
+    import fcntl  # trava entre processos (Linux/macOS)
+except ImportError:
+    fcntl = None
+
+# Dados por companhia aérea (inquilino): o CSV histórico é particionado por
+# companhia_aerea em um arquivo por companhia, e as páginas abertas com
+# ?companhia=<nome> leem só a partição dela -- nada de carregar a frota
+# inteira e filtrar a cada requisição. Tudo o que é derivado da partição
+# (dados, figuras, análises, scores, planos) fica no cache da companhia, com
+# orçamento de bytes próprio (LRU das entradas) e no máximo
+# AVIACAO_CACHE_COMPANHIAS companhias em memória (LRU das companhias): uma
+# companhia nova não disputa o orçamento das outras e qualquer uma pode ser
+# despejada sem afetar as demais. Sem ?companhia= as páginas continuam com a
+# frota inteira (dados_frota).
+
+DIRETORIO_PARTICOES = os.environ.get('AVIACAO_PARTICOES_DIR', 'particoes')
+MAX_COMPANHIAS = int(os.environ.get('AVIACAO_CACHE_COMPANHIAS', 16))
+MAX_BYTES_COMPANHIA = int(float(os.environ.get('AVIACAO_CACHE_MB_COMPANHIA', 64)) * 1024 * 1024)
+LINHAS_POR_BLOCO = 200_000
+
+
+def _arquivo_particao(companhia):
+    """Nome do arquivo da partição: nome legível + hash do nome original ('Azul Linhas' != 'Azul_Linhas')"""
+    resumo = hashlib.sha256(str(companhia).encode()).hexdigest()[:8]
+    return f"companhia_aerea={re.sub(r'[^0-9A-Za-z_-]', '_', str(companhia))}-{resumo}.csv"
+
+
+def particionar(origem=ARQUIVO_DADOS, diretorio=DIRETORIO_PARTICOES):
+    """Reescreve um CSV por companhia e o manifesto (lendo a origem em blocos); devolve o manifesto"""
+    os.makedirs(diretorio, exist_ok=True)
+    particoes = {}
+    resumos = {}
+    for bloco in pd.read_csv(origem, chunksize=LINHAS_POR_BLOCO):
+        for companhia, linhas in bloco.groupby('companhia_aerea', sort=False):
+            particao = particoes.setdefault(companhia, {
+                'arquivo': _arquivo_particao(companhia), 'linhas': 0, 'falhas': 0})
+            # Temporário com o pid: dois processos particionando não escrevem no mesmo arquivo
+            temporario = os.path.join(diretorio, f"{particao['arquivo']}.{os.getpid()}.tmp")
+            texto = linhas.to_csv(header=not particao['linhas'], index=False)
+            with open(temporario, 'a' if particao['linhas'] else 'w', encoding='utf-8', newline='') as arq:
+                arq.write(texto)
+            resumos.setdefault(companhia, hashlib.sha256()).update(texto.encode())
+            particao['linhas'] += len(linhas)
+            particao['falhas'] += int(linhas['falha_critica'].sum())
+
+    for companhia, particao in particoes.items():
+        particao['resumo'] = resumos[companhia].hexdigest()[:16]  # muda só se o conteúdo da partição muda
+        caminho = os.path.join(diretorio, particao['arquivo'])
+        os.replace(f"{caminho}.{os.getpid()}.tmp", caminho)
+    origem_stat = os.stat(origem)
+    manifesto = {'origem': os.path.abspath(origem), 'mtime': origem_stat.st_mtime, 'bytes': origem_stat.st_size,
+                'particoes': dict(sorted(particoes.items()))}
+    temporario = os.path.join(diretorio, f"manifesto.json.{os.getpid()}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as arq:
+        json.dump(manifesto, arq, indent=2)
+    os.replace(temporario, os.path.join(diretorio, 'manifesto.json'))
+    # Partições que não estão no manifesto novo (companhia que sumiu, nome de arquivo antigo)
+    arquivos = {particao['arquivo'] for particao in particoes.values()}
+    for entrada in os.scandir(diretorio):
+        if entrada.name.startswith('companhia_aerea=') and entrada.name.endswith('.csv') and entrada.name not in arquivos:
+            os.remove(entrada.path)
+    return manifesto
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, 'manifesto.json'), encoding='utf-8') as arq:
+            return json.load(arq)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+_manifesto = {}  # 'atual' -> (versão da origem, manifesto), trocados juntos
+_lock_manifesto = threading.Lock()
+
+
+@contextmanager
+def _trava_particoes(diretorio):
+    """Um processo particiona por vez (flock no diretório das partições; sem fcntl, só entre threads)"""
+    with _lock_manifesto:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(diretorio, exist_ok=True)
+        with open(os.path.join(diretorio, '.particionar.lock'), 'a') as arq:
+            fcntl.flock(arq, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arq, fcntl.LOCK_UN)
+
+
+def manifesto(origem=ARQUIVO_DADOS, diretorio=DIRETORIO_PARTICOES):
+    """Manifesto das partições, refeitas quando o CSV de origem muda (um stat por chamada)
+
+    O caminho normal é particionar antes de subir o servidor (python
+    src/particoes_companhia.py); aqui é a rede de segurança para um CSV trocado
+    com o servidor no ar. Entre processos, só um particiona (flock) e os demais
+    leem o manifesto que ele gravou; depois só as companhias cuja partição
+    mudou saem do cache.
+    """
+    origem_stat = os.stat(origem)
+    versao = (origem_stat.st_mtime, origem_stat.st_size)
+    versao_cache, conteudo = _manifesto.get('atual', (None, {}))
+    if versao_cache == versao:
+        return conteudo
+    with _trava_particoes(diretorio):
+        versao_cache, anterior = _manifesto.get('atual', (None, {}))
+        if versao_cache != versao:
+            conteudo = _ler_manifesto(diretorio)  # outro processo pode ter particionado enquanto esperávamos
+            if (conteudo.get('mtime'), conteudo.get('bytes')) != versao:
+                print(f"🗂️ Particionando {origem} por companhia em {diretorio}/")
+                conteudo = particionar(origem, diretorio)
+            for companhia, particao in anterior.get('particoes', {}).items():
+                if conteudo['particoes'].get(companhia) != particao:
+                    cache_companhias.despejar(companhia)
+            _manifesto['atual'] = (versao, conteudo)
+        return _manifesto['atual'][1]
+
+
+def companhias():
+    """Companhias com partição"""
+    return list(manifesto()['particoes'])
+
+
+def tamanho_bytes(valor):
+    """Bytes aproximados de um valor em cache (DataFrames e arrays pelo buffer; figuras e layouts pelo JSON)"""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanho_bytes(v) for v in valor)
+    try:
+        return len(json.dumps(valor, cls=PlotlyJSONEncoder))
+    except (TypeError, ValueError):
+        return sys.getsizeof(valor)
+
+
+class CacheCompanhias:
+    """Cache por companhia: orçamento de bytes por companhia (LRU das entradas) e LRU das companhias"""
+
+    def __init__(self, max_companhias=MAX_COMPANHIAS, max_bytes=MAX_BYTES_COMPANHIA):
+        self.max_companhias = max_companhias
+        self.max_bytes = max_bytes
+        self._companhias = OrderedDict()  # companhia -> OrderedDict(chave -> (valor, bytes))
+        self._calculando = {}  # (companhia, chave) -> lock de quem está calculando
+        self._lock = threading.Lock()
+
+    def _buscar(self, companhia, chave):
+        entradas = self._companhias.get(companhia)
+        if entradas is None or chave not in entradas:
+            return None
+        self._companhias.move_to_end(companhia)
+        entradas.move_to_end(chave)
+        return entradas[chave]
+
+    def obter(self, companhia, chave, calcular):
+        """Valor em cache ou calcular() -- uma vez por (companhia, chave), sem travar as outras companhias"""
+        with self._lock:
+            encontrado = self._buscar(companhia, chave)
+            if encontrado is not None:
+                return encontrado[0]
+            trava = self._calculando.setdefault((companhia, chave), threading.Lock())
+        with trava:
+            with self._lock:
+                encontrado = self._buscar(companhia, chave)
+            if encontrado is not None:
+                return encontrado[0]
+            valor = calcular()
+            self._guardar(companhia, chave, valor, tamanho_bytes(valor))
+        with self._lock:
+            self._calculando.pop((companhia, chave), None)
+        return valor
+
+    def _guardar(self, companhia, chave, valor, n_bytes):
+        with self._lock:
+            entradas = self._companhias.setdefault(companhia, OrderedDict())
+            self._companhias.move_to_end(companhia)
+            entradas[chave] = (valor, n_bytes)
+            # Estouro do orçamento sai das entradas menos usadas da própria companhia
+            while len(entradas) > 1 and sum(n for _, n in entradas.values()) > self.max_bytes:
+                entradas.popitem(last=False)
+            while len(self._companhias) > self.max_companhias:
+                self._companhias.popitem(last=False)
+
+    def despejar(self, companhia=None):
+        """Remove o cache de uma companhia (ou de todas)"""
+        with self._lock:
+            if companhia is None:
+                self._companhias.clear()
+            else:
+                self._companhias.pop(companhia, None)
+
+    def uso(self):
+        """Entradas e bytes em cache por companhia"""
+        with self._lock:
+            return {companhia: {'entradas': len(entradas), 'bytes': sum(n for _, n in entradas.values())}
+                    for companhia, entradas in self._companhias.items()}
+
+
+cache_companhias = CacheCompanhias()
+
+
+def caminho_particao(companhia):
+    """Arquivo da partição da companhia; None se a companhia não existe"""
+    particao = manifesto()['particoes'].get(companhia)
+    return None if particao is None else os.path.join(DIRETORIO_PARTICOES, particao['arquivo'])
+
+
+def dados_companhia(companhia):
+    """Partição da companhia (só o arquivo dela é lido); None se a companhia não existe"""
+    caminho = caminho_particao(companhia)
+    if caminho is None:
+        return None
+    return cache_companhias.obter(companhia, 'dados', lambda: pd.read_csv(caminho))
+
+
+def companhia_da_url(search):
+    """Companhia pedida em ?companhia=<nome> (None = frota inteira)"""
+    from urllib.parse import parse_qs
+    return parse_qs((search or '').lstrip('?')).get('companhia', [None])[0]
+
+
+if __name__ == '__main__':
+    # Reparticiona e compara ler a partição com ler tudo e filtrar
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Partições do dataset por companhia aérea")
+    parser.add_argument('--origem', default=ARQUIVO_DADOS)
+    parser.add_argument('--diretorio', default=DIRETORIO_PARTICOES)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    with _trava_particoes(args.diretorio):  # servidores no ar esperam em vez de particionar junto
+        resultado = particionar(args.origem, args.diretorio)
+    print(f"🗂️ {len(resultado['particoes'])} partições em {args.diretorio}/ ({time.perf_counter() - inicio:.2f}s)")
+    for companhia, particao in resultado['particoes'].items():
+        caminho = os.path.join(args.diretorio, particao['arquivo'])
+        inicio = time.perf_counter()
+        pd.read_csv(caminho)
+        tempo_particao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        todos = pd.read_csv(args.origem)
+        todos[todos['companhia_aerea'] == companhia]
+        tempo_filtro = time.perf_counter() - inicio
+        print(f"   - {companhia:<12} {particao['linhas']:>9,} linhas, {particao['falhas']:>7,} falhas | "
+            f"partição {tempo_particao * 1000:.1f} ms x filtro {tempo_filtro * 1000:.1f} ms")
@@ -0,0 +1,173 @@
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+from flask import request
+from metricas_app import ROTA_CALLBACKS, nome_callback
+
+# Perfil sob demanda dos callbacks do Dash em produção. O despacho de
+# /_dash-update-component é embrulhado e, quando a requisição é escolhida,
+# roda sob um perfilador; cada perfil vira um arquivo em DIRETORIO_PERFIS:
+#   - .pstats (cProfile, determinístico: contagens e tempos por função)
+#   - .folded (amostragem de pilhas a cada 1 ms, formato colapsado para
+#     flamegraph.pl / speedscope)
+# Uma requisição é perfilada quando traz o cabeçalho X-Perfil-Token (ou a
+# página foi aberta com ?perfil=<token>) igual a AVIACAO_PERFIL_TOKEN, ou por
+# amostragem (AVIACAO_PERFIL_AMOSTRAGEM, fração das requisições). Sem token
+# nem amostragem configurados nada é perfilado e o custo é um if por requisição.
+# O diretório tem teto de arquivos e de bytes (AVIACAO_PERFIL_MAX_ARQUIVOS,
+# AVIACAO_PERFIL_MAX_MB): a cada perfil gravado, os mais antigos saem primeiro.
+
+DIRETORIO_PERFIS = os.environ.get('AVIACAO_PERFIL_DIR', 'perfis')
+FORMATOS = ('pstats', 'folded')
+MAX_ARQUIVOS_PERFIS = int(os.environ.get('AVIACAO_PERFIL_MAX_ARQUIVOS', 500))
+MAX_BYTES_PERFIS = int(float(os.environ.get('AVIACAO_PERFIL_MAX_MB', 200)) * 1024 * 1024)
+
+
+class AmostradorPilhas:
+    """Amostra a pilha de uma thread em intervalos fixos e conta as pilhas colapsadas"""
+
+    def __init__(self, id_thread=None, intervalo=0.001):
+        self.id_thread = id_thread or threading.get_ident()
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name='amostrador-pilhas', daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.id_thread)
+            nomes = []
+            while frame is not None:
+                codigo = frame.f_code
+                nomes.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                frame = frame.f_back
+            if nomes:
+                self.pilhas[";".join(reversed(nomes))] += 1
+
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._parar.set()
+        self._thread.join()
+
+    def texto_colapsado(self):
+        return "".join(f"{pilha} {n}\n" for pilha, n in self.pilhas.most_common())
+
+
+def podar_perfis(diretorio=DIRETORIO_PERFIS, max_arquivos=None, max_bytes=None):
+    """Apaga os perfis mais antigos até caber no teto de arquivos e de bytes; devolve quantos saíram"""
+    max_arquivos = MAX_ARQUIVOS_PERFIS if max_arquivos is None else max_arquivos
+    max_bytes = MAX_BYTES_PERFIS if max_bytes is None else max_bytes
+    perfis = []
+    with os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.name.endswith(tuple(f".{f}" for f in FORMATOS)):
+                estado = entrada.stat()
+                perfis.append((estado.st_mtime_ns, entrada.name, estado.st_size))
+    perfis.sort()
+    total = sum(tamanho for _, _, tamanho in perfis)
+    removidos = 0
+    # O mais recente fica sempre (mesmo sozinho acima do teto de bytes)
+    for _, nome, tamanho in perfis[:-1]:
+        if len(perfis) - removidos <= max_arquivos and total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(diretorio, nome))
+        except FileNotFoundError:
+            pass  # outro worker podou o mesmo arquivo
+        total -= tamanho
+        removidos += 1
+    return removidos
+
+
+def perfilar(funcao, *args, formato='pstats', nome='perfil', diretorio=DIRETORIO_PERFIS, **kwargs):
+    """Executa funcao sob o perfilador e grava o perfil; devolve (resultado, caminho do arquivo)"""
+    perfilador = cProfile.Profile() if formato == 'pstats' else AmostradorPilhas()
+    inicio = time.perf_counter()
+    perfilador.enable()
+    try:
+        resultado = funcao(*args, **kwargs)
+    finally:
+        perfilador.disable()
+        duracao = time.perf_counter() - inicio
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{nome}_{duracao * 1000:.0f}ms.{formato}")
+        if formato == 'pstats':
+            perfilador.dump_stats(caminho)
+        else:
+            with open(caminho, 'w', encoding='utf-8') as arq:
+                arq.write(perfilador.texto_colapsado())
+        podar_perfis(diretorio)
+    return resultado, caminho
+
+
+def _formato_pedido(token, amostragem):
+    """Formato do perfil pedido para a requisição atual (None = não perfilar)"""
+    if token:
+        if request.headers.get('X-Perfil-Token') == token:
+            return request.headers.get('X-Perfil-Formato', 'pstats')
+        # O navegador repete a URL da página no Referer das chamadas de callback
+        pagina = parse_qs(urlparse(request.referrer or '').query)
+        if pagina.get('perfil') == [token]:
+            return pagina.get('formato', ['pstats'])[0]
+    if amostragem and random.random() < amostragem:
+        return 'folded'
+    return None
+
+
+def instrumentar_perfil(app, token=None, amostragem=None, diretorio=DIRETORIO_PERFIS):
+    """Embrulha o despacho de callbacks do app com o perfil sob demanda"""
+    token = token if token is not None else os.environ.get('AVIACAO_PERFIL_TOKEN')
+    amostragem = amostragem if amostragem is not None else float(os.environ.get('AVIACAO_PERFIL_AMOSTRAGEM', 0))
+    if not token and not amostragem:
+        return
+
+    endpoint = app.config.routes_pathname_prefix + ROTA_CALLBACKS.lstrip('/')
+    despachar = app.server.view_functions[endpoint]
+
+    def despachar_com_perfil(*args, **kwargs):
+        formato = _formato_pedido(token, amostragem)
+        if formato not in FORMATOS:
+            return despachar(*args, **kwargs)
+        corpo = request.get_json(silent=True) or {}
+        resposta, caminho = perfilar(despachar, *args, formato=formato, diretorio=diretorio,
+                                    nome=nome_callback(app, corpo.get('output', '?')), **kwargs)
+        print(f"🔬 Perfil gravado em {caminho}")
+        return resposta
+
+    app.server.view_functions[endpoint] = despachar_com_perfil
+
+
+if __name__ == '__main__':
+    # Perfil local dos caminhos pesados, sem servidor: os mesmos callbacks/builders do app
+    import argparse
+    parser = argparse.ArgumentParser(description="Perfil dos caminhos pesados do app")
+    parser.add_argument('caminho', choices=['graficos', 'analises', 'plano', 'previsao'])
+    parser.add_argument('--formato', choices=FORMATOS, default='pstats')
+    parser.add_argument('--diretorio', default=DIRETORIO_PERFIS)
+    args = parser.parse_args()
+
+    import analises_avancadas, formulario_aviacao, graficos_aviacao
+    from carregamento_paginas import aquecer_em_segundo_plano, dados_frota
+    aquecer_em_segundo_plano().join()  # CSV, modelo e índices carregados fora do perfil
+    execucoes = {
+        # sem os caches (RecursoLazy e disco): monta as figuras de novo
+        'graficos': (graficos_aviacao.montar_layout, (dados_frota(),)),
+        'analises': (analises_avancadas.montar_analises, (dados_frota(),)),
+        'plano': (analises_avancadas.calcular_plano, (500,)),
+        'previsao': (formulario_aviacao.prever_falha_aviacao,
+                    (1, 'Boeing 737', 'Turbofan', 10, 20000, 12, 8000, 25)),
+    }
+    funcao, parametros = execucoes[args.caminho]
+    _, caminho = perfilar(funcao, *parametros, formato=args.formato, nome=args.caminho, diretorio=args.diretorio)
+    print(f"🔬 Perfil gravado em {caminho}")
+    if args.formato == 'pstats':
+        import pstats
+        pstats.Stats(caminho).sort_stats('cumulative').print_stats(15)
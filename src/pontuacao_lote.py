@@ -0,0 +1,53 @@
+import argparse
+import time
+import pandas as pd
+from registro_modelos import carregar_baseline, carregar_pacote
+from monitor_drift import MonitorDrift
+
+# Pontuação em lote com o modelo ATUAL do registro: risco de falha, os
+# sistemas mais prováveis de falhar e (opcional) a contribuição de cada
+# feature via TreeSHAP, com um só pré-processamento por lote.
+
+
+def pontuar_arquivo(entrada, saida, top=3, versao=None, explicar=False, aproximado=False):
+    """Lê um CSV, acrescenta as colunas de risco/sistemas/contribuições e grava o resultado"""
+    pacote = carregar_pacote(versao)
+    dados = pd.read_csv(entrada)
+
+    explicador = None
+    if explicar:
+        from explicacoes import carregar_explicador, explicador_compilado
+        # Por caminho dá para calcular no próprio pacote; o TreeSHAP exato precisa dos boosters
+        explicador = explicador_compilado(pacote) if aproximado else None
+        if explicador is None:
+            explicador = carregar_explicador(pacote)
+
+    inicio = time.perf_counter()
+    resultado = pacote.pontuar(dados, top=top, explicador=explicador, aproximado=aproximado)
+    tempo = time.perf_counter() - inicio
+
+    pd.concat([dados.reset_index(drop=True), resultado], axis=1).to_csv(saida, index=False)
+    print(f"✅ {len(dados)} registros pontuados em {tempo:.2f}s com a versão {pacote.versao} -> {saida}")
+
+    # Drift do lote inteiro em relação ao treino da versão usada
+    baseline = carregar_baseline(pacote.versao)
+    if baseline is not None:
+        monitor = MonitorDrift(baseline, tamanho_subjanela=len(dados))
+        monitor.registrar(dados)
+        print("\n📈 Drift do lote em relação ao treino:")
+        print(monitor.relatorio().round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pontuação em lote de aeronaves")
+    parser.add_argument('entrada', help="CSV com as mesmas colunas de aviacao_falhas.csv")
+    parser.add_argument('saida', help="CSV de saída")
+    parser.add_argument('--top', type=int, default=3, help="quantidade de sistemas listados por aeronave")
+    parser.add_argument('--versao', default=None, help="versão do registro (padrão: ATUAL)")
+    parser.add_argument('--explicar', action='store_true',
+                        help="acrescenta as contribuições TreeSHAP de cada feature (contrib_*)")
+    parser.add_argument('--aproximado', action='store_true',
+                        help="(explicar) atribuição por caminho, bem mais rápida que o TreeSHAP exato")
+    args = parser.parse_args()
+    pontuar_arquivo(args.entrada, args.saida, top=args.top, versao=args.versao,
+                    explicar=args.explicar, aproximado=args.aproximado)
@@ -0,0 +1,179 @@
+import os
+import json
+import glob
+import hashlib
+import shutil
+import tempfile
+from datetime import datetime
+from arvores_compiladas import exportar_json_cliente, ARQUIVO_MODELO_CLIENTE
+from pacote_modelo import PacoteModelo, ARQUIVO_PACOTE
+
+# Registro local de modelos versionados:
+#
+#   modelos/
+#     ATUAL                 -> nome da versão em produção (ex.: "v0003")
+#     v0003/
+#       modelo.ubj          -> booster no formato nativo do XGBoost (UBJSON)
+#       modelo_<nome>.ubj   -> boosters adicionais (ex.: especialistas por segmento)
+#       pacote_modelo.npz   -> pacote de serviço (features + vocabulários + ensemble)
+#       modelo_cliente.json -> ensemble para a prévia no navegador
+#       metadados.json      -> métricas, features, fingerprint dos dados, tempo de treino
+#       baseline_drift.json -> histogramas/frequências do treino para o monitor de drift
+#
+# Cada versão é escrita em um diretório temporário e renomeada no fim, e o
+# ponteiro ATUAL é trocado com os.replace, então o app nunca vê versão pela metade.
+
+DIRETORIO_REGISTRO = "modelos"
+ARQUIVO_ATUAL = "ATUAL"
+ARQUIVO_BOOSTER = "modelo.ubj"
+ARQUIVO_METADADOS = "metadados.json"
+ARQUIVO_BASELINE = "baseline_drift.json"
+
+
+def fingerprint_dados(caminhos, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo dos arquivos de dados (lidos em blocos)"""
+    if isinstance(caminhos, str):
+        caminhos = sorted(glob.glob(caminhos)) or [caminhos]
+    sha = hashlib.sha256()
+    for caminho in caminhos:
+        sha.update(os.path.basename(caminho).encode())
+        with open(caminho, 'rb') as arq:
+            for bloco in iter(lambda: arq.read(tamanho_bloco), b''):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def listar_versoes(registro=DIRETORIO_REGISTRO):
+    """Versões registradas, da mais antiga para a mais nova"""
+    if not os.path.isdir(registro):
+        return []
+    return sorted(
+        nome for nome in os.listdir(registro)
+        if nome.startswith('v') and os.path.isfile(os.path.join(registro, nome, ARQUIVO_METADADOS))
+    )
+
+
+def versao_atual(registro=DIRETORIO_REGISTRO):
+    """Nome da versão apontada por ATUAL (ou None se o registro estiver vazio)"""
+    try:
+        with open(os.path.join(registro, ARQUIVO_ATUAL), encoding='utf-8') as arq:
+            return arq.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolver_versao(versao=None, registro=DIRETORIO_REGISTRO):
+    """Diretório de uma versão (padrão: a atual)"""
+    versao = versao or versao_atual(registro)
+    if versao is None:
+        raise FileNotFoundError(f"Nenhum modelo registrado em {registro}/")
+    return os.path.join(registro, versao)
+
+
+def promover(versao, registro=DIRETORIO_REGISTRO):
+    """Aponta ATUAL para a versão (também serve para rollback)"""
+    if versao not in listar_versoes(registro):
+        raise ValueError(f"Versão inexistente: {versao}")
+    temporario = os.path.join(registro, f".{ARQUIVO_ATUAL}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as arq:
+        arq.write(versao)
+    os.replace(temporario, os.path.join(registro, ARQUIVO_ATUAL))
+
+
+def registrar_versao(modelo, pacote, metricas, parametros, caminho_dados, tempo_treino,
+                    modo='padrao', extras=None, promover_versao=True, registro=DIRETORIO_REGISTRO,
+                    boosters_extras=None, baseline=None):
+    """Grava booster nativo + pacote + metadados como nova versão do registro"""
+    os.makedirs(registro, exist_ok=True)
+    versoes = listar_versoes(registro)
+    numero = int(versoes[-1][1:]) + 1 if versoes else 1
+    versao = f"v{numero:04d}"
+    pacote.versao = versao
+
+    metadados = {
+        'versao': versao,
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'modo': modo,
+        'tempo_treino_s': round(float(tempo_treino), 3),
+        'metricas': {k: float(v) for k, v in metricas.items()},
+        'parametros': parametros,
+        'features': pacote.features,
+        'origem_dados': caminho_dados,
+        'fingerprint_dados': fingerprint_dados(caminho_dados),
+        **(extras or {}),
+    }
+    pacote.metadados = metadados
+
+    temporario = tempfile.mkdtemp(prefix=f".{versao}-", dir=registro)
+    try:
+        for nome, extra in {None: modelo, **(boosters_extras or {})}.items():
+            booster = extra.get_booster() if hasattr(extra, 'get_booster') else extra
+            arquivo = ARQUIVO_BOOSTER if nome is None else ARQUIVO_BOOSTER.replace('.', f'_{nome}.')
+            booster.save_model(os.path.join(temporario, arquivo))
+        pacote.salvar(os.path.join(temporario, ARQUIVO_PACOTE))
+        exportar_json_cliente(pacote.modelo, pacote.vocabularios,
+                            caminho=os.path.join(temporario, ARQUIVO_MODELO_CLIENTE))
+        with open(os.path.join(temporario, ARQUIVO_METADADOS), 'w', encoding='utf-8') as arq:
+            json.dump(metadados, arq, indent=2, ensure_ascii=False)
+        if baseline is not None:
+            with open(os.path.join(temporario, ARQUIVO_BASELINE), 'w', encoding='utf-8') as arq:
+                json.dump(baseline, arq, ensure_ascii=False)
+        os.rename(temporario, os.path.join(registro, versao))
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+
+    if promover_versao:
+        promover(versao, registro)
+
+    print(f"📦 Versão {versao} registrada em {registro}/"
+        f"{' (promovida para ATUAL)' if promover_versao else ''}")
+    return versao
+
+
+def carregar_metadados(versao=None, registro=DIRETORIO_REGISTRO):
+    """Metadados da versão (padrão: a atual)"""
+    with open(os.path.join(resolver_versao(versao, registro), ARQUIVO_METADADOS), encoding='utf-8') as arq:
+        return json.load(arq)
+
+
+def carregar_baseline(versao=None, registro=DIRETORIO_REGISTRO):
+    """Baseline de drift da versão (None se a versão foi registrada sem baseline)"""
+    try:
+        with open(os.path.join(resolver_versao(versao, registro), ARQUIVO_BASELINE), encoding='utf-8') as arq:
+            return json.load(arq)
+    except FileNotFoundError:
+        return None
+
+
+def carregar_booster(versao=None, registro=DIRETORIO_REGISTRO, nome=None):
+    """Carrega só o booster nativo (sem pickle nem sklearn); nome escolhe um booster adicional"""
+    import xgboost as xgb
+    arquivo = ARQUIVO_BOOSTER if nome is None else ARQUIVO_BOOSTER.replace('.', f'_{nome}.')
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(resolver_versao(versao, registro), arquivo))
+    return booster
+
+
+def carregar_pacote(versao=None, registro=DIRETORIO_REGISTRO):
+    """Pacote de serviço da versão (padrão: a atual)"""
+    return PacoteModelo.carregar(os.path.join(resolver_versao(versao, registro), ARQUIVO_PACOTE))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Registro local de modelos")
+    parser.add_argument('acao', choices=['listar', 'promover'])
+    parser.add_argument('versao', nargs='?')
+    args = parser.parse_args()
+
+    if args.acao == 'promover':
+        promover(args.versao)
+        print(f"ATUAL -> {args.versao}")
+    else:
+        atual = versao_atual()
+        for versao in listar_versoes():
+            meta = carregar_metadados(versao)
+            marcador = "*" if versao == atual else " "
+            metricas = ", ".join(f"{k}={v:.4f}" for k, v in meta['metricas'].items())
+            print(f"{marcador} {versao}  {meta['criado_em']}  {meta['modo']:<12} {metricas}")
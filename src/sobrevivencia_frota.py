@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Análise de sobrevivência da frota: em vez do sim/não de falha_critica, a
+# curva de Kaplan–Meier S(t) (fração sem falha crítica até t horas de voo ou
+# ciclos) e o risco instantâneo por segmento (modelo, motor ou os dois). Cada
+# aeronave entra com o seu uso atual como tempo: falha_critica = 1 é o evento,
+# as demais são censuradas (ainda não falharam até ali).
+# Por segmento é uma ordenação e uma passada vetorizada (reduceat nos tempos
+# distintos); os segmentos rodam em threads (o sort e os reduces do numpy
+# soltam o GIL, e as fatias não precisam ser copiadas para outro processo).
+# As curvas saem avaliadas numa grade comum de PONTOS_GRADE tempos, então o
+# gráfico tem o mesmo tamanho com 2 mil ou 10 milhões de aeronaves.
+
+TEMPOS = {'horas_voo_total': "Horas de voo", 'ciclos_pouso_decolagem': "Ciclos de pouso/decolagem"}
+SEGMENTOS = {
+    'modelo_aeronave': ['modelo_aeronave'],
+    'tipo_motor': ['tipo_motor'],
+    'modelo_motor': ['modelo_aeronave', 'tipo_motor'],
+}
+PONTOS_GRADE = 200
+MIN_AERONAVES = 20  # segmentos menores ficam de fora (curva instável demais)
+
+
+def kaplan_meier(tempo, evento, grade):
+    """S(t), IC 95% (Greenwood), risco acumulado (Nelson–Aalen) na grade e a mediana de sobrevivência"""
+    ordem = np.argsort(tempo, kind='stable')
+    t, e = tempo[ordem], evento[ordem].astype(np.float64)
+
+    # Uma passada nos tempos distintos: eventos em cada um e aeronaves ainda em risco
+    inicio = np.flatnonzero(np.r_[True, t[1:] != t[:-1]])
+    distintos = t[inicio]
+    eventos = np.add.reduceat(e, inicio)
+    em_risco = len(t) - inicio
+
+    sobrevivencia = np.cumprod(1.0 - eventos / em_risco)
+    risco_acumulado = np.cumsum(eventos / em_risco)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greenwood = np.cumsum(np.where(em_risco > eventos, eventos / (em_risco * (em_risco - eventos)), 0.0))
+    erro = sobrevivencia * np.sqrt(greenwood)
+
+    posicao = np.searchsorted(distintos, grade, side='right') - 1
+    antes = posicao < 0
+    posicao = np.maximum(posicao, 0)
+    abaixo_metade = np.flatnonzero(sobrevivencia <= 0.5)
+    return {
+        'sobrevivencia': np.where(antes, 1.0, sobrevivencia[posicao]),
+        'ic_inf': np.where(antes, 1.0, np.clip(sobrevivencia[posicao] - 1.96 * erro[posicao], 0, 1)),
+        'ic_sup': np.where(antes, 1.0, np.clip(sobrevivencia[posicao] + 1.96 * erro[posicao], 0, 1)),
+        'risco_acumulado': np.where(antes, 0.0, risco_acumulado[posicao]),
+        'mediana': float(distintos[abaixo_metade[0]]) if len(abaixo_metade) else None,
+    }
+
+
+def curvas_sobrevivencia(dados, tempo='horas_voo_total', segmento='modelo_aeronave', threads=None):
+    """Curvas por segmento na grade comum; dict pronto para JSON (vai para o cache em disco)"""
+    colunas = SEGMENTOS[segmento]
+    valores_tempo = dados[tempo].to_numpy(dtype=np.float64)
+    evento = dados['falha_critica'].to_numpy() > 0
+    grade = np.linspace(0.0, float(np.quantile(valores_tempo, 0.99)) if len(dados) else 1.0, PONTOS_GRADE)
+
+    # Código do segmento por linha (factorize por coluna, combinado em base mista) e as
+    # linhas de cada segmento (ordenação estável de int16 = radix sort, O(n))
+    codigos, nomes, ausente = np.zeros(len(dados), dtype=np.int64), [()], np.zeros(len(dados), dtype=bool)
+    for coluna in colunas:
+        codigo_coluna, valores = pd.factorize(dados[coluna])
+        codigos = codigos * len(valores) + codigo_coluna
+        nomes = [nome + (valor,) for nome in nomes for valor in valores]
+        ausente |= codigo_coluna < 0  # segmento com NaN fica de fora
+    codigos = np.where(ausente, -1, codigos).astype(np.int16 if len(nomes) < 2 ** 15 else np.int64)
+    ordem = np.argsort(codigos, kind='stable')[np.count_nonzero(ausente):]
+    cortes = np.cumsum(np.bincount(codigos[~ausente], minlength=len(nomes)))[:-1]
+    linhas_por_segmento = np.split(ordem, cortes)
+
+    def calcular(i):
+        linhas = linhas_por_segmento[i]
+        if len(linhas) < MIN_AERONAVES:
+            return None
+        curva = kaplan_meier(valores_tempo[linhas], evento[linhas], grade)
+        # Risco por 1.000 unidades de tempo em cada intervalo da grade (derivada do risco acumulado)
+        risco = np.diff(curva['risco_acumulado']) / np.diff(grade) * 1000
+        return {
+            'segmento': " / ".join(str(valor) for valor in nomes[i]),
+            'aeronaves': int(len(linhas)),
+            'falhas': int(evento[linhas].sum()),
+            'mediana': curva['mediana'],
+            'sobrevivencia': curva['sobrevivencia'].round(5).tolist(),
+            'ic_inf': curva['ic_inf'].round(5).tolist(),
+            'ic_sup': curva['ic_sup'].round(5).tolist(),
+            'risco_por_mil': risco.round(5).tolist(),
+        }
+
+    threads = threads or min(len(nomes), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(threads) as executor:
+        segmentos = [s for s in executor.map(calcular, range(len(nomes))) if s is not None]
+    return {'tempo': tempo, 'segmento': segmento, 'grade': grade.round(3).tolist(),
+            'segmentos': sorted(segmentos, key=lambda s: s['segmento'])}
+
+
+if __name__ == '__main__':
+    # Tempo das curvas com frotas sintéticas grandes (segmento modelo x motor = 24 curvas)
+    import argparse
+    import time
+    from gerador_frota import gerar_frota
+    parser = argparse.ArgumentParser(description="Curvas de sobrevivência da frota")
+    parser.add_argument('--aeronaves', type=int, default=2_000_000)
+    parser.add_argument('--tempo', choices=list(TEMPOS), default='horas_voo_total')
+    parser.add_argument('--segmento', choices=list(SEGMENTOS), default='modelo_motor')
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    frota = gerar_frota(args.aeronaves)
+    inicio = time.perf_counter()
+    resultado = curvas_sobrevivencia(frota, args.tempo, args.segmento, args.threads)
+    print(f"⏳ {len(resultado['segmentos'])} curvas de {args.aeronaves:,} aeronaves em "
+        f"{time.perf_counter() - inicio:.2f}s")
+    for s in sorted(resultado['segmentos'], key=lambda s: s['mediana'] or float('inf'))[:5]:
+        print(f"   - {s['segmento']:<28} {s['aeronaves']:>9,} aeronaves, mediana "
+            f"{s['mediana'] if s['mediana'] is not None else '—'} ({TEMPOS[args.tempo].lower()})")
@@ -0,0 +1,119 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from arvores_compiladas import exportar_arvores
+from pacote_modelo import PacoteModelo
+from registro_modelos import registrar_versao
+from monitor_drift import criar_baseline
+
+# Categóricas nativas do XGBoost: modelo_aeronave/tipo_motor (e opcionalmente
+# companhia_aerea) entram como dtype "category" e as árvores fazem splits por
+# conjunto de categorias, em vez de tratar os códigos do LabelEncoder como ordenados.
+
+ARQUIVO_COMPARACAO = "comparacao_codificacao.csv"
+
+colunas_numericas = [
+    'idade_aeronave_anos',
+    'horas_voo_total',
+    'ultima_manutencao_meses',
+    'ciclos_pouso_decolagem',
+    'temperatura_media_operacao'
+]
+
+
+def _estatisticas_arvores(modelo):
+    """Média de folhas e de profundidade por árvore"""
+    arvores = json.loads(modelo.get_booster().save_raw('json'))['learner']['gradient_booster']['model']['trees']
+    folhas, profundidades = [], []
+    for arvore in arvores:
+        pais = arvore['parents']
+        prof = [0] * len(pais)
+        for no in range(1, len(pais)):
+            prof[no] = prof[pais[no]] + 1
+        folhas.append(sum(1 for esq in arvore['left_children'] if esq == -1))
+        profundidades.append(max(prof))
+    return float(np.mean(folhas)), float(np.mean(profundidades))
+
+
+def _avaliar(nome, modelo, X_treino, y_treino, X_teste, y_teste, repeticoes=5):
+    """Treina e mede acurácia, AUC, tempo de treino e de inferência"""
+    inicio = time.perf_counter()
+    modelo.fit(X_treino, y_treino)
+    tempo_treino = time.perf_counter() - inicio
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        proba = modelo.predict_proba(X_teste)[:, 1]
+        tempos.append(time.perf_counter() - inicio)
+
+    folhas, profundidade = _estatisticas_arvores(modelo)
+    return {
+        'codificacao': nome,
+        'acuracia_teste': accuracy_score(y_teste, proba >= 0.5),
+        'roc_auc_teste': roc_auc_score(y_teste, proba),
+        'tempo_treino_s': tempo_treino,
+        'tempo_inferencia_ms': min(tempos) * 1000,
+        'folhas_por_arvore': folhas,
+        'profundidade_media': profundidade,
+    }
+
+
+def comparar_codificacoes(dados, features_label, parametros, caminho_dados, com_companhia=False):
+    """Compara LabelEncoder x categóricas nativas no mesmo split; registra o modelo nativo"""
+    colunas_categoricas = ['modelo_aeronave', 'tipo_motor'] + (['companhia_aerea'] if com_companhia else [])
+    features_nativas = colunas_numericas + colunas_categoricas
+
+    # Categorias ordenadas: mesmos códigos do LabelEncoder
+    vocabularios = {col: sorted(dados[col].dropna().unique()) for col in colunas_categoricas}
+    X_nativo = dados[colunas_numericas].copy()
+    for col in colunas_categoricas:
+        X_nativo[col] = pd.Categorical(dados[col], categories=vocabularios[col])
+
+    y = dados['falha_critica']
+    idx_treino, idx_teste = train_test_split(
+        np.arange(len(dados)), test_size=0.2, random_state=42, stratify=y
+    )
+    y_treino, y_teste = y.iloc[idx_treino], y.iloc[idx_teste]
+    X_label = dados[features_label]
+
+    # O método de árvore é fixado abaixo para cada codificação
+    parametros = {k: v for k, v in parametros.items() if k != 'tree_method'}
+    print(f"\n🏷️ Comparando codificações (categóricas: {colunas_categoricas})")
+    resultados = [
+        _avaliar("label_encoder", xgb.XGBClassifier(**parametros),
+                X_label.iloc[idx_treino], y_treino, X_label.iloc[idx_teste], y_teste),
+        _avaliar("label_encoder_hist", xgb.XGBClassifier(**parametros, tree_method="hist"),
+                X_label.iloc[idx_treino], y_treino, X_label.iloc[idx_teste], y_teste),
+    ]
+
+    modelo_nativo = xgb.XGBClassifier(
+        **parametros,
+        tree_method="hist",
+        enable_categorical=True,
+        max_cat_to_onehot=1  # splits por partição de categorias
+    )
+    resultados.append(_avaliar("categorica_nativa", modelo_nativo,
+                            X_nativo.iloc[idx_treino], y_treino, X_nativo.iloc[idx_teste], y_teste))
+
+    comparacao = pd.DataFrame(resultados).set_index('codificacao')
+    print(comparacao.round(4).to_string())
+    comparacao.to_csv(ARQUIVO_COMPARACAO)
+    print(f"Comparação salva em {ARQUIVO_COMPARACAO}")
+
+    # Registra o modelo nativo sem promover; use registro_modelos.py promover vNNNN
+    nativo = resultados[-1]
+    pacote = PacoteModelo(features_nativas, vocabularios, exportar_arvores(modelo_nativo))
+    registrar_versao(
+        modelo_nativo, pacote,
+        {k: nativo[k] for k in ('acuracia_teste', 'roc_auc_teste')},
+        dict(parametros, tree_method="hist", enable_categorical=True, max_cat_to_onehot=1),
+        caminho_dados, nativo['tempo_treino_s'],
+        modo='categorico', promover_versao=False,
+        baseline=criar_baseline(dados.iloc[idx_treino])
+    )
+    return comparacao
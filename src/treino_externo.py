@@ -0,0 +1,200 @@
+import os
+import glob
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score
+from arvores_compiladas import exportar_arvores
+from monitor_drift import criar_baseline
+from pacote_modelo import PacoteModelo
+from registro_modelos import registrar_versao
+
+# Treinamento em memória externa: o booster é alimentado bloco a bloco por um
+# xgb.DataIter que lê partições CSV/Parquet, e o XGBoost mantém apenas o cache
+# em disco. A divisão treino/teste é feita por hash do conteúdo da linha, então
+# não depende de ter o dataset inteiro em memória nem da ordem dos blocos.
+
+PERCENTUAL_TESTE = 20
+AMOSTRA_BASELINE = 200_000  # linhas de treino usadas no baseline de drift
+
+
+def listar_particoes(padrao):
+    """Expande um arquivo, diretório ou glob em uma lista ordenada de partições"""
+    if os.path.isdir(padrao):
+        padrao = os.path.join(padrao, "*")
+    arquivos = sorted(
+        a for a in glob.glob(padrao)
+        if a.endswith(('.csv', '.parquet'))
+    )
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhuma partição CSV/Parquet encontrada em {padrao}")
+    return arquivos
+
+
+def ler_blocos(arquivos, linhas_bloco, colunas=None):
+    """Gera DataFrames de no máximo linhas_bloco linhas a partir das partições"""
+    for arquivo in arquivos:
+        if arquivo.endswith('.parquet'):
+            tabela = pd.read_parquet(arquivo, columns=colunas)
+            for inicio in range(0, len(tabela), linhas_bloco):
+                yield tabela.iloc[inicio:inicio + linhas_bloco]
+        else:
+            yield from pd.read_csv(arquivo, usecols=colunas, chunksize=linhas_bloco)
+
+
+def mascara_teste(bloco, percentual=PERCENTUAL_TESTE):
+    """Divisão determinística por hash: a mesma linha cai sempre no mesmo lado"""
+    hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+    return (hashes % 100) < percentual
+
+
+def amostrar_treino(arquivos, linhas_bloco, tamanho=AMOSTRA_BASELINE):
+    """Amostra uniforme das linhas de treino com memória limitada (as `tamanho` de menor hash)"""
+    amostra, chaves = None, np.empty(0, dtype=np.uint64)
+    for bloco in ler_blocos(arquivos, linhas_bloco):
+        hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+        treino = (hashes % 100) >= PERCENTUAL_TESTE
+        bloco, hashes = bloco[treino], hashes[treino] // 100  # o resto de 100 já decidiu treino/teste
+        amostra = bloco if amostra is None else pd.concat([amostra, bloco], ignore_index=True)
+        chaves = np.concatenate([chaves, hashes])
+        if len(chaves) > tamanho:
+            manter = np.argpartition(chaves, tamanho)[:tamanho]
+            amostra, chaves = amostra.iloc[manter].reset_index(drop=True), chaves[manter]
+    return amostra
+
+
+def coletar_categorias(arquivos, colunas, linhas_bloco):
+    """Primeira passada (só colunas categóricas) para fixar o vocabulário global"""
+    vistos = {col: set() for col in colunas}
+    for bloco in ler_blocos(arquivos, linhas_bloco, colunas=colunas):
+        for col in colunas:
+            vistos[col].update(bloco[col].dropna().unique())
+    # Mesma ordem do LabelEncoder (classes ordenadas)
+    return {col: sorted(valores) for col, valores in vistos.items()}
+
+
+def codificar_bloco(bloco, vocabularios, features):
+    """Monta a matriz de features; categoria fora do vocabulário vira NaN (valor ausente)"""
+    X = pd.DataFrame(index=bloco.index)
+    for feature in features:
+        if feature in vocabularios:
+            # Categórica nativa do XGBoost: dtype category com o vocabulário fixo
+            X[feature] = pd.Categorical(bloco[feature], categories=vocabularios[feature])
+        elif feature.endswith('_encoded'):
+            col = feature[:-len('_encoded')]
+            codigos = pd.Index(vocabularios[col]).get_indexer(bloco[col]).astype(np.float32)
+            codigos[codigos < 0] = np.nan
+            X[feature] = codigos
+        else:
+            X[feature] = bloco[feature].astype(np.float32)
+    return X
+
+
+class IteradorAviacao(xgb.DataIter):
+    """Alimenta o XGBoost com blocos codificados de uma das partes (treino/teste)"""
+
+    def __init__(self, arquivos, categorias, features, parte, linhas_bloco, cache_prefix):
+        self.arquivos = arquivos
+        self.features = features
+        self.parte = parte
+        self.linhas_bloco = linhas_bloco
+        self.vocabularios = {
+            col: pd.Index(classes) for col, classes in categorias.items()
+        }
+        self._blocos = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def blocos_da_parte(self):
+        for bloco in ler_blocos(self.arquivos, self.linhas_bloco):
+            teste = mascara_teste(bloco)
+            bloco = bloco[teste] if self.parte == 'teste' else bloco[~teste]
+            if len(bloco):
+                yield codificar_bloco(bloco, self.vocabularios, self.features), bloco['falha_critica'].to_numpy()
+
+    def reset(self):
+        self._blocos = None
+
+    def next(self, input_data):
+        if self._blocos is None:
+            self._blocos = self.blocos_da_parte()
+        try:
+            X, y = next(self._blocos)
+        except StopIteration:
+            self._blocos = None
+            return 0
+        input_data(data=X, label=y)
+        return 1
+
+
+def treinar_memoria_externa(padrao_dados, features, categorical_columns, linhas_bloco=100_000,
+                            parametros=None, n_estimators=100):
+    """Treina o booster a partir de partições maiores que a memória"""
+    arquivos = listar_particoes(padrao_dados)
+    print(f"\n💾 Treino em memória externa: {len(arquivos)} partição(ões), blocos de {linhas_bloco} linhas")
+
+    categorias = coletar_categorias(arquivos, categorical_columns, linhas_bloco)
+    for col, classes in categorias.items():
+        print(f"Vocabulário {col}: {len(classes)} categorias")
+
+    parametros = parametros or {
+        'objective': 'binary:logistic',
+        'eval_metric': 'logloss',
+        'tree_method': 'hist',
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'seed': 42,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="xgb_cache_") as dir_cache:
+        it_treino = IteradorAviacao(arquivos, categorias, features, 'treino', linhas_bloco,
+                                    os.path.join(dir_cache, 'treino'))
+        it_teste = IteradorAviacao(arquivos, categorias, features, 'teste', linhas_bloco,
+                                os.path.join(dir_cache, 'teste'))
+
+        inicio = time.perf_counter()
+        dtreino = xgb.DMatrix(it_treino)
+        dteste = xgb.DMatrix(it_teste)
+        print(f"Cache externo construído em {time.perf_counter() - inicio:.1f}s "
+            f"(treino: {dtreino.num_row()} | teste: {dteste.num_row()} linhas)")
+
+        inicio = time.perf_counter()
+        booster = xgb.train(
+            parametros, dtreino,
+            num_boost_round=n_estimators,
+            evals=[(dteste, 'teste')],
+            verbose_eval=max(1, n_estimators // 5)
+        )
+        tempo_treino = time.perf_counter() - inicio
+        print(f"Treino concluído em {tempo_treino:.1f}s")
+        booster.feature_names = features
+
+        # Avaliação bloco a bloco (só rótulo e probabilidade ficam em memória)
+        y_teste, proba = [], []
+        for X, y in it_teste.blocos_da_parte():
+            proba.append(booster.predict(xgb.DMatrix(X)))
+            y_teste.append(y)
+        y_teste, proba = np.concatenate(y_teste), np.concatenate(proba)
+
+        # Libera os DMatrix antes de apagar o diretório de cache
+        del dtreino, dteste
+
+    metricas = {
+        'acuracia_teste': accuracy_score(y_teste, proba >= 0.5),
+        'roc_auc_teste': roc_auc_score(y_teste, proba),
+    }
+    print(f"Acurácia no teste: {metricas['acuracia_teste']:.2%}")
+    print(f"ROC-AUC no teste: {metricas['roc_auc_teste']:.4f}")
+
+    parametros = dict(parametros, n_estimators=n_estimators)
+    return booster, categorias, metricas, parametros, arquivos, tempo_treino
+
+
+def salvar_artefatos_externos(booster, categorias, metricas, parametros, arquivos, tempo_treino, features,
+                            linhas_bloco=100_000):
+    """Registra o booster nativo, o pacote usado pelo formulário e o baseline de drift (de uma amostra do treino)"""
+    pacote = PacoteModelo(features, categorias, exportar_arvores(booster))
+    baseline = criar_baseline(amostrar_treino(arquivos, linhas_bloco))
+    registrar_versao(booster, pacote, metricas, parametros, arquivos, tempo_treino, modo='externo',
+                    baseline=baseline)
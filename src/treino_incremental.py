@@ -0,0 +1,85 @@
+import time
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from arvores_compiladas import exportar_arvores
+from monitor_drift import criar_baseline
+from pacote_modelo import PacoteModelo
+from registro_modelos import (carregar_baseline, carregar_booster, carregar_metadados,
+                            carregar_pacote, registrar_versao)
+from treino_externo import mascara_teste, codificar_bloco
+
+# Treino continuado: o booster da versão ATUAL do registro recebe novas árvores
+# ajustadas apenas nos registros novos (warm start via xgb_model). A nova versão
+# só é registrada e promovida se as métricas no holdout não piorarem.
+
+
+def metricas_holdout(proba, y):
+    """Métricas usadas para decidir a promoção"""
+    return {
+        'logloss': log_loss(y, proba, labels=[0, 1]),
+        'auc': roc_auc_score(y, proba) if len(np.unique(y)) > 1 else float('nan'),
+        'acuracia': accuracy_score(y, proba >= 0.5),
+    }
+
+
+def treinar_incremental(caminho_novos, novas_arvores=20, tolerancia=0.0):
+    """Adiciona árvores ao modelo atual com os dados novos; faz rollback se piorar"""
+    metadados_atual = carregar_metadados()
+    if metadados_atual['modo'] == 'segmentado':
+        raise ValueError("Treino incremental não suporta modelos segmentados; "
+                        "treine novamente com --modo segmentado")
+    booster_atual = carregar_booster()
+    pacote_atual = carregar_pacote()
+
+    novos = pd.read_csv(caminho_novos)
+    print(f"\n♻️ Treino incremental: {len(novos)} registros novos, +{novas_arvores} árvores")
+
+    # Holdout determinístico por hash (mesma regra do treino em memória externa)
+    teste = mascara_teste(novos)
+    X = codificar_bloco(novos, pacote_atual.vocabularios, pacote_atual.features)
+    y = novos['falha_critica'].astype(int).to_numpy()
+    X_treino, y_treino = X[~teste], y[~teste]
+    X_holdout, y_holdout = X[teste], y[teste]
+    print(f"Treino: {len(X_treino)} | Holdout: {len(X_holdout)}")
+
+    antes = metricas_holdout(pacote_atual.predict_proba(novos[teste])[:, 1], y_holdout)
+
+    # Mesmos hiperparâmetros da versão atual, mas só com as árvores novas
+    parametros = dict(metadados_atual['parametros'], n_estimators=novas_arvores)
+    modelo_novo = xgb.XGBClassifier(**parametros)
+
+    inicio = time.perf_counter()
+    modelo_novo.fit(X_treino, y_treino, xgb_model=booster_atual)
+    tempo_treino = time.perf_counter() - inicio
+    print(f"Árvores adicionadas em {tempo_treino:.2f}s "
+        f"(total: {modelo_novo.get_booster().num_boosted_rounds()})")
+
+    depois = metricas_holdout(modelo_novo.predict_proba(X_holdout)[:, 1], y_holdout)
+
+    print(f"{'métrica':<10}{'antes':>10}{'depois':>10}")
+    for nome in antes:
+        print(f"{nome:<10}{antes[nome]:>10.4f}{depois[nome]:>10.4f}")
+
+    if depois['logloss'] > antes['logloss'] + tolerancia:
+        print(f"⚠️ Holdout piorou: rollback, a versão {metadados_atual['versao']} foi mantida.")
+        return metadados_atual['versao'], False
+
+    # O modelo de tipo_falha e o baseline de drift da versão base seguem junto, sem alteração
+    # (uma base sem baseline ganha um dos registros novos de treino, para o monitor não ficar desligado)
+    baseline = carregar_baseline()
+    if baseline is None:
+        print(f"⚠️ {metadados_atual['versao']} não tem baseline de drift: criado a partir dos registros novos")
+        baseline = criar_baseline(novos[~teste])
+    pacote = PacoteModelo(pacote_atual.features, pacote_atual.vocabularios, exportar_arvores(modelo_novo),
+                        modelo_tipo=pacote_atual.modelo_tipo, classes_tipo=pacote_atual.classes_tipo)
+    boosters_extras = {'tipo': carregar_booster(nome='tipo')} if pacote_atual.modelo_tipo is not None else None
+    versao = registrar_versao(
+        modelo_novo, pacote, depois, parametros, caminho_novos, tempo_treino,
+        modo='incremental',
+        extras={'versao_base': metadados_atual['versao'], 'holdout_antes': antes},
+        boosters_extras=boosters_extras,
+        baseline=baseline
+    )
+    return versao, True
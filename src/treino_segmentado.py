@@ -0,0 +1,131 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from arvores_compiladas import RoteadorSegmentos, exportar_arvores
+from pacote_modelo import PacoteModelo
+from registro_modelos import registrar_versao
+from monitor_drift import criar_baseline
+
+# Modelos segmentados: um booster especialista por modelo_aeronave (ou tipo_motor),
+# treinados em paralelo (um segmento por processo), mais um booster global que
+# atende segmentos raros e categorias desconhecidas. No serviço, o
+# RoteadorSegmentos despacha cada linha para o ensemble do seu segmento.
+
+# Dados compartilhados com os processos do pool (enviados uma vez por processo)
+_dados_segmentos = {}
+
+
+def _inicializar_processo(X, y, segmentos):
+    _dados_segmentos.update(X=X, y=y, segmentos=segmentos)
+
+
+def _treinar_segmento(codigo, parametros, threads):
+    """Treina o especialista de um segmento (codigo None = global) no pool"""
+    X, y = _dados_segmentos['X'], _dados_segmentos['y']
+    if codigo is not None:
+        linhas = _dados_segmentos['segmentos'] == codigo
+        X, y = X[linhas], y[linhas]
+
+    inicio = time.perf_counter()
+    modelo = xgb.XGBClassifier(**parametros, n_jobs=threads)
+    modelo.fit(X, y)
+    return codigo, modelo, time.perf_counter() - inicio
+
+
+def treinar_segmentos(dados, features, label_encoders, parametros, caminho_dados,
+                    coluna_segmento='modelo_aeronave', min_registros=150,
+                    n_processos=None, threads_por_processo=1):
+    """Treina especialistas por segmento + global em paralelo e registra o roteador"""
+    feature_segmento = f"{coluna_segmento}_encoded"
+    if feature_segmento not in features:
+        raise ValueError(f"{feature_segmento} não está entre as features do modelo")
+
+    # DataFrames preservam os nomes das features nos boosters (usados pelo roteador)
+    X = dados[features]
+    y = dados['falha_critica'].to_numpy().astype(int)
+    idx_treino, idx_teste = train_test_split(
+        np.arange(len(dados)), test_size=0.2, random_state=42, stratify=y
+    )
+    X_treino, y_treino = X.iloc[idx_treino], y[idx_treino]
+    X_teste, y_teste = X.iloc[idx_teste], y[idx_teste]
+    segmentos_treino = X_treino[feature_segmento].to_numpy(dtype=np.float32)
+
+    # Segmentos raros (ou com uma só classe) ficam com o global
+    classes = label_encoders[coluna_segmento].classes_
+    contagem = pd.Series(y_treino).groupby(segmentos_treino).agg(['size', 'nunique'])
+    codigos = [float(c) for c, linha in contagem.iterrows()
+            if linha['size'] >= min_registros and linha['nunique'] == 2]
+    raros = [classes[int(c)] for c in contagem.index if float(c) not in codigos]
+
+    n_processos = n_processos or max(1, (os.cpu_count() or 1) // threads_por_processo)
+    print(f"\n🧩 Modelos por {coluna_segmento}: {len(codigos)} especialistas + global "
+        f"({n_processos} processos x {threads_por_processo} threads)")
+    if raros:
+        print(f"Segmentos raros (usam o global): {raros}")
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_processo,
+                            initargs=(X_treino, y_treino, segmentos_treino)) as pool:
+        futuros = [pool.submit(_treinar_segmento, codigo, parametros, threads_por_processo)
+                for codigo in [None] + codigos]
+        treinados = {codigo: (modelo, tempo) for codigo, modelo, tempo in (f.result() for f in futuros)}
+    tempo_treino = time.perf_counter() - inicio
+    print(f"Treino paralelo em {tempo_treino:.1f}s "
+        f"(soma dos segmentos: {sum(t for _, t in treinados.values()):.1f}s)")
+
+    modelo_global = treinados[None][0]
+    roteador = RoteadorSegmentos(
+        feature_segmento, codigos,
+        [exportar_arvores(treinados[c][0]) for c in codigos],
+        exportar_arvores(modelo_global)
+    )
+
+    # Comparação no mesmo teste: roteador x global, total e por segmento
+    proba_roteador = roteador.predict_proba(X_teste)[:, 1]
+    proba_global = modelo_global.predict_proba(X_teste)[:, 1]
+    segmentos_teste = X_teste[feature_segmento].to_numpy(dtype=np.float32)
+    linhas = []
+    for codigo in np.unique(segmentos_teste):
+        mascara = segmentos_teste == codigo
+        y_seg = y_teste[mascara]
+        linha = {'segmento': classes[int(codigo)], 'n_teste': int(mascara.sum()),
+                'especialista': codigo in codigos}
+        for nome, proba in (('global', proba_global), ('roteador', proba_roteador)):
+            linha[f'acuracia_{nome}'] = accuracy_score(y_seg, proba[mascara] >= 0.5)
+            linha[f'auc_{nome}'] = (roc_auc_score(y_seg, proba[mascara])
+                                    if len(np.unique(y_seg)) > 1 else np.nan)
+        linhas.append(linha)
+    print(pd.DataFrame(linhas).round(4).to_string(index=False))
+
+    metricas = {
+        'acuracia_teste': accuracy_score(y_teste, proba_roteador >= 0.5),
+        'roc_auc_teste': roc_auc_score(y_teste, proba_roteador),
+        'acuracia_teste_global': accuracy_score(y_teste, proba_global >= 0.5),
+        'roc_auc_teste_global': roc_auc_score(y_teste, proba_global),
+    }
+    print(f"Roteador: acurácia {metricas['acuracia_teste']:.2%}, AUC {metricas['roc_auc_teste']:.4f} | "
+        f"Global: acurácia {metricas['acuracia_teste_global']:.2%}, AUC {metricas['roc_auc_teste_global']:.4f}")
+
+    vocabularios = {
+        col: le.classes_.tolist() for col, le in label_encoders.items() if f"{col}_encoded" in features
+    }
+    pacote = PacoteModelo(features, vocabularios, roteador)
+
+    # Só vai para produção se o roteador não perder para o global no teste
+    promover_versao = metricas['roc_auc_teste'] >= metricas['roc_auc_teste_global']
+    if not promover_versao:
+        print("⚠️ Roteador com AUC menor que o global: versão registrada sem promover.")
+    return registrar_versao(
+        modelo_global, pacote, metricas,
+        dict(parametros, segmento=coluna_segmento, min_registros=min_registros),
+        caminho_dados, tempo_treino, modo='segmentado',
+        extras={'especialistas': [classes[int(c)] for c in codigos], 'segmentos_raros': raros},
+        promover_versao=promover_versao,
+        boosters_extras={f"seg{int(c)}": treinados[c][0] for c in codigos},
+        baseline=criar_baseline(dados.iloc[idx_treino])
+    )
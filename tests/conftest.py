@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do app são scripts em src/ (rodados com python src/<script>.py), não um pacote
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
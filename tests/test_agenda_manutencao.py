@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from agenda_manutencao import custo_esperado_falha, planejar_manutencao
+
+SEMANAS = 5
+
+
+def _frota(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'idade_aeronave_anos': rng.uniform(1, 5, n),
+        'horas_voo_total': rng.uniform(1000, 5000, n),
+        'ultima_manutencao_meses': rng.uniform(6, 24, n),
+        'modelo_aeronave': rng.choice(['Boeing 737', 'Airbus A320'], n),
+    })
+
+
+def test_capacidade_semanal_e_ordem_por_custo_de_atraso():
+    dados = _frota(30).assign(idade_aeronave_anos=0.1, horas_voo_total=100.0)
+    rng = np.random.default_rng(1)
+    risco = rng.uniform(0.6, 0.9, 30)
+    risco_pos = risco * rng.uniform(0.1, 0.5, 30)
+    plano = planejar_manutencao(dados, risco, risco_pos, capacidade_semanal=2, semanas=SEMANAS)
+
+    # Manutenção barata e risco alto: todas compensam, mas só cabem 2 x 5
+    agendadas = plano[plano['semana'] > 0]
+    assert len(agendadas) == 2 * SEMANAS
+    assert agendadas.groupby('semana').size().max() <= 2
+    assert agendadas['prioridade'].tolist() == list(range(1, 2 * SEMANAS + 1))
+    assert (plano.loc[plano['semana'] == 0, 'prioridade'] == 0).all()
+
+    # Maior queda de risco semanal primeiro; as sem vaga são as de menor custo de atraso
+    h = 1 - (1 - plano['risco']) ** (1 / SEMANAS)
+    h_pos = 1 - (1 - plano['risco_pos_manutencao']) ** (1 / SEMANAS)
+    atraso = (h - h_pos).to_numpy()
+    assert (np.diff(atraso[:len(agendadas)]) <= 1e-12).all()
+    assert atraso[len(agendadas):].max() <= atraso[:len(agendadas)].min()
+
+
+def test_corte_quando_a_semana_da_vaga_nao_compensa():
+    # Duas aeronaves de risco alto ocupam as semanas 1 e 2 (uma vaga por semana);
+    # a terceira se pagaria na semana 1, mas não na 3
+    dados = pd.DataFrame({'idade_aeronave_anos': [1.0, 1.0, 24.0, 60.0],
+                        'horas_voo_total': [0.0, 0.0, 0.0, 0.0]})
+    risco = np.array([0.9, 0.9, 0.5, 0.5])
+    risco_pos = np.zeros(4)
+    sem = custo_esperado_falha(risco, risco_pos, np.zeros(4), 52)
+    assert sem[2] - custo_esperado_falha(risco, risco_pos, np.ones(4), 52)[2] > 24000
+    assert sem[2] - custo_esperado_falha(risco, risco_pos, np.full(4, 3), 52)[2] < 24000
+
+    plano = planejar_manutencao(dados, risco, risco_pos, capacidade_semanal=1).sort_index()
+    assert plano['semana'].tolist() == [1, 2, 0, 0]
+    assert plano['prioridade'].tolist() == [1, 2, 0, 0]
+    # A quarta nem é candidata (manutenção de R$ 60 mil > custo de falha esperado)
+    assert (plano['economia_esperada'].iloc[2:] == 0).all()
+    assert (plano['economia_esperada'].iloc[:2] > 0).all()
+    assert (plano['custo_esperado_com'].iloc[2:] == plano['custo_esperado_sem'].iloc[2:]).all()
+
+
+class _PacoteFalso:
+    """Risco cresce com a idade e com o tempo desde a última manutenção"""
+
+    def predict_proba(self, dados):
+        risco = np.clip(dados['idade_aeronave_anos'] / 10 + dados['ultima_manutencao_meses'] / 48, 0, 0.99)
+        return np.column_stack([1 - risco, risco])
+
+
+def test_plano_acompanha_mudanca_no_csv(tmp_path, monkeypatch):
+    import analises_avancadas
+    import registro_modelos
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(registro_modelos, 'carregar_pacote', _PacoteFalso)
+
+    _frota(40).to_csv('aviacao_falhas.csv', index=False)
+    assert len(analises_avancadas.plano_manutencao(3)) == 40
+
+    # Linhas novas no CSV: dados, scores e plano são recalculados juntos
+    pd.concat([_frota(40), _frota(10, semente=1)]).to_csv('aviacao_falhas.csv', index=False)
+    plano = analises_avancadas.plano_manutencao(3)
+    assert len(plano) == 50
+    assert len(analises_avancadas.scores_frota()[0]) == 50
+    assert plano['semana'].max() > 0
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aeronaves_similares import COLUNAS_NUMERICAS
+from anomalias_frota import DetectorAnomalias
+
+CENTROS = {
+    'Boeing 737': [10, 30000, 6, 15000, 20],
+    'Airbus A320': [20, 60000, 18, 30000, 10],
+}
+ESCALAS = [2, 5000, 2, 3000, 5]
+
+
+def _frota(n, modelo, semente):
+    rng = np.random.default_rng(semente)
+    valores = rng.normal(CENTROS[modelo], ESCALAS, size=(n, len(COLUNAS_NUMERICAS)))
+    return pd.DataFrame(valores, columns=COLUNAS_NUMERICAS).assign(modelo_aeronave=modelo)
+
+
+def _treino():
+    return pd.concat([_frota(1000, 'Boeing 737', 0), _frota(1000, 'Airbus A320', 1)], ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def detector():
+    return DetectorAnomalias(contaminacao=0.05).ajustar(_treino())
+
+
+def test_limiar_por_modelo_e_quantil_da_contaminacao(detector):
+    treino = _treino()
+    assert set(detector.perfis) == {None, 'Boeing 737', 'Airbus A320'}
+
+    resultado = detector.pontuar(treino, threads=2)
+    for modelo in CENTROS:
+        linhas = treino['modelo_aeronave'] == modelo
+        centro, precisao, limiar = detector.perfis[modelo]
+        # Distância de Mahalanobis ao centro robusto do próprio modelo
+        desvio = treino.loc[linhas, COLUNAS_NUMERICAS].to_numpy() - centro
+        esperado = np.sqrt(np.einsum('ij,jk,ik->i', desvio, precisao, desvio))
+        np.testing.assert_allclose(resultado.loc[linhas, 'distancia_anomalia'], esperado, rtol=1e-9)
+        assert (resultado.loc[linhas, 'limiar_anomalia'] == limiar).all()
+        # limiar = quantil 1 - contaminação das distâncias do treino
+        assert resultado.loc[linhas, 'anomalia'].mean() == pytest.approx(0.05, abs=1 / 1000)
+
+
+def test_ponto_atipico_para_o_proprio_modelo(detector):
+    novos = pd.DataFrame([CENTROS['Boeing 737'], CENTROS['Boeing 737'], CENTROS['Boeing 737']],
+                        columns=COLUNAS_NUMERICAS)
+    novos['modelo_aeronave'] = ['Boeing 737', 'Airbus A320', 'Embraer E190']
+    novos.loc[0, 'temperatura_media_operacao'] += 10 * ESCALAS[4]
+
+    resultado = detector.pontuar(novos)
+    # Temperatura fora do padrão do 737; valores típicos de 737 num A320; modelo sem perfil usa a frota
+    assert resultado['anomalia'].tolist() == [True, True, False]
+    assert resultado.loc[0, 'variavel_atipica'] == 'temperatura_media_operacao'
+    assert resultado.loc[2, 'limiar_anomalia'] == detector.perfis[None][2]
+
+
+def test_modelo_com_poucas_aeronaves_fica_sem_perfil():
+    treino = pd.concat([_frota(200, 'Airbus A320', 2), _frota(20, 'Boeing 737', 3)])
+    assert set(DetectorAnomalias().ajustar(treino, minimo=50).perfis) == {None, 'Airbus A320'}
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from arvores_compiladas import (EnsembleCompilado, RoteadorSegmentos, combinar_ensembles,
+                                ensemble_de_arrays, exportar_arvores)
+from pacote_modelo import PacoteModelo
+
+# O ensemble compilado tem que dar as mesmas probabilidades que o
+# Booster.predict do XGBoost (diferença só de float32 x float64, ~1e-7)
+
+TOLERANCIA = 1e-5
+MODELOS = ['A320', 'B737', 'E190', 'A330']
+MOTORES = ['CFM56', 'V2500', 'PW1000G']
+
+
+def _dados(n=2000, semente=0):
+    rng = np.random.default_rng(semente)
+    dados = pd.DataFrame({
+        'idade': rng.uniform(0, 30, n),
+        'horas': rng.uniform(0, 80_000, n),
+        'modelo': rng.choice(MODELOS, n),
+        'motor': rng.choice(MOTORES, n),
+    })
+    risco = dados['idade'] / 30 + dados['horas'] / 80_000 + dados['modelo'].isin(['B737', 'A330']) * 0.8
+    dados['falha'] = (risco + rng.normal(0, 0.3, n) > 1.3).astype(int)
+    # Valores ausentes nas numéricas para exercitar o ramo padrão dos splits
+    dados.loc[rng.random(n) < 0.05, 'horas'] = np.nan
+    return dados
+
+
+def _codigos(dados):
+    """Matriz numérica com as categóricas em códigos (LabelEncoder = categorias ordenadas)"""
+    return np.column_stack([
+        dados['idade'], dados['horas'],
+        pd.Categorical(dados['modelo'], categories=sorted(MODELOS)).codes,
+        pd.Categorical(dados['motor'], categories=sorted(MOTORES)).codes,
+    ]).astype(np.float32)
+
+
+def _treinar(X, y, **parametros):
+    parametros = {'n_estimators': 15, 'max_depth': 4, 'learning_rate': 0.3, 'random_state': 42, **parametros}
+    return xgb.XGBClassifier(**parametros).fit(X, y)
+
+
+def _proba_booster(modelo, X):
+    proba = modelo.get_booster().predict(xgb.DMatrix(X, enable_categorical=True))
+    return np.column_stack([1 - proba, proba]) if proba.ndim == 1 else proba
+
+
+def test_binario_igual_ao_booster():
+    dados = _dados()
+    X = _codigos(dados)
+    modelo = _treinar(X, dados['falha'])
+    compilado = exportar_arvores(modelo)
+    np.testing.assert_allclose(compilado.predict_proba(X), _proba_booster(modelo, X), atol=TOLERANCIA)
+
+
+def test_multiclasse_igual_ao_booster():
+    dados = _dados()
+    X = _codigos(dados)
+    y = pd.Categorical(dados['motor'], categories=sorted(MOTORES)).codes
+    modelo = _treinar(X[:, :3], y, objective='multi:softprob')
+    compilado = exportar_arvores(modelo)
+    np.testing.assert_allclose(compilado.predict_proba(X[:, :3]), _proba_booster(modelo, X[:, :3]),
+                            atol=TOLERANCIA)
+
+
+def test_persistencia_preserva_predicoes(tmp_path):
+    dados = _dados()
+    X = _codigos(dados)
+    compilado = exportar_arvores(_treinar(X, dados['falha']))
+    compilado.salvar(tmp_path / "arvores.npz")
+    recarregado = EnsembleCompilado.carregar(tmp_path / "arvores.npz")
+    np.testing.assert_array_equal(recarregado.predict_margin(X), compilado.predict_margin(X))
+
+
+def test_categorico_nativo_com_ausente_e_desconhecido():
+    dados = _dados()
+    vocabularios = {'modelo': sorted(MODELOS), 'motor': sorted(MOTORES)}
+    nativo = dados[['idade', 'horas']].assign(**{
+        col: pd.Categorical(dados[col], categories=classes) for col, classes in vocabularios.items()})
+    modelo = _treinar(nativo, dados['falha'], tree_method='hist', enable_categorical=True, max_cat_to_onehot=1)
+    pacote = PacoteModelo(['idade', 'horas', 'modelo', 'motor'], vocabularios, exportar_arvores(modelo))
+    assert pacote.modelo.mapa_categorias.any(), "o modelo deveria ter splits por conjunto de categorias"
+
+    # Categoria nunca vista e valor ausente: o pacote codifica como NaN, o XGBoost como categoria ausente
+    novos = dados.head(300).copy()
+    novos.loc[novos.index[:50], 'modelo'] = 'A380'
+    novos.loc[novos.index[50:100], 'motor'] = None
+    esperado = _proba_booster(modelo, novos[['idade', 'horas']].assign(**{
+        col: pd.Categorical(novos[col], categories=classes) for col, classes in vocabularios.items()}))
+    np.testing.assert_allclose(pacote.predict_proba(novos), esperado, atol=TOLERANCIA)
+
+
+def test_roteador_segmentado_usa_especialista_ou_global():
+    dados = _dados()
+    X = _codigos(dados)
+    y = dados['falha'].to_numpy()
+    global_ = _treinar(X, y)
+    codigos = [0.0, 2.0]  # segmentos com especialista; os demais vão para o global
+    especialistas = [_treinar(X[X[:, 2] == c], y[X[:, 2] == c]) for c in codigos]
+    features = [f"f{i}" for i in range(X.shape[1])]
+    compilados = []
+    for modelo in especialistas + [global_]:
+        compilado = exportar_arvores(modelo)
+        compilado.features = features
+        compilados.append(compilado)
+    roteador = RoteadorSegmentos('f2', codigos, compilados[:-1], compilados[-1])
+
+    X_teste = X.copy()
+    X_teste[:20, 2] = np.nan  # segmento ausente -> global
+    esperado = _proba_booster(global_, X_teste)
+    for codigo, modelo in zip(codigos, especialistas):
+        linhas = X_teste[:, 2] == codigo
+        esperado[linhas] = _proba_booster(modelo, X_teste[linhas])
+    np.testing.assert_allclose(roteador.predict_proba(X_teste), esperado, atol=TOLERANCIA)
+
+    recarregado = ensemble_de_arrays(roteador.para_arrays())
+    np.testing.assert_array_equal(recarregado.predict_margin(X_teste), roteador.predict_margin(X_teste))
+
+
+def test_combinar_ensembles_mantem_as_margens():
+    dados = _dados()
+    X = _codigos(dados)
+    binario = exportar_arvores(_treinar(X, dados['falha']))
+    tipo = exportar_arvores(_treinar(X, pd.Categorical(dados['motor']).codes, objective='multi:softprob'))
+    conjunto = combinar_ensembles([binario, tipo])
+    margem = conjunto.predict_margin(X)
+    np.testing.assert_allclose(margem[:, :1], binario.predict_margin(X), atol=TOLERANCIA)
+    np.testing.assert_allclose(margem[:, 1:], tipo.predict_margin(X), atol=TOLERANCIA)
+
+
+def test_combinar_recusa_features_diferentes():
+    dados = _dados(200)
+    X = _codigos(dados)
+    a = exportar_arvores(_treinar(X, dados['falha']))
+    b = exportar_arvores(_treinar(X, dados['falha']))
+    b.features = list(reversed(a.features))
+    with pytest.raises(ValueError):
+        combinar_ensembles([a, b])
+
+
+def test_contribuicoes_caminho_iguais_ao_xgboost(tmp_path):
+    dados = _dados()
+    X = _codigos(dados)
+    modelo = _treinar(X, dados['falha'])
+    compilado = exportar_arvores(modelo)
+    esperado = modelo.get_booster().predict(xgb.DMatrix(X), pred_contribs=True, approx_contribs=True)
+    contribuicoes = compilado.contribuicoes_caminho(X)
+    np.testing.assert_allclose(contribuicoes, esperado, atol=TOLERANCIA)
+    np.testing.assert_allclose(contribuicoes.sum(axis=1), compilado.predict_margin(X)[:, 0], atol=TOLERANCIA)
+
+    # O valor esperado dos nós vai junto no .npz
+    compilado.salvar(tmp_path / "arvores.npz")
+    recarregado = EnsembleCompilado.carregar(tmp_path / "arvores.npz")
+    np.testing.assert_array_equal(recarregado.contribuicoes_caminho(X), contribuicoes)
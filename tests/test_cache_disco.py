@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import threading
+import time
+from cache_disco import CacheDisco
+
+
+def test_calculo_unico_entre_threads(tmp_path):
+    cache = CacheDisco(str(tmp_path), max_bytes=10**6)
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        time.sleep(0.05)
+        return {'figura': list(range(5))}
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter('graficos', 'v1', (), calcular)))
+            for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert resultados == [{'figura': [0, 1, 2, 3, 4]}] * 8
+    assert (cache.faltas, cache.acertos) == (1, 7)
+    assert cache._travas == {}
+
+
+def _obter_em_outro_processo(diretorio, registro):
+    def calcular():
+        with open(registro, 'a') as arq:
+            arq.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return [1, 2, 3]
+    assert CacheDisco(diretorio, max_bytes=10**6).obter('analises', 'v1', (), calcular) == [1, 2, 3]
+
+
+def test_calculo_unico_entre_processos(tmp_path):
+    registro = tmp_path / 'calculos.txt'
+    contexto = multiprocessing.get_context('fork')
+    processos = [contexto.Process(target=_obter_em_outro_processo, args=(str(tmp_path / 'cache'), registro))
+                for _ in range(3)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+    assert [p.exitcode for p in processos] == [0, 0, 0]
+    assert len(registro.read_text().splitlines()) == 1
+
+
+def test_poda_remove_as_entradas_usadas_ha_mais_tempo(tmp_path):
+    # Cada entrada ocupa 102 bytes ("x" * 100 em JSON); cabem três
+    cache = CacheDisco(str(tmp_path), max_bytes=350)
+    for i, nome in enumerate(['a', 'b', 'c']):
+        cache.obter(nome, 'v1', (), lambda: "x" * 100)
+        caminho = os.path.join(str(tmp_path), cache.chave(nome, 'v1') + '.json')
+        os.utime(caminho, (1000 + i, 1000 + i))
+
+    # Ler 'a' renova o acesso; a entrada nova empurra 'b' (a mais antiga) para fora
+    assert cache.obter('a', 'v1', (), lambda: None) == "x" * 100
+    cache.obter('d', 'v1', (), lambda: "x" * 100)
+    restantes = sorted(os.path.basename(caminho).split('_')[0] for caminho, _, _ in cache.entradas())
+    assert restantes == ['a', 'c', 'd']
+    assert sum(tamanho for _, tamanho, _ in cache.entradas()) <= 350
+
+    # Dados novos (outra impressão) são outra chave
+    assert cache.obter('a', 'v2', (), lambda: "novo") == "novo"
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from carregamento_paginas import dados_frota
+
+
+def _frota(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'modelo_aeronave': rng.choice(['Boeing 737', 'Airbus A320'], n),
+        'tipo_motor': rng.choice(['CFM56', 'V2500'], n),
+        'idade_aeronave_anos': rng.uniform(1, 30, n),
+        'horas_voo_total': rng.uniform(1000, 80000, n),
+        'ultima_manutencao_meses': rng.uniform(0, 24, n),
+        'ciclos_pouso_decolagem': rng.uniform(500, 40000, n),
+        'temperatura_media_operacao': rng.uniform(-10, 40, n),
+        'falha_critica': rng.integers(0, 2, n),
+        'tipo_falha': rng.choice(['Motor', 'Hidráulico'], n),
+    })
+
+
+def test_recursos_derivados_do_csv_acompanham_os_dados(tmp_path, monkeypatch):
+    from analises_avancadas import detector_anomalias
+    from formulario_aviacao import indice_similares
+    monkeypatch.chdir(tmp_path)
+
+    _frota(120).to_csv('aviacao_falhas.csv', index=False)
+    detector = detector_anomalias()
+    assert len(dados_frota()) == 120
+    assert len(indice_similares().dados) == 120
+
+    pd.concat([_frota(120), _frota(30, semente=1)]).to_csv('aviacao_falhas.csv', index=False)
+    assert len(dados_frota()) == 150
+    assert len(indice_similares().dados) == 150
+    assert detector_anomalias() is not detector
+    assert len(detector_anomalias().pontuar(dados_frota())) == 150
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from monitor_drift import MonitorDrift, criar_baseline, ks, psi
+
+
+def test_psi_calculado_a_mao():
+    assert psi([0.5, 0.5], [0.5, 0.5]) == 0.0
+    # (0.1-0.25)ln(0.4) + (0.2-0.25)ln(0.8) + (0.3-0.25)ln(1.2) + (0.4-0.25)ln(1.6)
+    assert psi([0.25] * 4, [0.1, 0.2, 0.3, 0.4]) == pytest.approx(0.2282174, abs=1e-7)
+    # Faixa vazia no treino usa epsilon: (0.4-0.5)ln(0.8) + (0.1-1e-4)ln(0.1/1e-4)
+    assert psi([0.5, 0.5, 0.0], [0.5, 0.4, 0.1]) == pytest.approx(0.7123991, abs=1e-7)
+
+
+def test_ks_calculado_a_mao():
+    # Acumuladas: 0.25 0.50 0.75 1.0 x 0.1 0.3 0.6 1.0
+    assert ks([0.25] * 4, [0.1, 0.2, 0.3, 0.4]) == pytest.approx(0.2)
+    assert ks([0.2, 0.3, 0.5], [0.2, 0.3, 0.5]) == 0.0
+
+
+def _treino(n=1000):
+    return pd.DataFrame({
+        'horas': np.arange(n, dtype=float),
+        'motor': np.where(np.arange(n) % 4 == 0, 'V2500', 'CFM56'),
+    })
+
+
+def test_monitor_estavel_com_a_distribuicao_do_treino():
+    baseline = criar_baseline(_treino(), ['horas'], ['motor'])
+    assert baseline['numericas']['horas']['proporcoes'] == pytest.approx([0.1] * 10)
+    assert baseline['categoricas']['motor'] == {'categorias': ['CFM56', 'V2500'], 'proporcoes': [0.75, 0.25]}
+
+    monitor = MonitorDrift(baseline, tamanho_subjanela=100)
+    monitor.registrar(_treino())
+    relatorio = monitor.relatorio().set_index('feature')
+    assert relatorio.loc['horas', 'psi'] == pytest.approx(0.0, abs=1e-9)
+    assert relatorio.loc['horas', 'ks'] == pytest.approx(0.0, abs=1e-9)
+    assert relatorio.loc['motor', 'psi'] == pytest.approx(0.0, abs=1e-3)
+    assert (relatorio['status'] == 'estável').all()
+
+
+def test_monitor_alerta_com_deslocamento_e_categoria_nova():
+    baseline = criar_baseline(_treino(), ['horas'], ['motor'])
+    monitor = MonitorDrift(baseline, tamanho_subjanela=100)
+    # Tudo acima do maior limite cai na última faixa; metade dos motores é desconhecida
+    monitor.registrar({'horas': np.full(200, 5000.0), 'motor': ['CFM56', 'PW1000G'] * 100})
+    relatorio = monitor.relatorio().set_index('feature')
+
+    # Última faixa: 0.1 -> 1.0; as outras nove: 0.1 -> epsilon
+    esperado = 0.9 * np.log(10) + 9 * (0.1 - 1e-4) * np.log(0.1 / 1e-4)
+    assert relatorio.loc['horas', 'psi'] == pytest.approx(esperado)
+    assert relatorio.loc['horas', 'ks'] == pytest.approx(0.9)
+    assert relatorio.loc['motor', 'desconhecidas'] == 100
+    assert (relatorio['status'] == 'alerta').all()
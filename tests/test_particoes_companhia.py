@@ -0,0 +1,61 @@
+import threading
+import time
+import numpy as np
+from particoes_companhia import CacheCompanhias
+
+
+def _bloco(n_bytes):
+    return lambda: np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_orcamento_despeja_a_entrada_menos_usada_da_companhia():
+    cache = CacheCompanhias(max_companhias=4, max_bytes=1000)
+    cache.obter('LATAM', 'a', _bloco(400))
+    cache.obter('LATAM', 'b', _bloco(400))
+    cache.obter('GOL', 'a', _bloco(400))
+    cache.obter('LATAM', 'a', _bloco(999))  # acerto: 'a' passa a ser a mais recente
+    cache.obter('LATAM', 'c', _bloco(400))  # 1200 bytes > 1000: sai 'b'
+
+    assert cache.uso() == {'GOL': {'entradas': 1, 'bytes': 400}, 'LATAM': {'entradas': 2, 'bytes': 800}}
+    calculos = []
+    cache.obter('LATAM', 'a', lambda: calculos.append('a'))
+    cache.obter('LATAM', 'b', lambda: calculos.append('b') or np.zeros(1, dtype=np.uint8))
+    assert calculos == ['b']
+
+    # Uma entrada sozinha acima do orçamento fica (senão nunca haveria acerto)
+    cache.obter('AZUL', 'grande', _bloco(5000))
+    assert cache.uso()['AZUL'] == {'entradas': 1, 'bytes': 5000}
+
+
+def test_lru_das_companhias():
+    cache = CacheCompanhias(max_companhias=2, max_bytes=10**6)
+    cache.obter('LATAM', 'dados', _bloco(10))
+    cache.obter('GOL', 'dados', _bloco(10))
+    cache.obter('LATAM', 'dados', _bloco(10))  # LATAM volta a ser a mais recente
+    cache.obter('AZUL', 'dados', _bloco(10))   # sai GOL
+    assert list(cache.uso()) == ['LATAM', 'AZUL']
+
+    cache.despejar('LATAM')
+    assert list(cache.uso()) == ['AZUL']
+    cache.despejar()
+    assert cache.uso() == {}
+
+
+def test_calculo_unico_por_chave_com_threads():
+    cache = CacheCompanhias(max_companhias=4, max_bytes=10**6)
+    chamadas = []
+
+    def calcular():
+        chamadas.append(threading.get_ident())
+        time.sleep(0.05)
+        return np.arange(10)
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter('LATAM', 'scores', calcular)))
+            for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(chamadas) == 1
+    assert len(resultados) == 8 and all(r is resultados[0] for r in resultados)
@@ -0,0 +1,40 @@
+import os
+from perfil_requisicoes import perfilar, podar_perfis
+
+
+def _perfis(diretorio, tamanhos):
+    """Um .folded por tamanho, do mais antigo para o mais novo (mtime crescente)"""
+    nomes = []
+    for i, tamanho in enumerate(tamanhos):
+        nome = f"{i:02d}_callback.folded"
+        (diretorio / nome).write_bytes(b"x" * tamanho)
+        os.utime(diretorio / nome, ns=(i * 10**9, i * 10**9))
+        nomes.append(nome)
+    return nomes
+
+
+def test_poda_por_quantidade_remove_os_mais_antigos(tmp_path):
+    nomes = _perfis(tmp_path, [10] * 5)
+    (tmp_path / "leia-me.txt").write_text("não é perfil")
+    assert podar_perfis(str(tmp_path), max_arquivos=3, max_bytes=10**6) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(nomes[2:] + ["leia-me.txt"])
+
+
+def test_poda_por_bytes_mantem_o_mais_novo(tmp_path):
+    nomes = _perfis(tmp_path, [100, 100, 100, 100])
+    assert podar_perfis(str(tmp_path), max_arquivos=10, max_bytes=250) == 2
+    assert sorted(os.listdir(tmp_path)) == nomes[2:]
+
+    # Sozinho acima do teto, o perfil recém-gravado continua lá
+    assert podar_perfis(str(tmp_path), max_arquivos=10, max_bytes=50) == 1
+    assert os.listdir(tmp_path) == nomes[3:]
+
+
+def test_perfilar_grava_e_respeita_o_teto(tmp_path, monkeypatch):
+    import perfil_requisicoes
+    _perfis(tmp_path, [10] * 3)
+    monkeypatch.setattr(perfil_requisicoes, 'MAX_ARQUIVOS_PERFIS', 3)
+    resultado, caminho = perfilar(sum, [1, 2, 3], formato='folded', nome='soma', diretorio=str(tmp_path))
+    assert resultado == 6
+    assert os.path.exists(caminho)
+    assert len(os.listdir(tmp_path)) == 3
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from arvores_compiladas import exportar_arvores
+from pacote_modelo import PacoteModelo
+from registro_modelos import (carregar_baseline, carregar_booster, carregar_metadados,
+                            carregar_pacote, listar_versoes, promover, registrar_versao,
+                            versao_atual)
+from treino_externo import codificar_bloco
+from treino_incremental import treinar_incremental
+
+MODELOS = ['Airbus A320', 'Boeing 737', 'Embraer E190']
+FEATURES = ['idade_aeronave_anos', 'horas_voo_total', 'modelo_aeronave_encoded']
+VOCABULARIOS = {'modelo_aeronave': MODELOS}
+PARAMETROS = {'n_estimators': 10, 'max_depth': 3, 'learning_rate': 0.3, 'random_state': 42}
+
+
+def _frota(n=600, semente=0):
+    rng = np.random.default_rng(semente)
+    idade = rng.uniform(0, 30, n)
+    return pd.DataFrame({
+        'idade_aeronave_anos': idade,
+        'horas_voo_total': rng.uniform(1000, 80000, n),
+        'ultima_manutencao_meses': rng.uniform(0, 24, n),
+        'ciclos_pouso_decolagem': rng.uniform(500, 40000, n),
+        'temperatura_media_operacao': rng.uniform(-10, 40, n),
+        'modelo_aeronave': rng.choice(MODELOS, n),
+        'tipo_motor': rng.choice(['CFM56', 'V2500'], n),
+        'falha_critica': (rng.random(n) < idade / 35).astype(int),
+    })
+
+
+def _registrar(caminho, dados, registro='modelos', promover_versao=True, **parametros):
+    dados.to_csv(caminho, index=False)
+    modelo = xgb.XGBClassifier(**dict(PARAMETROS, **parametros))
+    modelo.fit(codificar_bloco(dados, VOCABULARIOS, FEATURES), dados['falha_critica'])
+    pacote = PacoteModelo(FEATURES, VOCABULARIOS, exportar_arvores(modelo))
+    return registrar_versao(modelo, pacote, {'logloss': 0.5}, dict(PARAMETROS, **parametros),
+                            str(caminho), 0.1, registro=registro, promover_versao=promover_versao)
+
+
+def test_promover_e_rollback_trocam_a_versao_servida(tmp_path):
+    registro = str(tmp_path / 'modelos')
+    dados = _frota()
+    v1 = _registrar(tmp_path / 'a.csv', dados, registro)
+    v2 = _registrar(tmp_path / 'b.csv', dados, registro, max_depth=2)
+    v3 = _registrar(tmp_path / 'c.csv', dados, registro, promover_versao=False)
+    assert (v1, v2, v3) == ('v0001', 'v0002', 'v0003')
+    assert listar_versoes(registro) == [v1, v2, v3]
+    # Registrar sem promover não mexe no ponteiro
+    assert versao_atual(registro) == v2
+    assert carregar_pacote(registro=registro).versao == v2
+
+    # Rollback: ATUAL volta para a versão anterior e o pacote servido acompanha
+    promover(v1, registro)
+    assert versao_atual(registro) == v1
+    pacote = carregar_pacote(registro=registro)
+    assert pacote.versao == v1
+    assert carregar_metadados(registro=registro)['versao'] == v1
+    booster = carregar_booster(registro=registro)
+    X = codificar_bloco(dados, VOCABULARIOS, FEATURES)
+    esperado = booster.predict(xgb.DMatrix(X))
+    np.testing.assert_allclose(pacote.predict_proba(dados)[:, 1], esperado, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        promover('v0042', registro)
+    assert versao_atual(registro) == v1
+
+
+def test_incremental_faz_rollback_quando_holdout_piora(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    base = _registrar(tmp_path / 'base.csv', _frota(semente=1))
+    _frota(400, semente=2).to_csv(tmp_path / 'novos.csv', index=False)
+
+    # Tolerância negativa: qualquer resultado conta como piora
+    versao, promovida = treinar_incremental('novos.csv', novas_arvores=5, tolerancia=-1.0)
+    assert (versao, promovida) == (base, False)
+    assert listar_versoes() == [base]
+    assert versao_atual() == base
+
+    versao, promovida = treinar_incremental('novos.csv', novas_arvores=5, tolerancia=1.0)
+    assert promovida and versao == 'v0002'
+    assert versao_atual() == versao
+    metadados = carregar_metadados()
+    assert metadados['modo'] == 'incremental'
+    assert metadados['versao_base'] == base
+    # A base não tinha baseline de drift: a versão nova ganha um criado dos registros novos
+    assert carregar_baseline()['n_registros'] > 0
+    assert carregar_booster().num_boosted_rounds() == PARAMETROS['n_estimators'] + 5
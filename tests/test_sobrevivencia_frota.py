@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from sobrevivencia_frota import kaplan_meier
+
+
+def test_kaplan_meier_calculado_a_mao():
+    # Censuras em t=2 (empatada com uma falha) e t=4
+    tempo = np.array([5.0, 2.0, 1.0, 4.0, 2.0, 3.0])
+    evento = np.array([1, 0, 1, 0, 1, 1], dtype=bool)
+    grade = np.array([0.0, 1.0, 2.5, 3.0, 4.9, 6.0])
+    curva = kaplan_meier(tempo, evento, grade)
+
+    # t=1: 6 em risco, 1 falha; t=2: 5, 1; t=3: 3, 1; t=4: só censura; t=5: 1, 1
+    s1, s2, s3 = 5 / 6, 5 / 6 * 4 / 5, 5 / 6 * 4 / 5 * 2 / 3
+    np.testing.assert_allclose(curva['sobrevivencia'], [1.0, s1, s2, s3, s3, 0.0])
+    np.testing.assert_allclose(curva['risco_acumulado'],
+                            [0.0, 1 / 6, 1 / 6 + 1 / 5, 1 / 6 + 1 / 5 + 1 / 3, 1 / 6 + 1 / 5 + 1 / 3,
+                            1 / 6 + 1 / 5 + 1 / 3 + 1])
+    assert curva['mediana'] == 3.0
+
+    # Greenwood em t=3: 1/(6*5) + 1/(5*4) + 1/(3*2) = 1/4 -> erro = S * 1/2
+    erro = s3 * 0.5
+    assert curva['ic_inf'][3] == pytest.approx(s3 - 1.96 * erro)
+    assert curva['ic_sup'][3] == pytest.approx(min(1.0, s3 + 1.96 * erro))
+    assert curva['ic_inf'][0] == curva['ic_sup'][0] == 1.0
+
+
+def test_sem_falhas_nao_tem_mediana():
+    curva = kaplan_meier(np.array([1.0, 2.0, 3.0]), np.zeros(3, dtype=bool), np.array([0.0, 5.0]))
+    np.testing.assert_allclose(curva['sobrevivencia'], [1.0, 1.0])
+    assert curva['mediana'] is None